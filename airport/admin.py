@@ -13,3 +13,7 @@ admin.site.register(models.Flight)
 admin.site.register(models.Crew)
 admin.site.register(models.Ticket)
 admin.site.register(models.Order)
+admin.site.register(models.SeatHold)
+admin.site.register(models.HeldSeat)
+admin.site.register(models.IdempotencyKey)
+admin.site.register(models.OrderRequest)
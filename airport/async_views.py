@@ -0,0 +1,139 @@
+"""Coroutine implementations of read actions of viewsets.
+
+With ``ASYNC_READ_VIEWS`` enabled, the router gets an async view for
+viewsets using ``AsyncReadMixin``. Its ``async_actions`` are answered by
+the ``a<action>`` coroutines, which evaluate querysets with the async ORM,
+so an ASGI worker keeps serving other requests while a search waits for
+the database. Other methods are passed to the regular sync view.
+
+All middleware has to be async-capable as well, otherwise Django runs the
+view in a thread anyway.
+"""
+from asgiref.sync import async_to_sync, sync_to_async
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.views.decorators.csrf import csrf_exempt
+
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+
+from airport.cache import CacheAsideMixin
+
+
+class AsyncReadMixin:
+    async_actions = ("list",)
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not settings.ASYNC_READ_VIEWS:
+            return view
+
+        return cls.as_async_view(view, actions, initkwargs)
+
+    @classmethod
+    def as_async_view(cls, sync_view, actions, initkwargs):
+        run_sync_view = sync_to_async(sync_view)
+
+        async def view(request, *args, **kwargs):
+            if actions.get(request.method.lower()) not in cls.async_actions:
+                return await run_sync_view(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for method, action in actions.items():
+                setattr(self, method, getattr(self, action))
+            return await self.adispatch(request, *args, **kwargs)
+
+        # Attributes read by the router, schema generation and csrf
+        view.__dict__.update(sync_view.__dict__)
+        return csrf_exempt(view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """Async counterpart of APIView.dispatch for ``async_actions``"""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Authentication and throttling use the sync ORM and cache
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await self.ahandle(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    async def ahandle(self, request, *args, **kwargs):
+        handler = getattr(self, f"a{self.action}")
+        if not isinstance(self, CacheAsideMixin):
+            return await handler(request, *args, **kwargs)
+
+        timeout = self.get_cache_timeout()
+        if timeout is None:
+            return await handler(request, *args, **kwargs)
+
+        # A miss runs the coroutine back on the event loop
+        return await sync_to_async(self.serve_from_cache)(
+            async_to_sync(handler), timeout, request, *args, **kwargs
+        )
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+
+        try:
+            instance = await queryset.aget(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (
+            ObjectDoesNotExist,
+            DjangoValidationError,
+            TypeError,
+            ValueError,
+        ):
+            raise NotFound()
+
+        self.check_object_permissions(self.request, instance)
+        return instance
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+
+        if not hasattr(self.paginator, "apaginate_queryset"):
+            # Paginators without async support slice and count synchronously
+            return await sync_to_async(self.paginate_queryset)(queryset)
+
+        return await self.paginator.apaginate_queryset(
+            queryset, self.request, view=self
+        )
+
+    async def aserialize(self, instance, many: bool = False):
+        serializer = self.get_serializer(instance, many=many)
+        # Method fields, like the seat map of a flight, may still query
+        return await sync_to_async(lambda: serializer.data)()
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        # List querysets load the relations their serializers render, so
+        # serializing the fetched rows does not query
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        instances = [instance async for instance in queryset]
+        return Response(self.get_serializer(instances, many=True).data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(await self.aserialize(instance))
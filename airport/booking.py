@@ -0,0 +1,497 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from airport import models, search
+
+
+class BookingConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Seats were booked concurrently, please try again."
+    default_code = "booking_conflict"
+
+
+def _seat_key(ticket_data) -> tuple[int, int, int]:
+    return ticket_data["flight"].id, ticket_data["row"], ticket_data["seat"]
+
+
+def _seat_error(flight_id: int, row: int, seat: int, reason: str) -> dict:
+    return {
+        "seat": [
+            f"Seat (row: {row}, seat: {seat}) of flight {flight_id} "
+            f"{reason}"
+        ]
+    }
+
+
+def _seats_condition(seat_keys) -> tuple[Q, dict[int, set]]:
+    seats_per_flight = defaultdict(set)
+    for flight_id, row, seat in seat_keys:
+        seats_per_flight[flight_id].add((row, seat))
+
+    condition = Q()
+    for flight_id, seats in seats_per_flight.items():
+        condition |= Q(
+            flight_id=flight_id,
+            row__in={row for row, _ in seats},
+            seat__in={seat for _, seat in seats},
+        )
+
+    return condition, seats_per_flight
+
+
+def _find_seats(queryset, seat_keys) -> set[tuple[int, int, int]]:
+    """Returns which of ``(flight_id, row, seat)`` keys exist in queryset
+
+    Runs a single query, seats are narrowed down per flight by rows and
+    seat numbers and matched exactly in memory.
+    """
+    condition, seats_per_flight = _seats_condition(seat_keys)
+    if not seats_per_flight:
+        return set()
+
+    return {
+        seat_key
+        for seat_key in queryset.filter(condition).values_list(
+            "flight_id", "row", "seat"
+        )
+        if (seat_key[1], seat_key[2]) in seats_per_flight[seat_key[0]]
+    }
+
+
+def find_taken_seats(seat_keys) -> set[tuple[int, int, int]]:
+    """Returns which of ``(flight_id, row, seat)`` keys are already sold"""
+    return _find_seats(models.Ticket.objects.all(), seat_keys)
+
+
+def find_held_seats(
+    seat_keys, exclude_user_id: int | None = None
+) -> set[tuple[int, int, int]]:
+    """Returns which of the keys are held by active holds of other users"""
+    held_seats = models.HeldSeat.objects.filter(
+        hold__expires_at__gt=timezone.now()
+    )
+    if exclude_user_id is not None:
+        held_seats = held_seats.exclude(hold__user_id=exclude_user_id)
+    return _find_seats(held_seats, seat_keys)
+
+
+def seat_errors(
+    tickets_data, taken_seats, held_seats=frozenset()
+) -> list[dict]:
+    """Returns per-ticket errors for repeated, taken or held seats"""
+    seen = set()
+    errors = []
+    for ticket_data in tickets_data:
+        seat_key = _seat_key(ticket_data)
+        if seat_key in seen:
+            errors.append(_seat_error(*seat_key, "is requested twice"))
+        elif seat_key in taken_seats:
+            errors.append(_seat_error(*seat_key, "is already taken"))
+        elif seat_key in held_seats:
+            errors.append(_seat_error(*seat_key, "is held by another order"))
+        else:
+            errors.append({})
+        seen.add(seat_key)
+
+    return errors if any(errors) else []
+
+
+def raise_for_taken_seats(
+    tickets_data, taken_seats, held_seats=frozenset(), field_name="tickets"
+) -> None:
+    errors = seat_errors(tickets_data, taken_seats, held_seats)
+    if errors:
+        raise ValidationError({field_name: errors})
+
+
+def _lock_flights(flight_ids) -> dict[int, models.Flight]:
+    return (
+        models.Flight.objects.select_for_update(of=("self",))
+        .select_related("airplane")
+        .order_by("id")
+        .in_bulk(flight_ids)
+    )
+
+
+def _read_flights(flight_ids) -> dict[int, models.Flight]:
+    return models.Flight.objects.select_related("airplane").in_bulk(
+        flight_ids
+    )
+
+
+def _update_inventory(flights, tickets_data, check_version=False) -> bool:
+    """Updates counters, seat maps and versions of the booked flights
+
+    With ``check_version`` a flight is only updated if its version still
+    matches the loaded instance, False is returned otherwise.
+    """
+    sold_per_flight = Counter(
+        ticket_data["flight"].id for ticket_data in tickets_data
+    )
+
+    for flight_id, sold in sorted(sold_per_flight.items()):
+        flight = flights[flight_id]
+        seat_map = flight.get_seat_map()
+        for ticket_data in tickets_data:
+            if ticket_data["flight"].id == flight_id:
+                seat_map.take(ticket_data["row"], ticket_data["seat"])
+
+        inventory = models.Flight.objects.filter(id=flight_id)
+        if check_version:
+            inventory = inventory.filter(version=flight.version)
+        updated = inventory.update(
+            seats_sold=F("seats_sold") + sold,
+            seat_map=seat_map.to_bytes(),
+            version=F("version") + 1,
+        )
+        if not updated:
+            return False
+        search.sell_seats(flight_id, sold)
+
+    return True
+
+
+def sell_seats(tickets_data) -> None:
+    """Updates inventory of the booked flights under a row lock"""
+    flight_ids = {ticket_data["flight"].id for ticket_data in tickets_data}
+    _update_inventory(_lock_flights(flight_ids), tickets_data)
+
+
+def recount_inventory(flight_ids) -> None:
+    """Recomputes counters and seat maps of flights from their tickets
+
+    Used for tickets created or deleted one by one, e.g. in the admin or
+    by deleting orders, which the booking functions don't see.
+    """
+    flights = _lock_flights(flight_ids)
+
+    for flight_id, flight in flights.items():
+        flight.seat_map = None  # forces a rebuild from the tickets
+        seats_sold = flight.tickets.count()
+        models.Flight.objects.filter(id=flight_id).update(
+            seats_sold=seats_sold,
+            seat_map=flight.get_seat_map().to_bytes(),
+            version=F("version") + 1,
+        )
+        search.set_seats_sold(flight_id, seats_sold)
+
+
+class _PendingRecount:
+    """on_commit callback recounting the flights of its transaction"""
+
+    def __init__(self, flight_ids):
+        self.flight_ids = set(flight_ids)
+        self.done = False
+
+    def __call__(self) -> None:
+        self.done = True
+        if self.flight_ids:
+            with transaction.atomic():
+                recount_inventory(self.flight_ids)
+
+
+def _find_pending_recount() -> _PendingRecount | None:
+    # Rolled back transactions take their callbacks, and so the
+    # collected flights, with them
+    for _, callback, _ in reversed(
+        transaction.get_connection().run_on_commit
+    ):
+        if isinstance(callback, _PendingRecount) and not callback.done:
+            return callback
+    return None
+
+
+def recount_inventory_on_commit(flight_ids) -> None:
+    """Recounts the flights once, when the current transaction commits
+
+    Deleting an order sends a signal per ticket, the flights are collected
+    from all of them and recounted together.
+    """
+    pending = _find_pending_recount()
+    if pending is None:
+        transaction.on_commit(_PendingRecount(flight_ids))
+    else:
+        pending.flight_ids.update(flight_ids)
+
+
+def skip_recount(flight_ids) -> None:
+    """Drops pending recounts of flights deleted in the transaction"""
+    pending = _find_pending_recount()
+    if pending is not None:
+        pending.flight_ids.difference_update(flight_ids)
+
+
+def _insert_tickets(order, tickets_data) -> list[models.Ticket]:
+    return models.Ticket.objects.bulk_create(
+        models.Ticket(order=order, **ticket_data)
+        for ticket_data in tickets_data
+    )
+
+
+def _check_seats(order, tickets_data, seat_keys) -> None:
+    raise_for_taken_seats(
+        tickets_data,
+        find_taken_seats(seat_keys),
+        find_held_seats(seat_keys, exclude_user_id=order.user_id),
+    )
+
+
+def _book_pessimistic(order, tickets_data, seat_keys):
+    """Locks the flight rows first, so bookers of a flight queue up"""
+    flights = _lock_flights({flight_id for flight_id, _, _ in seat_keys})
+    _check_seats(order, tickets_data, seat_keys)
+    tickets = _insert_tickets(order, tickets_data)
+    _update_inventory(flights, tickets_data)
+    return tickets
+
+
+def _book_insert(order, tickets_data, seat_keys):
+    """Inserts without locking and maps unique violations to seat errors"""
+    _check_seats(order, tickets_data, seat_keys)
+
+    try:
+        with transaction.atomic():
+            tickets = _insert_tickets(order, tickets_data)
+    except IntegrityError:
+        raise_for_taken_seats(tickets_data, find_taken_seats(seat_keys))
+        raise
+
+    sell_seats(tickets_data)
+    return tickets
+
+
+class _InventoryChanged(Exception):
+    pass
+
+
+def _book_optimistic(order, tickets_data, seat_keys):
+    """Updates inventory only if flight versions did not change meanwhile
+
+    Conflicting attempts are rolled back to a savepoint and retried up to
+    ``BOOKING_OPTIMISTIC_RETRIES`` times.
+    """
+    flight_ids = {flight_id for flight_id, _, _ in seat_keys}
+
+    for _ in range(settings.BOOKING_OPTIMISTIC_RETRIES + 1):
+        flights = _read_flights(flight_ids)
+        _check_seats(order, tickets_data, seat_keys)
+
+        try:
+            with transaction.atomic():
+                tickets = _insert_tickets(order, tickets_data)
+                if not _update_inventory(
+                    flights, tickets_data, check_version=True
+                ):
+                    raise _InventoryChanged
+        except (_InventoryChanged, IntegrityError):
+            continue
+
+        return tickets
+
+    raise BookingConflict()
+
+
+BOOKING_STRATEGIES = {
+    "pessimistic": _book_pessimistic,
+    "optimistic": _book_optimistic,
+    "insert": _book_insert,
+}
+
+
+def book_tickets(
+    order: models.Order, tickets_data, strategy: str | None = None
+) -> list[models.Ticket]:
+    """Validates and inserts all tickets of an order with set-based queries
+
+    Must be called inside a transaction. Seats held by other users are
+    rejected, holds of the order owner are not. Concurrent bookings are
+    handled by ``strategy``, ``BOOKING_STRATEGY`` by default:
+
+    * ``pessimistic`` locks the booked flights before checking seats
+    * ``optimistic`` checks flight versions when updating inventory and
+      retries on conflicts
+    * ``insert`` relies on the unique constraint of tickets and reports
+      violations the same way as seats that were already taken
+    """
+    strategy = strategy or settings.BOOKING_STRATEGY
+    if strategy not in BOOKING_STRATEGIES:
+        raise ImproperlyConfigured(
+            f"Unknown booking strategy {strategy!r}, choose one of "
+            f"{', '.join(BOOKING_STRATEGIES)}"
+        )
+
+    return BOOKING_STRATEGIES[strategy](
+        order,
+        tickets_data,
+        [_seat_key(ticket_data) for ticket_data in tickets_data],
+    )
+
+
+def book_orders(user, tickets_per_order, attempts: int = 3) -> list:
+    """Books many orders of a user at once with set-based queries
+
+    Returns the created Order, or per-ticket errors, for every list of
+    tickets. Seats are checked for all orders with one query, a seat
+    requested by several orders goes to the first one. Orders and
+    tickets are inserted with one bulk insert each. If a concurrent
+    booking wins a seat between the check and the insert, the check is
+    repeated for the remaining orders, which fail with a conflict error
+    once the attempts run out. Must be called inside a transaction.
+    """
+    seat_keys = [
+        [_seat_key(ticket_data) for ticket_data in tickets_data]
+        for tickets_data in tickets_per_order
+    ]
+    results = [None] * len(tickets_per_order)
+    pending = list(range(len(tickets_per_order)))
+
+    for _ in range(attempts):
+        requested = [key for index in pending for key in seat_keys[index]]
+        claimed = find_taken_seats(requested)
+        held = find_held_seats(requested, exclude_user_id=user.id)
+
+        accepted = []
+        for index in pending:
+            errors = seat_errors(tickets_per_order[index], claimed, held)
+            if errors:
+                results[index] = {"tickets": errors}
+            else:
+                claimed.update(seat_keys[index])
+                accepted.append(index)
+
+        try:
+            with transaction.atomic():
+                orders = models.Order.objects.bulk_create(
+                    models.Order(user=user) for _ in accepted
+                )
+                tickets = models.Ticket.objects.bulk_create(
+                    models.Ticket(order=order, **ticket_data)
+                    for order, index in zip(orders, accepted)
+                    for ticket_data in tickets_per_order[index]
+                )
+        except IntegrityError:
+            pending = accepted
+            continue
+
+        sell_seats(
+            [
+                ticket_data
+                for index in accepted
+                for ticket_data in tickets_per_order[index]
+            ]
+        )
+
+        tickets_per_order_id = defaultdict(list)
+        for ticket in tickets:
+            tickets_per_order_id[ticket.order_id].append(ticket)
+        for order, index in zip(orders, accepted):
+            # Serializing the orders must not query the tickets again
+            order._prefetched_objects_cache = {
+                "tickets": tickets_per_order_id[order.id]
+            }
+            results[index] = order
+
+        return results
+
+    for index in pending:
+        results[index] = {"detail": BookingConflict.default_detail}
+
+    return results
+
+
+def hold_seats(user, seats_data) -> models.SeatHold:
+    """Reserves seats for ``SEAT_HOLD_TTL`` seconds
+
+    Must be called inside a transaction. Expired holds of the requested
+    flights are released right away instead of waiting for the sweeper.
+    """
+    now = timezone.now()
+    seat_keys = [_seat_key(seat_data) for seat_data in seats_data]
+
+    condition, _ = _seats_condition(seat_keys)
+    models.HeldSeat.objects.filter(
+        condition, hold__expires_at__lte=now
+    ).delete()
+
+    raise_for_taken_seats(
+        seats_data,
+        find_taken_seats(seat_keys),
+        find_held_seats(seat_keys),
+        field_name="seats",
+    )
+
+    hold = models.SeatHold.objects.create(
+        user=user,
+        expires_at=now + timedelta(seconds=settings.SEAT_HOLD_TTL),
+    )
+    try:
+        with transaction.atomic():
+            models.HeldSeat.objects.bulk_create(
+                models.HeldSeat(hold=hold, **seat_data)
+                for seat_data in seats_data
+            )
+    except IntegrityError:
+        raise_for_taken_seats(
+            seats_data, set(), find_held_seats(seat_keys), field_name="seats"
+        )
+        raise
+
+    return hold
+
+
+def confirm_hold(hold: models.SeatHold) -> models.Order:
+    """Turns held seats into an order and releases the hold
+
+    Must be called inside a transaction.
+    """
+    expires_at = list(
+        models.SeatHold.objects.select_for_update()
+        .filter(pk=hold.pk)
+        .values_list("expires_at", flat=True)
+    )
+    if not expires_at:
+        raise ValidationError("Seat hold is already confirmed or released.")
+    if expires_at[0] <= timezone.now():
+        raise ValidationError("Seat hold has expired.")
+
+    order = models.Order.objects.create(user_id=hold.user_id)
+    book_tickets(
+        order,
+        [
+            {"flight": held_seat.flight, "row": held_seat.row,
+             "seat": held_seat.seat}
+            for held_seat in hold.seats.select_related("flight")
+        ],
+    )
+    hold.delete()
+
+    return order
+
+
+def expire_holds(batch_size: int = 1000) -> int:
+    """Deletes expired holds in batches, returns how many were deleted"""
+    now = timezone.now()
+    expired = 0
+
+    while True:
+        hold_ids = list(
+            models.SeatHold.objects.filter(expires_at__lte=now)
+            .order_by("expires_at")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not hold_ids:
+            return expired
+
+        with transaction.atomic():
+            models.HeldSeat.objects.filter(hold_id__in=hold_ids).delete()
+            models.SeatHold.objects.filter(id__in=hold_ids).delete()
+        expired += len(hold_ids)
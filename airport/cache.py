@@ -0,0 +1,199 @@
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from rest_framework.response import Response
+
+
+VERSION_KEY = "response-cache:version:{label}"
+STATS_KEY = "response-cache:{outcome}:{namespace}"
+STATS_OUTCOMES = ("hits", "stale", "misses")
+
+cached_namespaces: set[str] = set()
+
+
+def get_response_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _incr(cache, key: str, initial: int = 1) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, initial, timeout=None):
+            cache.incr(key)
+
+
+def _new_version() -> int:
+    # A version key evicted from the cache must not start over at a value
+    # that responses are still cached under
+    return time.time_ns()
+
+
+def _count(cache, outcome: str, namespace: str) -> None:
+    _incr(cache, STATS_KEY.format(outcome=outcome, namespace=namespace))
+
+
+def get_version(model) -> int:
+    cache = get_response_cache()
+    key = VERSION_KEY.format(label=model._meta.label_lower)
+    version = cache.get(key)
+
+    if version is None:
+        version = _new_version()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+
+    return version
+
+
+def bump_version(model) -> None:
+    _incr(
+        get_response_cache(),
+        VERSION_KEY.format(label=model._meta.label_lower),
+        initial=_new_version(),
+    )
+
+
+def get_stats(namespace: str) -> dict[str, int]:
+    cache = get_response_cache()
+    return {
+        outcome: cache.get(
+            STATS_KEY.format(outcome=outcome, namespace=namespace), 0
+        )
+        for outcome in STATS_OUTCOMES
+    }
+
+
+def reset_stats(namespace: str) -> None:
+    get_response_cache().delete_many(
+        [
+            STATS_KEY.format(outcome=outcome, namespace=namespace)
+            for outcome in STATS_OUTCOMES
+        ]
+    )
+
+
+def normalize_query_params(query_params) -> str:
+    return "&".join(
+        f"{key}={value}"
+        for key in sorted(query_params)
+        for value in sorted(query_params.getlist(key))
+    )
+
+
+class CacheAsideMixin:
+    """Serves GET actions of a viewset from the shared response cache.
+
+    ``cache_timeouts`` maps the cached actions to the seconds a response
+    stays fresh, ``None`` meaning ``RESPONSE_CACHE_TIMEOUT``. Keys combine
+    the action, the versions of ``cache_models`` (bumped by signals on
+    every save and delete), the permission classes and role of the user,
+    the lookup kwargs and the normalized query params.
+
+    A response that is no longer fresh is kept for another
+    ``RESPONSE_CACHE_STALE_TIMEOUT`` seconds. During that time one request
+    at a time, holding a lock taken with ``cache.add``, recomputes it while
+    concurrent requests keep getting the stale copy.
+    """
+
+    cache_models = ()
+    cache_timeouts: dict[str, int | None] = {"list": None}
+    cache_lock_timeout = 30
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.cache_models:
+            cached_namespaces.add(cls.get_cache_namespace())
+
+    @classmethod
+    def get_cache_namespace(cls) -> str:
+        return cls.cache_models[0]._meta.label_lower
+
+    def get_cache_timeout(self) -> int | None:
+        """Returns seconds a response of the action stays fresh or None"""
+        if self.action not in self.cache_timeouts:
+            return None
+
+        timeout = self.cache_timeouts[self.action]
+        return settings.RESPONSE_CACHE_TIMEOUT if timeout is None else timeout
+
+    def get_cache_scope(self, request) -> str:
+        """Describes what the user may see, responses are cached per scope"""
+        if request.user.is_staff:
+            role = "staff"
+        elif request.user.is_authenticated:
+            role = "user"
+        else:
+            role = "anonymous"
+
+        permissions = ",".join(
+            sorted(type(permission).__name__
+                   for permission in self.get_permissions())
+        )
+        return f"{permissions}:{role}"
+
+    def get_cache_key(self, request) -> str:
+        versions = ",".join(
+            str(get_version(model)) for model in self.cache_models
+        )
+        params = hashlib.sha1(
+            f"{sorted(self.kwargs.items())}:"
+            f"{normalize_query_params(request.query_params)}".encode()
+        ).hexdigest()
+
+        # Host is a part of the key as serializers build absolute media URLs
+        return (
+            f"response-cache:{self.get_cache_namespace()}:{self.action}:"
+            f"{versions}:{self.get_cache_scope(request)}:"
+            f"{request.scheme}://{request.get_host()}:{params}"
+        )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        # Handlers are wrapped only after authentication, permission and
+        # throttle checks passed, so cached responses obey them as well
+        timeout = self.get_cache_timeout()
+        if request.method == "GET" and timeout is not None:
+            self.get = functools.partial(
+                self.serve_from_cache, self.get, timeout
+            )
+
+    def serve_from_cache(self, handler, timeout, request, *args, **kwargs):
+        cache = get_response_cache()
+        namespace = self.get_cache_namespace()
+        key = self.get_cache_key(request)
+        lock_key = f"{key}:lock"
+
+        entry = cache.get(key)
+        if entry is not None and entry["fresh_until"] > time.time():
+            _count(cache, "hits", namespace)
+            return Response(entry["data"])
+
+        locked = cache.add(lock_key, 1, self.cache_lock_timeout)
+        if entry is not None and not locked:
+            # Another request is already refreshing the entry
+            _count(cache, "stale", namespace)
+            return Response(entry["data"])
+
+        _count(cache, "misses", namespace)
+        try:
+            response = handler(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(
+                    key,
+                    {
+                        "data": response.data,
+                        "fresh_until": time.time() + timeout,
+                    },
+                    timeout + settings.RESPONSE_CACHE_STALE_TIMEOUT,
+                )
+        finally:
+            if locked:
+                cache.delete(lock_key)
+
+        return response
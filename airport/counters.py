@@ -0,0 +1,104 @@
+"""Expiring counters shared by all worker processes.
+
+They hold the request counters of the throttles and the read-your-writes
+pins of the replica routing. Counters are rows of the SharedCounter table
+on the primary database.
+They are incremented with a single ``UPDATE ... SET count = count + 1``,
+so concurrent workers never lose a hit, unlike ``incr`` of cache backends
+without a native one, which reads the value and writes it back. Expired
+counters are ignored and deleted by the ``purge_shared_counters`` command.
+"""
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from airport import models
+from airport.db_routers import PRIMARY
+
+
+def _counters():
+    # Replicas lag behind, counters are always read from the primary
+    return models.SharedCounter.objects.using(PRIMARY)
+
+
+def get_many(keys) -> dict[str, int]:
+    """Returns counts of the keys that exist and have not expired"""
+    return dict(
+        _counters()
+        .filter(key__in=keys, expires_at__gt=timezone.now())
+        .values_list("key", "count")
+    )
+
+
+def exists(key: str) -> bool:
+    return _counters().filter(key=key, expires_at__gt=timezone.now()).exists()
+
+
+def store(key: str, count: int, timeout: float) -> None:
+    """Sets the counter, replacing its count and expiry"""
+    _counters().bulk_create(
+        [
+            models.SharedCounter(
+                key=key,
+                count=count,
+                expires_at=timezone.now() + timedelta(seconds=timeout),
+            )
+        ],
+        update_conflicts=True,
+        unique_fields=["key"],
+        update_fields=["count", "expires_at"],
+    )
+
+
+def _increment(key: str, now, expires_at) -> bool:
+    # An expired counter starts over in the same statement
+    return bool(
+        _counters()
+        .filter(key=key)
+        .update(
+            count=Case(
+                When(expires_at__gt=now, then=F("count") + 1),
+                default=Value(1),
+            ),
+            expires_at=Case(
+                When(expires_at__gt=now, then=F("expires_at")),
+                default=Value(expires_at),
+            ),
+        )
+    )
+
+
+def incr(key: str, timeout: float) -> None:
+    """Adds one to the counter, a new counter expires after ``timeout``"""
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=timeout)
+
+    if _increment(key, now, expires_at):
+        return
+
+    try:
+        with transaction.atomic(using=PRIMARY):
+            _counters().create(key=key, count=1, expires_at=expires_at)
+    except IntegrityError:
+        # Created by a concurrent request meanwhile
+        _increment(key, now, expires_at)
+
+
+def purge_expired(batch_size: int = 1000) -> int:
+    """Deletes expired counters in batches, returns how many were deleted"""
+    now = timezone.now()
+    purged = 0
+
+    while True:
+        counter_ids = list(
+            _counters()
+            .filter(expires_at__lte=now)
+            .order_by("expires_at")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not counter_ids:
+            return purged
+
+        purged += _counters().filter(id__in=counter_ids).delete()[0]
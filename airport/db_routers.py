@@ -0,0 +1,57 @@
+"""Routing of read queries to database replicas.
+
+Reads go to a replica only while ``ReplicaPinningMiddleware`` has chosen
+one for the current request, which it does for safe methods of users who
+have not written recently, and only outside of transactions on the
+primary. Everything else, including management commands and workers, reads from
+and writes to ``default``.
+"""
+import contextlib
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+
+PRIMARY = "default"
+
+read_alias: ContextVar[str | None] = ContextVar("read_alias", default=None)
+
+
+def choose_replica() -> str | None:
+    if not settings.DATABASE_REPLICAS:
+        return None
+
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+@contextlib.contextmanager
+def reading_from(alias: str | None):
+    token = read_alias.set(alias)
+    try:
+        yield
+    finally:
+        read_alias.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints) -> str:
+        # Reads inside a transaction have to see its uncommitted writes
+        if connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+
+        return read_alias.get() or PRIMARY
+
+    def db_for_write(self, model, **hints) -> str:
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool | None:
+        aliases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool:
+        # Replicas receive the schema through replication
+        return db not in settings.DATABASE_REPLICAS
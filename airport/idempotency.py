@@ -0,0 +1,126 @@
+"""Idempotency-Key support for create endpoints.
+
+A create request sent with an ``Idempotency-Key`` header is executed once
+per user and key. Its response is stored for ``IDEMPOTENCY_KEY_TTL``
+seconds and returned as is for repeated requests with the same key, without
+running the create again.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from airport import models
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = (
+        "Idempotency-Key has already been used for a different request."
+    )
+    default_code = "idempotency_key_reused"
+
+
+class IdempotencyKeyInProgress(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = (
+        "A request with this Idempotency-Key is still being processed."
+    )
+    default_code = "idempotency_key_in_progress"
+
+
+def request_hash(request) -> str:
+    payload = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(
+        f"{request.method} {request.path} {payload}".encode()
+    ).hexdigest()
+
+
+def purge_expired(batch_size: int = 1000) -> int:
+    """Deletes expired keys in batches, returns how many were deleted"""
+    now = timezone.now()
+    purged = 0
+
+    while True:
+        key_ids = list(
+            models.IdempotencyKey.objects.filter(expires_at__lte=now)
+            .order_by("expires_at")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not key_ids:
+            return purged
+
+        purged += models.IdempotencyKey.objects.filter(
+            id__in=key_ids
+        ).delete()[0]
+
+
+class IdempotentCreateMixin:
+    """Executes create requests with an Idempotency-Key header only once.
+
+    The key row is inserted in the same transaction as the created
+    object, so a concurrent request with the same key waits on the unique
+    constraint and then replays the committed response. Requests that
+    fail are rolled back together with their key and can be retried.
+    """
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return super().create(request, *args, **kwargs)
+
+        if len(key) > models.IdempotencyKey._meta.get_field("key").max_length:
+            raise ValidationError(
+                {IDEMPOTENCY_HEADER: ["Ensure this value is shorter."]}
+            )
+
+        fingerprint = request_hash(request)
+        now = timezone.now()
+        keys = models.IdempotencyKey.objects.filter(
+            user=request.user, key=key
+        )
+
+        with transaction.atomic():
+            keys.filter(expires_at__lte=now).delete()
+            try:
+                with transaction.atomic():
+                    stored = models.IdempotencyKey.objects.create(
+                        user=request.user,
+                        key=key,
+                        request_hash=fingerprint,
+                        expires_at=now + timedelta(
+                            seconds=settings.IDEMPOTENCY_KEY_TTL
+                        ),
+                    )
+            except IntegrityError:
+                stored = None
+
+            if stored is not None:
+                response = super().create(request, *args, **kwargs)
+                stored.status_code = response.status_code
+                stored.response_body = response.data
+                stored.save(update_fields=["status_code", "response_body"])
+                return response
+
+        stored = keys.first()
+        if stored is None or stored.status_code is None:
+            raise IdempotencyKeyInProgress()
+        if stored.request_hash != fingerprint:
+            raise IdempotencyKeyReused()
+
+        return Response(
+            stored.response_body,
+            status=stored.status_code,
+            headers={REPLAYED_HEADER: "true"},
+        )
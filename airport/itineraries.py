@@ -0,0 +1,181 @@
+import bisect
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from airport import models
+
+
+@dataclass(frozen=True, slots=True)
+class Leg:
+    flight_id: int
+    source_id: int
+    destination_id: int
+    departure_time: datetime
+    arrival_time: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class Itinerary:
+    legs: tuple[Leg, ...]
+
+    @property
+    def departure_time(self) -> datetime:
+        return self.legs[0].departure_time
+
+    @property
+    def arrival_time(self) -> datetime:
+        return self.legs[-1].arrival_time
+
+    @property
+    def duration(self) -> timedelta:
+        return self.arrival_time - self.departure_time
+
+    @property
+    def layovers(self) -> list[timedelta]:
+        return [
+            following.departure_time - previous.arrival_time
+            for previous, following in zip(self.legs, self.legs[1:])
+        ]
+
+    def rank(self) -> tuple:
+        return self.arrival_time, len(self.legs), self.duration
+
+
+class FlightGraph:
+    """Time-expanded graph of upcoming flights kept in process memory.
+
+    Departures of every airport are stored sorted by departure time, so
+    connections within a layover window are found with a binary search.
+    Flight and route writes mark flights dirty through signals and only
+    those flights are reloaded before the next search. Writes made by other
+    processes are picked up by a full rebuild once the graph is older than
+    ``ITINERARY_GRAPH_TTL`` seconds.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self._legs: dict[int, Leg] = {}
+        self._departures: dict[int, list[Leg]] = {}
+        self._dirty: set[int] = set()
+        self._built_at = None
+
+    def mark_dirty(self, flight_ids) -> None:
+        with self._lock:
+            self._dirty.update(flight_ids)
+
+    @staticmethod
+    def _load_legs(flights) -> list[Leg]:
+        return [
+            Leg(*values)
+            for values in flights.filter(
+                departure_time__gte=timezone.now(),
+                route__source__isnull=False,
+                route__destination__isnull=False,
+            ).values_list(
+                "id",
+                "route__source_id",
+                "route__destination_id",
+                "departure_time",
+                "arrival_time",
+            )
+        ]
+
+    def _add(self, leg: Leg) -> None:
+        self._legs[leg.flight_id] = leg
+        bisect.insort(
+            self._departures.setdefault(leg.source_id, []),
+            leg,
+            key=lambda departure: departure.departure_time,
+        )
+
+    def _remove(self, flight_id: int) -> None:
+        leg = self._legs.pop(flight_id, None)
+        if leg:
+            self._departures[leg.source_id].remove(leg)
+
+    def _refresh(self) -> None:
+        ttl = settings.ITINERARY_GRAPH_TTL
+        if self._built_at is None or time.monotonic() - self._built_at > ttl:
+            self.reset()
+            for leg in self._load_legs(models.Flight.objects.all()):
+                self._add(leg)
+            self._built_at = time.monotonic()
+            return
+
+        if self._dirty:
+            dirty, self._dirty = self._dirty, set()
+            for flight_id in dirty:
+                self._remove(flight_id)
+            for leg in self._load_legs(
+                models.Flight.objects.filter(id__in=dirty)
+            ):
+                self._add(leg)
+
+    def _departures_between(self, airport_id, earliest, latest) -> list[Leg]:
+        departures = self._departures.get(airport_id, [])
+        start = bisect.bisect_left(
+            departures, earliest, key=lambda leg: leg.departure_time
+        )
+        end = bisect.bisect_right(
+            departures, latest, key=lambda leg: leg.departure_time
+        )
+        return departures[start:end]
+
+    def search(
+        self,
+        source_id: int,
+        destination_id: int,
+        departure_from: datetime,
+        departure_to: datetime,
+        max_legs: int,
+        min_layover: timedelta,
+        max_layover: timedelta,
+        max_candidates: int = 5000,
+    ) -> list[Itinerary]:
+        """Returns itineraries from source to destination ranked by arrival
+
+        The search stops after ``max_candidates`` itineraries were found, so
+        dense hubs can't make a single request explode.
+        """
+        with self._lock:
+            self._refresh()
+
+            itineraries = []
+            stack = [
+                (leg,)
+                for leg in self._departures_between(
+                    source_id, departure_from, departure_to
+                )
+            ]
+            while stack and len(itineraries) < max_candidates:
+                legs = stack.pop()
+                last_leg = legs[-1]
+
+                if last_leg.destination_id == destination_id:
+                    itineraries.append(Itinerary(legs))
+                    continue
+
+                if len(legs) == max_legs:
+                    continue
+
+                visited = {source_id, *(leg.destination_id for leg in legs)}
+                for leg in self._departures_between(
+                    last_leg.destination_id,
+                    last_leg.arrival_time + min_layover,
+                    last_leg.arrival_time + max_layover,
+                ):
+                    if leg.destination_id not in visited:
+                        stack.append((*legs, leg))
+
+        return sorted(itineraries, key=Itinerary.rank)
+
+
+flight_graph = FlightGraph()
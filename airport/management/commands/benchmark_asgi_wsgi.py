@@ -0,0 +1,245 @@
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.test import override_settings
+
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport import models
+from airport.management.commands.benchmark_concurrent_booking import (
+    percentile,
+)
+
+
+HOST = "localhost"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares throughput of the read endpoints served by the WSGI "
+        "handler from a thread pool and by the ASGI handler with async "
+        "views from one event loop, at the same concurrency. Each handler "
+        "runs in a separate process. Throttling is disabled"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help=(
+                "Path to request, may be repeated. Defaults to the flight "
+                "list, a flight, the airport list and the route list"
+            ),
+        )
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=100,
+            help="Requests in flight at the same time",
+        )
+        parser.add_argument(
+            "--handler",
+            choices=["wsgi", "asgi", "all"],
+            default="all",
+        )
+        parser.add_argument(
+            "--worker",
+            choices=["wsgi", "asgi"],
+            help="Run the requests in this process and print JSON results",
+        )
+        parser.add_argument("--token", help="Access token for the worker")
+
+    def get_paths(self, options) -> list[str]:
+        if options["paths"]:
+            return options["paths"]
+
+        paths = [
+            "/api/airport/flights/",
+            "/api/airport/airports/",
+            "/api/airport/routes/",
+        ]
+        flight_id = models.Flight.objects.values_list("id", flat=True).first()
+        if flight_id is not None:
+            paths.append(f"/api/airport/flights/{flight_id}/")
+        return paths
+
+    def run_wsgi(self, paths, token, requests, concurrency):
+        application = get_wsgi_application()
+
+        def send(index):
+            path = paths[index % len(paths)]
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": path,
+                "QUERY_STRING": "",
+                "SERVER_NAME": HOST,
+                "SERVER_PORT": "80",
+                "HTTP_HOST": HOST,
+                "HTTP_AUTHORIZATION": f"Bearer {token}",
+                "wsgi.input": io.BytesIO(),
+                "wsgi.errors": sys.stderr,
+                "wsgi.url_scheme": "http",
+            }
+            statuses = []
+
+            start = time.perf_counter()
+            body = application(
+                environ, lambda status, headers: statuses.append(status)
+            )
+            b"".join(body)
+            body.close()
+            return int(statuses[0][:3]), time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(send, range(requests)))
+
+    def run_asgi(self, paths, token, requests, concurrency):
+        application = get_asgi_application()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(index):
+            path = paths[index % len(paths)]
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": path,
+                "raw_path": path.encode(),
+                "query_string": b"",
+                "root_path": "",
+                "headers": [
+                    (b"host", HOST.encode()),
+                    (b"authorization", f"Bearer {token}".encode()),
+                ],
+                "client": ("127.0.0.1", 0),
+                "server": (HOST, 80),
+            }
+            status_codes = []
+            messages = [{"type": "http.request", "body": b""}]
+            disconnected = asyncio.Event()
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                # The client stays connected until the response is sent
+                await disconnected.wait()
+
+            async def send_message(message):
+                if message["type"] == "http.response.start":
+                    status_codes.append(message["status"])
+
+            async with semaphore:
+                start = time.perf_counter()
+                await application(scope, receive, send_message)
+                return status_codes[0], time.perf_counter() - start
+
+        async def send_all():
+            return await asyncio.gather(
+                *(send(index) for index in range(requests))
+            )
+
+        return asyncio.run(send_all())
+
+    def run_worker(self, options) -> None:
+        paths = self.get_paths(options)
+        run = self.run_wsgi if options["worker"] == "wsgi" else self.run_asgi
+
+        # Like the other benchmarks, requests are not throttled
+        with mock.patch.object(APIView, "throttle_classes", ()), (
+            override_settings(ALLOWED_HOSTS=[HOST])
+        ):
+            start = time.perf_counter()
+            outcomes = run(
+                paths,
+                options["token"],
+                options["requests"],
+                options["concurrency"],
+            )
+            duration = time.perf_counter() - start
+
+        self.stdout.write(
+            json.dumps({"duration": duration, "outcomes": outcomes})
+        )
+
+    def run_handler(self, handler: str, token: str, options) -> dict:
+        command = [
+            sys.executable,
+            "manage.py",
+            "benchmark_asgi_wsgi",
+            "--worker",
+            handler,
+            "--token",
+            token,
+            "--requests",
+            str(options["requests"]),
+            "--concurrency",
+            str(options["concurrency"]),
+        ]
+        for path in options["paths"] or ():
+            command += ["--path", path]
+
+        result = subprocess.run(
+            command,
+            cwd=settings.BASE_DIR,
+            env={
+                **os.environ,
+                "ASYNC_READ_VIEWS": str(handler == "asgi"),
+            },
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError(f"{handler}: {result.stderr.strip()}")
+
+        return json.loads(result.stdout)
+
+    def report(self, handler: str, result: dict) -> None:
+        outcomes = result["outcomes"]
+        latencies = sorted(latency for _, latency in outcomes)
+        errors = sum(1 for status_code, _ in outcomes if status_code != 200)
+
+        self.stdout.write(
+            f"{handler}: {len(outcomes) / result['duration']:.1f} req/sec, "
+            f"p50={percentile(latencies, 50) * 1000:.2f}ms "
+            f"p95={percentile(latencies, 95) * 1000:.2f}ms "
+            f"p99={percentile(latencies, 99) * 1000:.2f}ms, "
+            f"{errors} non-200 responses"
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options["worker"]:
+            self.run_worker(options)
+            return
+
+        if options["handler"] == "all":
+            handlers = ["wsgi", "asgi"]
+        else:
+            handlers = [options["handler"]]
+
+        user = get_user_model().objects.create_user(
+            f"benchmark-{uuid.uuid4().hex}@example.com"
+        )
+        try:
+            token = str(AccessToken.for_user(user))
+            for handler in handlers:
+                self.report(handler, self.run_handler(handler, token, options))
+        finally:
+            user.delete()
@@ -0,0 +1,276 @@
+import random
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import override_settings
+
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from airport import booking, models
+from airport.views import OrderViewSet
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(round(percent / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Books seats of one flight from parallel clients through "
+        "OrderViewSet, reports throughput and latency per booking "
+        "strategy, and verifies that no seat was sold twice and the "
+        "inventory matches the tickets"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clients",
+            type=int,
+            default=8,
+            help="Number of parallel booking threads",
+        )
+        parser.add_argument(
+            "--orders-per-client",
+            type=int,
+            default=50,
+            help="Booking attempts made by every client",
+        )
+        parser.add_argument(
+            "--seats-per-order",
+            type=int,
+            default=2,
+            help="Random seats requested by every order",
+        )
+        parser.add_argument("--rows", type=int, default=30)
+        parser.add_argument("--seats-in-row", type=int, default=6)
+        parser.add_argument(
+            "--hot-rows",
+            type=int,
+            default=None,
+            help="Only book seats of the first rows to raise contention",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--strategy",
+            choices=[*booking.BOOKING_STRATEGIES, "all"],
+            default=None,
+            help="Booking strategy to run, BOOKING_STRATEGY by default",
+        )
+
+    def seed_flight(self, rows: int, seats_in_row: int) -> models.Flight:
+        suffix = uuid.uuid4().hex[:8]
+        country = models.Country.objects.create(name=f"Benchmark {suffix}")
+        city = models.City.objects.create(name="Benchmark", country=country)
+        source = models.Airport.objects.create(name="Source", city=city)
+        destination = models.Airport.objects.create(
+            name="Destination", city=city
+        )
+        route = models.Route.objects.create(
+            source=source, destination=destination, distance=1000
+        )
+        airplane_type = models.AirplaneType.objects.create(
+            name=f"Benchmark {suffix}"
+        )
+        airplane = models.Airplane.objects.create(
+            name="Benchmark airplane",
+            airplane_type=airplane_type,
+            rows=rows,
+            seats_in_row=seats_in_row,
+        )
+        return models.Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time="2030-01-01 12:00:00",
+            arrival_time="2030-01-01 15:00:00",
+        )
+
+    def delete_flight(self, flight: models.Flight) -> None:
+        airplane_type_id = flight.airplane.airplane_type_id
+        models.Country.objects.filter(
+            cities__airports__source_routes__flights=flight
+        ).delete()
+        models.AirplaneType.objects.filter(id=airplane_type_id).delete()
+
+    def run_client(self, view, user, flight, seats, options, results, index):
+        factory = APIRequestFactory()
+        randomizer = random.Random(options["seed"] + index)
+        outcomes = []
+
+        try:
+            for _ in range(options["orders_per_client"]):
+                payload = {
+                    "tickets": [
+                        {"flight": flight.id, "row": row, "seat": seat}
+                        for row, seat in randomizer.sample(
+                            seats, options["seats_per_order"]
+                        )
+                    ]
+                }
+                request = factory.post("/", payload, format="json")
+                force_authenticate(request, user=user)
+
+                start = time.perf_counter()
+                try:
+                    status_code = view(request).status_code
+                except Exception:
+                    status_code = None
+                outcomes.append((status_code, time.perf_counter() - start))
+        finally:
+            connection.close()
+
+        results[index] = outcomes
+
+    def verify(self, flight: models.Flight) -> list[str]:
+        problems = []
+        flight = models.Flight.objects.select_related("airplane").get(
+            id=flight.id
+        )
+        tickets = flight.tickets.values_list("row", "seat")
+        sold = tickets.count()
+
+        double_sold = (
+            flight.tickets.values("row", "seat")
+            .annotate(count=Count("id"))
+            .filter(count__gt=1)
+        )
+        for seat in double_sold:
+            problems.append(
+                f"Seat (row: {seat['row']}, seat: {seat['seat']}) "
+                f"was sold {seat['count']} times"
+            )
+
+        if flight.seats_sold != sold:
+            problems.append(
+                f"seats_sold is {flight.seats_sold}, tickets: {sold}"
+            )
+
+        seat_map = flight.get_seat_map()
+        if set(seat_map.taken_seats()) != set(tickets):
+            problems.append("Seat map does not match the sold tickets")
+
+        available = (
+            models.Flight.objects.with_tickets_available()
+            .get(id=flight.id)
+            .tickets_available
+        )
+        if available != flight.airplane.capacity - sold:
+            problems.append(
+                f"tickets_available is {available}, "
+                f"expected {flight.airplane.capacity - sold}"
+            )
+
+        search_row = models.FlightSearch.objects.filter(
+            flight=flight
+        ).first()
+        if search_row and search_row.tickets_available != available:
+            problems.append(
+                f"Search row has {search_row.tickets_available} "
+                f"tickets available, expected {available}"
+            )
+
+        return problems
+
+    def run_scenario(self, options) -> dict:
+        flight = self.seed_flight(options["rows"], options["seats_in_row"])
+        users = [
+            get_user_model().objects.create_user(
+                f"benchmark-{uuid.uuid4().hex}@example.com"
+            )
+            for _ in range(options["clients"])
+        ]
+        hot_rows = options["hot_rows"] or options["rows"]
+        seats = [
+            (row, seat)
+            for row in range(1, min(hot_rows, options["rows"]) + 1)
+            for seat in range(1, options["seats_in_row"] + 1)
+        ]
+        view = OrderViewSet.as_view({"post": "create"}, throttle_classes=())
+        results = [None] * len(users)
+        threads = [
+            threading.Thread(
+                target=self.run_client,
+                args=(view, user, flight, seats, options, results, index),
+            )
+            for index, user in enumerate(users)
+        ]
+
+        try:
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            duration = time.perf_counter() - start
+
+            problems = self.verify(flight)
+        finally:
+            self.delete_flight(flight)
+            get_user_model().objects.filter(
+                id__in=[user.id for user in users]
+            ).delete()
+
+        outcomes = [outcome for result in results for outcome in result]
+        latencies = sorted(latency for _, latency in outcomes)
+        created = sum(1 for status_code, _ in outcomes if status_code == 201)
+        conflicts = sum(
+            1 for status_code, _ in outcomes if status_code in (400, 409)
+        )
+
+        return {
+            "attempts": len(outcomes),
+            "created": created,
+            "conflicts": conflicts,
+            "errors": len(outcomes) - created - conflicts,
+            "duration": duration,
+            "latencies": latencies,
+            "problems": problems,
+        }
+
+    def report(self, label: str, stats: dict) -> None:
+        latencies = stats["latencies"]
+        self.stdout.write(
+            f"{label}: {stats['attempts']} attempts, "
+            f"{stats['created']} orders, {stats['conflicts']} conflicts "
+            f"({stats['conflicts'] / max(stats['attempts'], 1):.1%}), "
+            f"{stats['errors']} errors\n"
+            f"  {stats['created'] / stats['duration']:.1f} orders/sec, "
+            f"p50={percentile(latencies, 50) * 1000:.2f}ms "
+            f"p95={percentile(latencies, 95) * 1000:.2f}ms "
+            f"p99={percentile(latencies, 99) * 1000:.2f}ms"
+        )
+        for problem in stats["problems"]:
+            self.stderr.write(f"  {problem}")
+
+    def handle(self, *args, **options) -> None:
+        if options["seats_per_order"] > options["seats_in_row"] * min(
+            options["hot_rows"] or options["rows"], options["rows"]
+        ):
+            raise CommandError("Not enough seats for a single order")
+
+        if options["strategy"] == "all":
+            strategies = list(booking.BOOKING_STRATEGIES)
+        else:
+            strategies = [options["strategy"] or settings.BOOKING_STRATEGY]
+
+        inconsistent = []
+        for strategy in strategies:
+            with override_settings(BOOKING_STRATEGY=strategy):
+                stats = self.run_scenario(options)
+            self.report(strategy, stats)
+            if stats["problems"]:
+                inconsistent.append(strategy)
+
+        if inconsistent:
+            raise CommandError(
+                f"Seat inventory is inconsistent: {', '.join(inconsistent)}"
+            )
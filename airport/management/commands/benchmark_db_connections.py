@@ -0,0 +1,113 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.test import override_settings
+
+from rest_framework.test import APIRequestFactory
+
+from airport.management.commands.benchmark_concurrent_booking import (
+    percentile,
+)
+from airport.views import RouteViewSet
+
+
+CONNECTION_MODES = ("none", "persistent", "pool")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures request latency for every DB_CONNECTION_MODE. Each mode "
+        "runs in a separate process, so that the settings are applied from "
+        "scratch and no connection is shared between the modes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument(
+            "--mode",
+            choices=[*CONNECTION_MODES, "all"],
+            default="all",
+            help="Connection mode to measure",
+        )
+        parser.add_argument(
+            "--worker",
+            action="store_true",
+            help="Measure the current settings and print latencies as JSON",
+        )
+
+    def measure(self, requests: int) -> list[float]:
+        """Sends requests through the request signals like the handler does
+
+        Django opens database connections lazily and closes or returns them
+        to the pool when ``request_finished`` is sent.
+        """
+        with override_settings(ASYNC_READ_VIEWS=False):
+            view = RouteViewSet.as_view(
+                {"get": "list"},
+                authentication_classes=(),
+                permission_classes=(),
+                throttle_classes=(),
+            )
+        factory = APIRequestFactory()
+        latencies = []
+
+        for _ in range(requests):
+            request = factory.get("/api/airport/routes/")
+            start = time.perf_counter()
+            request_started.send(sender=self.__class__, environ=request.META)
+            try:
+                view(request).render()
+            finally:
+                request_finished.send(sender=self.__class__)
+            latencies.append(time.perf_counter() - start)
+
+        return latencies
+
+    def run_worker(self, mode: str, requests: int) -> list[float]:
+        result = subprocess.run(
+            [
+                sys.executable,
+                "manage.py",
+                "benchmark_db_connections",
+                "--worker",
+                "--requests",
+                str(requests),
+            ],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "DB_CONNECTION_MODE": mode},
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError(f"{mode}: {result.stderr.strip()}")
+
+        return json.loads(result.stdout)
+
+    def handle(self, *args, **options) -> None:
+        if options["worker"]:
+            self.stdout.write(json.dumps(self.measure(options["requests"])))
+            return
+
+        if options["requests"] < 2:
+            raise CommandError("At least 2 requests are needed")
+
+        if options["mode"] == "all":
+            modes = CONNECTION_MODES
+        else:
+            modes = [options["mode"]]
+
+        for mode in modes:
+            latencies = self.run_worker(mode, options["requests"])
+            first, latencies = latencies[0], sorted(latencies[1:])
+            self.stdout.write(
+                f"{mode}: first={first * 1000:.2f}ms "
+                f"p50={percentile(latencies, 50) * 1000:.2f}ms "
+                f"p95={percentile(latencies, 95) * 1000:.2f}ms "
+                f"p99={percentile(latencies, 99) * 1000:.2f}ms"
+            )
@@ -0,0 +1,135 @@
+import itertools
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from airport import models
+from airport.serializers import OrderSerializer
+
+
+def create_per_ticket(serializer, user):
+    """Order creation as it worked before set-based booking"""
+    tickets_data = list(serializer.validated_data["tickets"])
+    with transaction.atomic():
+        order = models.Order.objects.create(user=user)
+        for ticket_data in tickets_data:
+            models.Ticket.objects.filter(
+                flight=ticket_data["flight"],
+                row=ticket_data["row"],
+                seat=ticket_data["seat"],
+            ).exists()
+            # Inventory is recounted by the Ticket post_save signal
+            models.Ticket.objects.create(order=order, **ticket_data)
+    return order
+
+
+def create_set_based(serializer, user):
+    return serializer.save(user=user)
+
+
+STRATEGIES = {
+    "per-ticket": create_per_ticket,
+    "set-based": create_set_based,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares query count and latency of per-ticket and set-based "
+        "order creation. All data is created inside a rolled back "
+        "transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--group-sizes",
+            default="1,9,50",
+            help="Comma separated numbers of tickets per order",
+        )
+        parser.add_argument(
+            "--repeats",
+            type=int,
+            default=20,
+            help="Orders created per strategy and group size",
+        )
+
+    def seed(self, seats_needed: int):
+        country = models.Country.objects.create(name="Benchmark country")
+        city = models.City.objects.create(name="Benchmark", country=country)
+        source = models.Airport.objects.create(name="Source", city=city)
+        destination = models.Airport.objects.create(
+            name="Destination", city=city
+        )
+        route = models.Route.objects.create(
+            source=source, destination=destination, distance=1000
+        )
+        airplane_type = models.AirplaneType.objects.create(
+            name="Benchmark airplane type"
+        )
+        seats_in_row = 10
+        airplane = models.Airplane.objects.create(
+            name="Benchmark airplane",
+            airplane_type=airplane_type,
+            rows=seats_needed // seats_in_row + 1,
+            seats_in_row=seats_in_row,
+        )
+        flight = models.Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time="2030-01-01 12:00:00",
+            arrival_time="2030-01-01 15:00:00",
+        )
+        user = get_user_model().objects.create_user(
+            "benchmark-order-creation@example.com"
+        )
+        return flight, user, seats_in_row
+
+    def handle(self, *args, **options) -> None:
+        group_sizes = [
+            int(size) for size in options["group_sizes"].split(",")
+        ]
+        repeats = options["repeats"]
+        seats_needed = sum(group_sizes) * repeats * len(STRATEGIES)
+
+        with transaction.atomic():
+            flight, user, seats_in_row = self.seed(seats_needed)
+            free_seats = (
+                divmod(index, seats_in_row)
+                for index in itertools.count()
+            )
+
+            for group_size in group_sizes:
+                for name, create in STRATEGIES.items():
+                    query_counts = []
+                    timings = []
+
+                    for _ in range(repeats):
+                        payload = {
+                            "tickets": [
+                                {"flight": flight.id, "row": row + 1,
+                                 "seat": seat + 1}
+                                for row, seat in itertools.islice(
+                                    free_seats, group_size
+                                )
+                            ]
+                        }
+                        with CaptureQueriesContext(connection) as queries:
+                            start = time.perf_counter()
+                            serializer = OrderSerializer(data=payload)
+                            serializer.is_valid(raise_exception=True)
+                            create(serializer, user)
+                            timings.append(time.perf_counter() - start)
+                        query_counts.append(len(queries))
+
+                    self.stdout.write(
+                        f"{name:>10} tickets={group_size:<4} "
+                        f"queries={statistics.mean(query_counts):>6.1f} "
+                        f"mean={statistics.mean(timings) * 1000:>8.2f}ms "
+                        f"p50={statistics.median(timings) * 1000:>8.2f}ms"
+                    )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from airport import booking
+
+
+class Command(BaseCommand):
+    help = "Deletes expired seat holds, one transaction per batch"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of holds deleted per transaction",
+        )
+
+    def handle(self, *args, **options) -> None:
+        expired = booking.expire_holds(batch_size=options["batch_size"])
+
+        self.stdout.write(f"Expired seat holds: {expired}")
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from rest_framework.exceptions import ValidationError
+
+from airport import order_export
+from airport.views import parse_departure_bound
+
+
+class Command(BaseCommand):
+    help = "Streams orders as NDJSON or CSV with one line per ticket"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            choices=list(order_export.CONTENT_TYPES),
+            default="ndjson",
+        )
+        parser.add_argument("--user", type=int, help="Id of the user")
+        parser.add_argument(
+            "--created-from", help="Date or datetime of the first order"
+        )
+        parser.add_argument(
+            "--created-to",
+            help="Date (inclusive) or datetime of the last order",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=settings.EXPORT_CHUNK_SIZE
+        )
+        parser.add_argument(
+            "--file", help="Write to the file instead of stdout"
+        )
+
+    def handle(self, *args, **options) -> None:
+        bounds = QueryDict(mutable=True)
+        for name in ("created_from", "created_to"):
+            if options[name]:
+                bounds[name] = options[name]
+
+        try:
+            created_from, _ = parse_departure_bound(bounds, "created_from")
+            created_to, whole_day = parse_departure_bound(
+                bounds, "created_to"
+            )
+        except ValidationError as error:
+            raise CommandError(error.detail)
+
+        tickets = order_export.filter_tickets(
+            user_id=options["user"],
+            created_from=created_from,
+            created_to=created_to,
+            whole_day=whole_day,
+        )
+        lines = order_export.render(
+            tickets, options["output"], chunk_size=options["chunk_size"]
+        )
+
+        if options["file"]:
+            with open(options["file"], "w", newline="") as file:
+                file.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from airport import order_queue
+
+
+class Command(BaseCommand):
+    help = (
+        "Settles queued order requests, one transaction per flight. "
+        "Runs until stopped unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Maximum number of requests settled per flight and pass",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the queue is empty",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue once and exit",
+        )
+
+    def handle(self, *args, **options) -> None:
+        while True:
+            outcomes = order_queue.process_pending(
+                limit=options["batch_size"]
+            )
+            if outcomes:
+                self.stdout.write(
+                    ", ".join(
+                        f"{outcome}: {count}"
+                        for outcome, count in sorted(outcomes.items())
+                    )
+                )
+
+            if options["once"]:
+                return
+            if not outcomes:
+                time.sleep(options["interval"])
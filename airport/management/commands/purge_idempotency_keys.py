@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from airport import idempotency
+
+
+class Command(BaseCommand):
+    help = "Deletes expired idempotency keys in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of keys deleted per query",
+        )
+
+    def handle(self, *args, **options) -> None:
+        purged = idempotency.purge_expired(batch_size=options["batch_size"])
+
+        self.stdout.write(f"Purged idempotency keys: {purged}")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from airport import counters
+
+
+class Command(BaseCommand):
+    help = "Deletes expired shared counters, e.g. of past throttle windows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of counters deleted per query",
+        )
+
+    def handle(self, *args, **options) -> None:
+        purged = counters.purge_expired(batch_size=options["batch_size"])
+
+        self.stdout.write(f"Purged shared counters: {purged}")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from airport import search
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the denormalized flight search table from scratch"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of flights written per insert",
+        )
+
+    def handle(self, *args, **options) -> None:
+        with transaction.atomic():
+            rebuilt = search.rebuild(batch_size=options["batch_size"])
+
+        self.stdout.write(f"Rebuilt search rows: {rebuilt}")
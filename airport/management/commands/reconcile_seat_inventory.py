@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from airport import models, search
+
+
+class Command(BaseCommand):
+    help = (
+        "Repairs Flight.seats_sold counters and seat maps that drifted "
+        "from the tickets"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drifted flights without updating them",
+        )
+        parser.add_argument(
+            "--rebuild-seat-maps",
+            action="store_true",
+            help="Rebuild seat maps of all flights, not only drifted ones",
+        )
+
+    def handle(self, *args, **options) -> None:
+        sold = (
+            models.Ticket.objects.filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+
+        with transaction.atomic():
+            flights = (
+                models.Flight.objects.select_for_update(of=("self",))
+                .select_related("airplane")
+                .annotate(actual_seats_sold=Coalesce(Subquery(sold), 0))
+                .defer("seat_map")
+            )
+            if not options["rebuild_seat_maps"]:
+                flights = flights.exclude(seats_sold=F("actual_seats_sold"))
+
+            flights = list(flights)
+            drifted = []
+            for flight in flights:
+                if flight.seats_sold != flight.actual_seats_sold:
+                    self.stdout.write(
+                        f"Flight {flight.id}: "
+                        f"{flight.seats_sold} -> {flight.actual_seats_sold}"
+                    )
+                    drifted.append(flight)
+
+                flight.seats_sold = flight.actual_seats_sold
+                flight.seat_map = None  # forces a rebuild from the tickets
+                flight.seat_map = flight.get_seat_map().to_bytes()
+
+            if not options["dry_run"]:
+                models.Flight.objects.bulk_update(
+                    flights, ["seats_sold", "seat_map"], batch_size=500
+                )
+                search.sync_flights(
+                    models.Flight.objects.filter(
+                        id__in=[flight.id for flight in drifted]
+                    )
+                )
+
+        self.stdout.write(f"Drifted flights: {len(drifted)}")
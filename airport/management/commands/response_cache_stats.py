@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from airport import cache
+from airport import views  # noqa: F401 (registers cached viewsets)
+
+
+class Command(BaseCommand):
+    help = "Shows hit/stale/miss counters of the response cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the counters after printing them",
+        )
+
+    def handle(self, *args, **options) -> None:
+        for namespace in sorted(cache.cached_namespaces):
+            stats = cache.get_stats(namespace)
+            served = stats["hits"] + stats["stale"]
+            requests = served + stats["misses"]
+            hit_ratio = served / requests if requests else 0
+
+            self.stdout.write(
+                f"{namespace}: hits={stats['hits']} "
+                f"stale={stats['stale']} misses={stats['misses']} "
+                f"hit_ratio={hit_ratio:.2%}"
+            )
+
+            if options["reset"]:
+                cache.reset_stats(namespace)
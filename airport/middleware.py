@@ -0,0 +1,103 @@
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from airport import counters, db_routers
+
+
+PIN_KEY = "replica-pin:{user_id}"
+
+
+def get_user_id(request):
+    """Returns id of the user from the JWT or session without a query"""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+
+    if raw_token is not None:
+        try:
+            token = authentication.get_validated_token(raw_token)
+        except InvalidToken:
+            return None
+        return token.get(jwt_settings.USER_ID_CLAIM)
+
+    session = getattr(request, "session", None)
+    if session is not None and request.COOKIES.get(
+        settings.SESSION_COOKIE_NAME
+    ):
+        return session.get(SESSION_KEY)
+
+    return None
+
+
+def pin_to_primary(user_id) -> None:
+    # Kept in the shared counters so that every worker sees the pin
+    counters.store(
+        PIN_KEY.format(user_id=user_id), 1, settings.REPLICA_PIN_TIMEOUT
+    )
+
+
+def is_pinned(user_id) -> bool:
+    return counters.exists(PIN_KEY.format(user_id=user_id))
+
+
+class ReplicaPinningMiddleware:
+    """Sends reads of safe requests to a replica, except after a write.
+
+    A user who sent an unsafe request is pinned to the primary for
+    ``REPLICA_PIN_TIMEOUT`` seconds, longer than the replication lag, so
+    they always read their own writes.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def get_read_alias(self, request) -> str | None:
+        """Returns the replica to read from or None for the primary"""
+        if not settings.DATABASE_REPLICAS:
+            return None
+
+        user_id = get_user_id(request)
+
+        if request.method not in SAFE_METHODS:
+            # Pinned before the write commits so no later read can miss it
+            if user_id is not None:
+                pin_to_primary(user_id)
+            return None
+
+        if user_id is not None and is_pinned(user_id):
+            return None
+
+        return db_routers.choose_replica()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with db_routers.reading_from(self.get_read_alias(request)):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if settings.DATABASE_REPLICAS:
+            # The session and the pins are only accessible synchronously
+            alias = await sync_to_async(self.get_read_alias)(request)
+        else:
+            alias = None
+
+        with db_routers.reading_from(alias):
+            return await self.get_response(request)
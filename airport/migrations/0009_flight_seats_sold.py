@@ -0,0 +1,35 @@
+# Generated by Django 5.1 on 2026-10-17 06:28
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_seats_sold(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+    Ticket = apps.get_model("airport", "Ticket")
+
+    sold = (
+        Ticket.objects.filter(flight=OuterRef("pk"))
+        .order_by()
+        .values("flight")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    Flight.objects.update(seats_sold=Coalesce(Subquery(sold), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0008_alter_flight_crew"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="seats_sold",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_seats_sold, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-17 06:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0009_flight_seats_sold"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="seat_map",
+            field=models.BinaryField(null=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1 on 2026-10-17 06:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0010_flight_seat_map"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["departure_time"], name="flight_departure_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["route", "departure_time"], name="flight_route_departure_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="route",
+            index=models.Index(
+                fields=["source", "destination"], name="route_source_destination_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,120 @@
+# Generated by Django 5.1 on 2026-10-17 06:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+
+
+def endpoint_values(endpoint):
+    airport = f"route__{endpoint}"
+    return {
+        f"{endpoint}_airport_id": F(f"{airport}_id"),
+        f"{endpoint}_airport_name": F(f"{airport}__name"),
+        f"{endpoint}_city_id": F(f"{airport}__city_id"),
+        f"{endpoint}_city_name": Coalesce(
+            F(f"{airport}__city__name"), Value("")
+        ),
+        f"{endpoint}_country_id": F(f"{airport}__city__country_id"),
+        f"{endpoint}_country_name": Coalesce(
+            F(f"{airport}__city__country__name"), Value("")
+        ),
+    }
+
+
+def populate_flight_search(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+    FlightSearch = apps.get_model("airport", "FlightSearch")
+
+    capacity = F("airplane__rows") * F("airplane__seats_in_row")
+    flights = Flight.objects.order_by("id").values(
+        "departure_time",
+        "arrival_time",
+        flight_id=F("id"),
+        capacity=capacity,
+        tickets_available=capacity - F("seats_sold"),
+        **endpoint_values("source"),
+        **endpoint_values("destination"),
+    )
+
+    rows = []
+    for values in flights.iterator(chunk_size=500):
+        rows.append(FlightSearch(**values))
+        if len(rows) == 500:
+            FlightSearch.objects.bulk_create(rows)
+            rows = []
+    FlightSearch.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0011_flight_route_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FlightSearch",
+            fields=[
+                (
+                    "flight",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_row",
+                        serialize=False,
+                        to="airport.flight",
+                    ),
+                ),
+                ("source_airport_id", models.BigIntegerField(null=True)),
+                ("source_airport_name", models.CharField(blank=True, max_length=255)),
+                ("source_city_id", models.BigIntegerField(null=True)),
+                ("source_city_name", models.CharField(blank=True, max_length=255)),
+                ("source_country_id", models.BigIntegerField(null=True)),
+                ("source_country_name", models.CharField(blank=True, max_length=255)),
+                ("destination_airport_id", models.BigIntegerField(null=True)),
+                (
+                    "destination_airport_name",
+                    models.CharField(blank=True, max_length=255),
+                ),
+                ("destination_city_id", models.BigIntegerField(null=True)),
+                ("destination_city_name", models.CharField(blank=True, max_length=255)),
+                ("destination_country_id", models.BigIntegerField(null=True)),
+                (
+                    "destination_country_name",
+                    models.CharField(blank=True, max_length=255),
+                ),
+                ("departure_time", models.DateTimeField()),
+                ("arrival_time", models.DateTimeField()),
+                ("capacity", models.IntegerField()),
+                ("tickets_available", models.IntegerField()),
+            ],
+            options={
+                "ordering": ("departure_time", "flight"),
+                "indexes": [
+                    models.Index(
+                        fields=["departure_time", "flight"], name="search_departure_idx"
+                    ),
+                    models.Index(
+                        fields=["source_airport_id", "departure_time"],
+                        name="search_source_airport_idx",
+                    ),
+                    models.Index(
+                        fields=["destination_airport_id", "departure_time"],
+                        name="search_destination_airport_idx",
+                    ),
+                    models.Index(
+                        fields=["source_city_id", "departure_time"],
+                        name="search_source_city_idx",
+                    ),
+                    models.Index(
+                        fields=["destination_city_id", "departure_time"],
+                        name="search_destination_city_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(
+            populate_flight_search, migrations.RunPython.noop
+        ),
+    ]
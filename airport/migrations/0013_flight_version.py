@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-17 06:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0012_flightsearch"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="version",
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
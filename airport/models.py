@@ -2,10 +2,13 @@ import os
 import uuid
 
 from django.db import models
+from django.db.models import F
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils.text import slugify
 
+from airport.seatmap import SeatMap
+
 
 class AirplaneType(models.Model):
     name = models.CharField(unique=True, max_length=255)
@@ -24,6 +27,15 @@ class Airplane(models.Model):
         related_name="airplanes",
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_cabin = (
+            instance.__dict__.get("rows"),
+            instance.__dict__.get("seats_in_row"),
+        )
+        return instance
+
     @property
     def capacity(self) -> int:
         return self.rows * self.seats_in_row
@@ -89,6 +101,14 @@ class Route(models.Model):
     def __str__(self) -> str:
         return self.source.name + " - " + self.destination.name
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["source", "destination"],
+                name="route_source_destination_idx",
+            ),
+        ]
+
 
 class Crew(models.Model):
     first_name = models.CharField(max_length=255)
@@ -102,6 +122,16 @@ class Crew(models.Model):
         return self.full_name
 
 
+class FlightQuerySet(models.QuerySet):
+    def with_tickets_available(self):
+        return self.annotate(
+            tickets_available=(
+                F("airplane__rows") * F("airplane__seats_in_row")
+                - F("seats_sold")
+            )
+        )
+
+
 class Flight(models.Model):
     crew = models.ManyToManyField(Crew, blank=True)
     route = models.ForeignKey(
@@ -116,10 +146,154 @@ class Flight(models.Model):
     )
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
+    seats_sold = models.PositiveIntegerField(default=0, editable=False)
+    seat_map = models.BinaryField(null=True)
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    objects = FlightQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_airplane_id = instance.__dict__.get("airplane_id")
+        return instance
+
+    def get_seat_map(self) -> SeatMap:
+        """Returns the stored seat map, rebuilding it from tickets if needed"""
+        airplane = self.airplane
+        size = SeatMap.size_in_bytes(airplane.rows, airplane.seats_in_row)
+
+        if self.seat_map is not None and len(self.seat_map) == size:
+            return SeatMap(airplane.rows, airplane.seats_in_row, self.seat_map)
+
+        # Tickets sold before the cabin was resized may not fit it anymore
+        return SeatMap.from_seats(
+            airplane.rows,
+            airplane.seats_in_row,
+            self.tickets.filter(
+                row__gte=1,
+                row__lte=airplane.rows,
+                seat__gte=1,
+                seat__lte=airplane.seats_in_row,
+            ).values_list("row", "seat"),
+        )
+
+    def save(self, *args, **kwargs):
+        if self._state.adding or args or "update_fields" in kwargs:
+            return super().save(*args, **kwargs)
+
+        # Inventory fields are changed with atomic UPDATEs while booking
+        # and must not be written back from a possibly stale instance
+        update_fields = {
+            field.name
+            for field in self._meta.concrete_fields
+            if not field.primary_key
+            and field.name not in ("seats_sold", "seat_map", "version")
+        }
+
+        loaded_airplane_id = getattr(self, "_loaded_airplane_id", None)
+        if loaded_airplane_id != self.airplane_id:
+            self.seat_map = None
+            update_fields.add("seat_map")
+
+        self.version = F("version") + 1
+        update_fields.add("version")
+
+        super().save(update_fields=update_fields, **kwargs)
+
+        self._loaded_airplane_id = self.airplane_id
+        self.refresh_from_db(fields=["version"])
 
     def __str__(self) -> str:
         return f"{self.route} ({self.departure_time})"
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["departure_time"],
+                name="flight_departure_time_idx",
+            ),
+            models.Index(
+                fields=["route", "departure_time"],
+                name="flight_route_departure_idx",
+            ),
+        ]
+
+
+class FlightSearch(models.Model):
+    """Denormalized flight row used by flight search (see airport.search)"""
+
+    flight = models.OneToOneField(
+        Flight,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="search_row",
+    )
+    source_airport_id = models.BigIntegerField(null=True)
+    source_airport_name = models.CharField(max_length=255, blank=True)
+    source_city_id = models.BigIntegerField(null=True)
+    source_city_name = models.CharField(max_length=255, blank=True)
+    source_country_id = models.BigIntegerField(null=True)
+    source_country_name = models.CharField(max_length=255, blank=True)
+    destination_airport_id = models.BigIntegerField(null=True)
+    destination_airport_name = models.CharField(max_length=255, blank=True)
+    destination_city_id = models.BigIntegerField(null=True)
+    destination_city_name = models.CharField(max_length=255, blank=True)
+    destination_country_id = models.BigIntegerField(null=True)
+    destination_country_name = models.CharField(max_length=255, blank=True)
+    departure_time = models.DateTimeField()
+    arrival_time = models.DateTimeField()
+    capacity = models.IntegerField()
+    tickets_available = models.IntegerField()
+
+    def __str__(self) -> str:
+        return (
+            f"{self.source_airport_name} - {self.destination_airport_name}"
+            f" ({self.departure_time})"
+        )
+
+    class Meta:
+        ordering = ("departure_time", "flight")
+        indexes = [
+            models.Index(
+                fields=["departure_time", "flight"],
+                name="search_departure_idx",
+            ),
+            models.Index(
+                fields=["source_airport_id", "departure_time"],
+                name="search_source_airport_idx",
+            ),
+            models.Index(
+                fields=["destination_airport_id", "departure_time"],
+                name="search_destination_airport_idx",
+            ),
+            models.Index(
+                fields=["source_city_id", "departure_time"],
+                name="search_source_city_idx",
+            ),
+            models.Index(
+                fields=["destination_city_id", "departure_time"],
+                name="search_destination_city_idx",
+            ),
+        ]
+
+
+class OrderQuerySet(models.QuerySet):
+    def with_ticket_flights(self):
+        """Prefetches tickets and their flights with availability
+
+        Takes two queries for any number of orders: one for tickets and one
+        for the distinct flights joined with route endpoints.
+        """
+        return self.prefetch_related(
+            models.Prefetch("tickets", queryset=Ticket.objects.order_by("id")),
+            models.Prefetch(
+                "tickets__flight",
+                queryset=Flight.objects.with_tickets_available()
+                .select_related("route__source", "route__destination"),
+            ),
+        )
+
 
 class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -128,6 +302,8 @@ class Order(models.Model):
         on_delete=models.CASCADE,
     )
 
+    objects = OrderQuerySet.as_manager()
+
     def __str__(self) -> str:
         return str(self.created_at)
 
@@ -146,6 +322,12 @@ class Ticket(models.Model):
         related_name="tickets",
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_flight_id = instance.__dict__.get("flight_id")
+        return instance
+
     def __str__(self) -> str:
         return f"{self.flight} (row: {self.row}, seat: {self.seat})"
 
@@ -189,3 +371,114 @@ class Ticket(models.Model):
 
     class Meta:
         unique_together = ("flight", "seat", "row")
+
+
+class SeatHold(models.Model):
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds",
+    )
+
+    def __str__(self) -> str:
+        return f"Hold of {self.user} until {self.expires_at}"
+
+
+class HeldSeat(models.Model):
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    flight = models.ForeignKey(
+        Flight,
+        on_delete=models.CASCADE,
+        related_name="held_seats",
+    )
+    hold = models.ForeignKey(
+        SeatHold,
+        on_delete=models.CASCADE,
+        related_name="seats",
+    )
+
+    def __str__(self) -> str:
+        return f"{self.flight} (row: {self.row}, seat: {self.seat})"
+
+    class Meta:
+        unique_together = ("flight", "seat", "row")
+
+
+class IdempotencyKey(models.Model):
+    """Stored response of a create request sent with an Idempotency-Key"""
+
+    key = models.CharField(max_length=255)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys",
+    )
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response_body = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self) -> str:
+        return self.key
+
+    class Meta:
+        unique_together = ("user", "key")
+
+
+class OrderRequest(models.Model):
+    """Queued order settled later by the process_order_requests command"""
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        COMPLETED = "completed"
+        REJECTED = "rejected"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="order_requests",
+    )
+    flight = models.ForeignKey(
+        Flight,
+        on_delete=models.CASCADE,
+        related_name="order_requests",
+    )
+    tickets = models.JSONField()
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.PENDING
+    )
+    order = models.OneToOneField(
+        Order,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="request",
+    )
+    errors = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True)
+
+    def __str__(self) -> str:
+        return f"Order request {self.id} ({self.status})"
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "flight", "id"],
+                name="order_request_queue_idx",
+            ),
+        ]
+
+
+class SharedCounter(models.Model):
+    """Expiring counter shared by all workers (see airport.counters)"""
+
+    key = models.CharField(max_length=255, unique=True)
+    count = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self) -> str:
+        return f"{self.key}: {self.count}"
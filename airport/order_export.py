@@ -0,0 +1,98 @@
+"""Streaming export of orders as NDJSON or CSV, one row per ticket.
+
+Rows are read with a server-side cursor in chunks and rendered lazily, so
+memory use does not depend on the number of exported tickets.
+"""
+import csv
+import json
+from datetime import datetime, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from airport import models
+
+
+EXPORT_COLUMNS = {
+    "order_id": "order_id",
+    "order_created_at": "order__created_at",
+    "user_id": "order__user_id",
+    "user_email": "order__user__email",
+    "ticket_id": "id",
+    "flight_id": "flight_id",
+    "row": "row",
+    "seat": "seat",
+    "source": "flight__route__source__name",
+    "destination": "flight__route__destination__name",
+    "departure_time": "flight__departure_time",
+    "arrival_time": "flight__arrival_time",
+}
+
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def filter_tickets(
+    user_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    whole_day: bool = False,
+):
+    """Returns tickets of orders matching the filters, ordered by order
+
+    With ``whole_day`` the ``created_to`` bound includes its whole day.
+    """
+    tickets = models.Ticket.objects.order_by("order_id", "id")
+
+    if user_id is not None:
+        tickets = tickets.filter(order__user_id=user_id)
+    if created_from:
+        tickets = tickets.filter(order__created_at__gte=created_from)
+    if created_to and whole_day:
+        tickets = tickets.filter(
+            order__created_at__lt=created_to + timedelta(days=1)
+        )
+    elif created_to:
+        tickets = tickets.filter(order__created_at__lte=created_to)
+
+    return tickets
+
+
+def iter_rows(tickets, chunk_size: int = 2000):
+    for values in tickets.values_list(*EXPORT_COLUMNS.values()).iterator(
+        chunk_size=chunk_size
+    ):
+        yield dict(zip(EXPORT_COLUMNS, values))
+
+
+class _Echo:
+    """File-like object handing rows written by csv.writer back"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def render_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+def render_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow(
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in row.values()
+        )
+
+
+RENDERERS = {
+    "ndjson": render_ndjson,
+    "csv": render_csv,
+}
+
+
+def render(tickets, output: str, chunk_size: int = 2000):
+    return RENDERERS[output](iter_rows(tickets, chunk_size=chunk_size))
@@ -0,0 +1,156 @@
+"""Database-backed queue of orders settled outside of the HTTP request.
+
+Requests sent with a ``Prefer: respond-async`` header are validated and
+stored as pending OrderRequest rows. The process_order_requests command
+drains them grouped by flight, settling every group in one transaction in
+the order the requests arrived.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+
+from airport import booking, models, serializers
+
+
+def prefers_async(request) -> bool:
+    preferences = request.headers.get("Prefer", "")
+    return any(
+        preference.split(";")[0].strip().lower() == "respond-async"
+        for preference in preferences.split(",")
+    )
+
+
+def enqueue(user, tickets_data) -> models.OrderRequest:
+    return models.OrderRequest.objects.create(
+        user=user,
+        flight_id=min(ticket["flight"].id for ticket in tickets_data),
+        tickets=[
+            {
+                "flight": ticket["flight"].id,
+                "row": ticket["row"],
+                "seat": ticket["seat"],
+            }
+            for ticket in tickets_data
+        ],
+    )
+
+
+def _settle(order_request, flights) -> None:
+    missing = {
+        ticket["flight"]
+        for ticket in order_request.tickets
+        if ticket["flight"] not in flights
+    }
+    if missing:
+        raise ValidationError(
+            {"tickets": [f"Flight {flight_id} does not exist."
+                         for flight_id in sorted(missing)]}
+        )
+
+    order = models.Order.objects.create(user_id=order_request.user_id)
+    booking.book_tickets(
+        order,
+        [
+            {**ticket, "flight": flights[ticket["flight"]]}
+            for ticket in order_request.tickets
+        ],
+    )
+    order_request.order = order
+
+
+def settle_flight(flight_id: int, limit: int = 500) -> Counter:
+    """Settles pending requests of a flight in one transaction
+
+    Requests locked by another worker are skipped. A rejected request is
+    rolled back to its savepoint and does not affect the others.
+    """
+    outcomes = Counter()
+
+    with transaction.atomic():
+        order_requests = list(
+            models.OrderRequest.objects.select_for_update(skip_locked=True)
+            .filter(
+                status=models.OrderRequest.Status.PENDING,
+                flight_id=flight_id,
+            )
+            .order_by("id")[:limit]
+        )
+        flights = models.Flight.objects.select_related("airplane").in_bulk(
+            {
+                ticket["flight"]
+                for order_request in order_requests
+                for ticket in order_request.tickets
+            }
+        )
+        now = timezone.now()
+
+        for order_request in order_requests:
+            try:
+                with transaction.atomic():
+                    _settle(order_request, flights)
+            except booking.BookingConflict:
+                # Stays pending and is retried by the next pass
+                continue
+            except ValidationError as error:
+                order_request.status = models.OrderRequest.Status.REJECTED
+                order_request.errors = error.detail
+            else:
+                order_request.status = models.OrderRequest.Status.COMPLETED
+            order_request.processed_at = now
+            outcomes[order_request.status] += 1
+
+        models.OrderRequest.objects.bulk_update(
+            order_requests, ["status", "order", "errors", "processed_at"]
+        )
+
+    return outcomes
+
+
+def process_pending(limit: int = 500) -> Counter:
+    """Settles up to ``limit`` pending requests per flight, oldest first"""
+    flight_ids = dict.fromkeys(
+        models.OrderRequest.objects.filter(
+            status=models.OrderRequest.Status.PENDING
+        )
+        .order_by("id")
+        .values_list("flight_id", flat=True)[:limit]
+    )
+
+    outcomes = Counter()
+    for flight_id in flight_ids:
+        outcomes.update(settle_flight(flight_id, limit=limit))
+
+    return outcomes
+
+
+class QueuedOrderCreateMixin:
+    """Queues validated orders when the client prefers ``respond-async``"""
+
+    def create(self, request, *args, **kwargs):
+        if not prefers_async(request):
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        order_request = enqueue(
+            request.user, serializer.validated_data["tickets"]
+        )
+
+        return Response(
+            serializers.OrderRequestSerializer(order_request).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={
+                "Location": reverse(
+                    "airport:orderrequest-detail",
+                    args=[order_request.id],
+                    request=request,
+                ),
+                "Preference-Applied": "respond-async",
+            },
+        )
@@ -0,0 +1,204 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """Page number pagination which async views can run on the event loop.
+
+    ``apaginate_queryset`` counts with ``acount()`` and iterates the sliced
+    page asynchronously, the Django paginator only does the arithmetic.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Set before anything reads it, so the paginator never counts
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+
+        try:
+            number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            raise NotFound(
+                self.invalid_page_message.format(
+                    page_number=page_number, message=str(exc)
+                )
+            )
+
+        bottom = (number - 1) * page_size
+        top = bottom + page_size
+        if top + paginator.orphans >= paginator.count:
+            top = paginator.count
+        self.page = paginator._get_page(
+            [item async for item in queryset[bottom:top]], number, paginator
+        )
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        return list(self.page)
+
+
+class DepartureKeysetPagination(BasePagination):
+    """Cursor pagination keyed on ``(departure_time, pk)``.
+
+    Each page seeks past the last seen key instead of using OFFSET, so deep
+    pages cost the same as the first one and no COUNT(*) query is issued.
+    The cursor is an opaque token which encodes the boundary key and the
+    paging direction.
+    """
+
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+
+        return min(page_size, self.max_page_size)
+
+    def encode_cursor(self, item, reverse: bool) -> str:
+        payload = {
+            "t": item.departure_time.isoformat(),
+            "id": item.pk,
+            "r": int(reverse),
+        }
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode()
+        )
+        cursor = encoded.decode("ascii").rstrip("=")
+
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, cursor
+        )
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+            departure_time = datetime.fromisoformat(payload["t"])
+            pk = int(payload["id"])
+            reverse = bool(payload["r"])
+        except (
+            binascii.Error,
+            ValueError,
+            TypeError,
+            KeyError,
+            UnicodeDecodeError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        return departure_time, pk, reverse
+
+    def get_page_queryset(self, queryset, request):
+        """Returns the queryset of the page and one item past it"""
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        self.reverse = False
+
+        if self.cursor is not None:
+            departure_time, pk, self.reverse = self.cursor
+            if self.reverse:
+                queryset = queryset.filter(
+                    departure_time__lte=departure_time
+                ).filter(Q(departure_time__lt=departure_time) | Q(pk__lt=pk))
+            else:
+                queryset = queryset.filter(
+                    departure_time__gte=departure_time
+                ).filter(Q(departure_time__gt=departure_time) | Q(pk__gt=pk))
+
+        if self.reverse:
+            queryset = queryset.order_by("-departure_time", "-pk")
+        else:
+            queryset = queryset.order_by("departure_time", "pk")
+
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if self.reverse:
+            results.reverse()
+            self.has_next = self.cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = results
+
+        return results
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(
+            list(self.get_page_queryset(queryset, request))
+        )
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return self.set_page(
+            [item async for item in self.get_page_queryset(queryset, request)]
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
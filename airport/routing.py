@@ -0,0 +1,176 @@
+import heapq
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+from airport import models
+
+
+class RouteNetwork:
+    """Cached shortest-path index over the Route graph.
+
+    Shortest distances (Dijkstra) and hop counts (BFS) are computed on
+    demand per source airport and cached. Airports are grouped into weakly
+    connected components, so a new route only invalidates cached results of
+    sources inside the components it touches. Route updates and deletes
+    drop the whole index, and it is also rebuilt after
+    ``ROUTE_NETWORK_TTL`` seconds to pick up writes of other processes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._edges: dict[int, dict[int, tuple[int, int]]] | None = None
+            self._parents: dict[int, int] = {}
+            self._members: dict[int, set[int]] = {}
+            self._distances: dict[int, tuple[dict, dict]] = {}
+            self._hops: dict[int, dict[int, int]] = {}
+            self._built_at = None
+
+    def _find(self, airport_id: int) -> int:
+        parent = self._parents.setdefault(airport_id, airport_id)
+        if parent == airport_id:
+            self._members.setdefault(airport_id, {airport_id})
+            return airport_id
+
+        root = self._find(parent)
+        self._parents[airport_id] = root
+        return root
+
+    def _union(self, first_id: int, second_id: int) -> None:
+        first_root, second_root = self._find(first_id), self._find(second_id)
+        if first_root == second_root:
+            return
+
+        if len(self._members[first_root]) < len(self._members[second_root]):
+            first_root, second_root = second_root, first_root
+        self._parents[second_root] = first_root
+        self._members[first_root] |= self._members.pop(second_root)
+
+    def _add_edge(self, source_id, destination_id, distance, route_id):
+        destinations = self._edges.setdefault(source_id, {})
+        current = destinations.get(destination_id)
+        if current is None or distance < current[0]:
+            destinations[destination_id] = (distance, route_id)
+        self._union(source_id, destination_id)
+
+    def _ensure_built(self) -> None:
+        ttl = settings.ROUTE_NETWORK_TTL
+        if self._edges is not None and (
+            time.monotonic() - self._built_at <= ttl
+        ):
+            return
+
+        self.invalidate()
+        self._edges = {}
+        for route_id, source_id, destination_id, distance in (
+            models.Route.objects.filter(
+                source__isnull=False, destination__isnull=False
+            ).values_list("id", "source_id", "destination_id", "distance")
+        ):
+            self._add_edge(source_id, destination_id, distance, route_id)
+        self._built_at = time.monotonic()
+
+    def add_route(self, route: models.Route) -> None:
+        """Adds an edge, invalidating only the components it touches"""
+        if route.source_id is None or route.destination_id is None:
+            return
+
+        with self._lock:
+            if self._edges is None:
+                return
+
+            affected = self._members.get(
+                self._find(route.source_id), set()
+            ) | self._members.get(self._find(route.destination_id), set())
+            for airport_id in affected:
+                self._distances.pop(airport_id, None)
+                self._hops.pop(airport_id, None)
+
+            self._add_edge(
+                route.source_id,
+                route.destination_id,
+                route.distance,
+                route.id,
+            )
+
+    def _shortest_distances(self, source_id: int) -> tuple[dict, dict]:
+        if source_id in self._distances:
+            return self._distances[source_id]
+
+        distances = {source_id: 0}
+        previous = {}
+        queue = [(0, source_id)]
+        while queue:
+            distance, airport_id = heapq.heappop(queue)
+            if distance > distances[airport_id]:
+                continue
+            for destination_id, (edge_distance, route_id) in self._edges.get(
+                airport_id, {}
+            ).items():
+                candidate = distance + edge_distance
+                if candidate < distances.get(destination_id, candidate + 1):
+                    distances[destination_id] = candidate
+                    previous[destination_id] = (airport_id, route_id)
+                    heapq.heappush(queue, (candidate, destination_id))
+
+        self._distances[source_id] = distances, previous
+        return distances, previous
+
+    def _hop_counts(self, source_id: int) -> dict[int, int]:
+        if source_id in self._hops:
+            return self._hops[source_id]
+
+        hops = {source_id: 0}
+        queue = deque([source_id])
+        while queue:
+            airport_id = queue.popleft()
+            for destination_id in self._edges.get(airport_id, {}):
+                if destination_id not in hops:
+                    hops[destination_id] = hops[airport_id] + 1
+                    queue.append(destination_id)
+
+        self._hops[source_id] = hops
+        return hops
+
+    def shortest_path(self, source_id: int, destination_id: int):
+        """Returns ``(distance, airport_ids, route_ids)`` or None"""
+        with self._lock:
+            self._ensure_built()
+            distances, previous = self._shortest_distances(source_id)
+
+        if destination_id not in distances:
+            return None
+
+        airport_ids = [destination_id]
+        route_ids = []
+        while airport_ids[-1] != source_id:
+            airport_id, route_id = previous[airport_ids[-1]]
+            airport_ids.append(airport_id)
+            route_ids.append(route_id)
+
+        return (
+            distances[destination_id],
+            airport_ids[::-1],
+            route_ids[::-1],
+        )
+
+    def reachable(self, source_id: int, max_hops: int) -> dict[int, int]:
+        """Returns hop counts of airports reachable within ``max_hops``"""
+        with self._lock:
+            self._ensure_built()
+            hops = self._hop_counts(source_id)
+
+        return {
+            airport_id: count
+            for airport_id, count in hops.items()
+            if 0 < count <= max_hops
+        }
+
+
+route_network = RouteNetwork()
@@ -0,0 +1,92 @@
+"""Maintenance of the denormalized FlightSearch read model.
+
+Every flight has one FlightSearch row holding its route endpoints, times
+and seat availability, so flight search is a single-table indexed scan
+instead of a join over routes, airports, cities and airplanes.
+"""
+from django.db.models import F
+
+from airport import models
+
+
+SEARCH_ROW_VALUES = {
+    "source_airport_id": F("route__source_id"),
+    "source_airport_name": F("route__source__name"),
+    "source_city_id": F("route__source__city_id"),
+    "source_city_name": F("route__source__city__name"),
+    "source_country_id": F("route__source__city__country_id"),
+    "source_country_name": F("route__source__city__country__name"),
+    "destination_airport_id": F("route__destination_id"),
+    "destination_airport_name": F("route__destination__name"),
+    "destination_city_id": F("route__destination__city_id"),
+    "destination_city_name": F("route__destination__city__name"),
+    "destination_country_id": F("route__destination__city__country_id"),
+    "destination_country_name": F(
+        "route__destination__city__country__name"
+    ),
+    "capacity": F("airplane__rows") * F("airplane__seats_in_row"),
+    "search_tickets_available": (
+        F("airplane__rows") * F("airplane__seats_in_row") - F("seats_sold")
+    ),
+}
+
+UPDATE_FIELDS = [
+    *[name for name in SEARCH_ROW_VALUES if name.endswith(("_id", "_name"))],
+    "departure_time",
+    "arrival_time",
+    "capacity",
+    "tickets_available",
+]
+
+
+def _build_rows(flights) -> list[models.FlightSearch]:
+    rows = []
+    for values in flights.values(
+        "id", "departure_time", "arrival_time", **SEARCH_ROW_VALUES
+    ):
+        flight_id = values.pop("id")
+        values["tickets_available"] = values.pop("search_tickets_available")
+        for name, value in values.items():
+            if name.endswith("_name") and value is None:
+                values[name] = ""
+        rows.append(models.FlightSearch(flight_id=flight_id, **values))
+    return rows
+
+
+def sync_flights(flights, batch_size: int = 500) -> int:
+    """Creates or refreshes search rows of the given Flight queryset"""
+    synced = 0
+    flight_ids = list(flights.order_by().values_list("id", flat=True))
+
+    for start in range(0, len(flight_ids), batch_size):
+        rows = _build_rows(
+            models.Flight.objects.filter(
+                id__in=flight_ids[start:start + batch_size]
+            )
+        )
+        models.FlightSearch.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["flight"],
+            update_fields=UPDATE_FIELDS,
+        )
+        synced += len(rows)
+
+    return synced
+
+
+def sell_seats(flight_id: int, sold: int) -> None:
+    models.FlightSearch.objects.filter(flight_id=flight_id).update(
+        tickets_available=F("tickets_available") - sold
+    )
+
+
+def set_seats_sold(flight_id: int, seats_sold: int) -> None:
+    models.FlightSearch.objects.filter(flight_id=flight_id).update(
+        tickets_available=F("capacity") - seats_sold
+    )
+
+
+def rebuild(batch_size: int = 500) -> int:
+    models.FlightSearch.objects.all().delete()
+    return sync_flights(models.Flight.objects.all(), batch_size=batch_size)
@@ -0,0 +1,84 @@
+import base64
+
+
+class SeatMap:
+    """Occupancy bitset of a flight cabin.
+
+    Seat ``(row, seat)`` is stored in bit
+    ``(row - 1) * seats_in_row + (seat - 1)``. Bits are packed into bytes
+    most significant bit first, so the first byte holds seats 1-8 of row 1.
+    """
+
+    def __init__(self, rows: int, seats_in_row: int, data=None) -> None:
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+
+        size = self.size_in_bytes(rows, seats_in_row)
+        if data is None:
+            data = bytes(size)
+        if len(data) != size:
+            raise ValueError(
+                f"Seat map must be {size} bytes long, got {len(data)}"
+            )
+        self.data = bytearray(data)
+
+    @staticmethod
+    def size_in_bytes(rows: int, seats_in_row: int) -> int:
+        return (rows * seats_in_row + 7) // 8
+
+    @classmethod
+    def from_seats(cls, rows: int, seats_in_row: int, seats) -> "SeatMap":
+        seat_map = cls(rows, seats_in_row)
+        for row, seat in seats:
+            seat_map.take(row, seat)
+        return seat_map
+
+    @property
+    def capacity(self) -> int:
+        return self.rows * self.seats_in_row
+
+    @property
+    def taken_count(self) -> int:
+        return sum(byte.bit_count() for byte in self.data)
+
+    def _bit(self, row: int, seat: int) -> tuple[int, int]:
+        if not (1 <= row <= self.rows and 1 <= seat <= self.seats_in_row):
+            raise ValueError(f"Seat ({row}, {seat}) is out of the cabin")
+        index = (row - 1) * self.seats_in_row + (seat - 1)
+        return index >> 3, 0x80 >> (index & 7)
+
+    def take(self, row: int, seat: int) -> None:
+        position, mask = self._bit(row, seat)
+        self.data[position] |= mask
+
+    def is_taken(self, row: int, seat: int) -> bool:
+        position, mask = self._bit(row, seat)
+        return bool(self.data[position] & mask)
+
+    def taken_seats(self):
+        for position, byte in enumerate(self.data):
+            if not byte:
+                continue
+            for offset in range(8):
+                if byte & (0x80 >> offset):
+                    row, seat = divmod(
+                        position * 8 + offset, self.seats_in_row
+                    )
+                    yield row + 1, seat + 1
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.data)
+
+    def to_base64(self) -> str:
+        return base64.b64encode(self.data).decode("ascii")
+
+    def to_runs(self) -> list[list[int]]:
+        """Returns ``[state, length]`` runs, state is 1 for taken seats"""
+        runs = []
+        for index in range(self.capacity):
+            state = (self.data[index >> 3] >> (7 - (index & 7))) & 1
+            if runs and runs[-1][0] == state:
+                runs[-1][1] += 1
+            else:
+                runs.append([state, 1])
+        return runs
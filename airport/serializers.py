@@ -1,9 +1,12 @@
+from django.conf import settings
 from django.db import transaction
 
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
-from airport import models
+from drf_spectacular.utils import extend_schema_field
+
+from airport import booking, models
 
 
 class AirplaneTypeSerializer(serializers.ModelSerializer):
@@ -140,6 +143,28 @@ class RouteDetailSerializer(RouteSerializer):
     destination = AirportDetailSerializer(many=False, read_only=True)
 
 
+class ShortestPathSerializer(serializers.Serializer):
+    distance = serializers.IntegerField(read_only=True)
+    hops = serializers.IntegerField(read_only=True)
+    airports = AirportSerializer(many=True, read_only=True)
+    routes = serializers.ListField(
+        child=serializers.IntegerField(), read_only=True
+    )
+
+
+class ReachableAirportSerializer(AirportSerializer):
+    hops = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = models.Airport
+        fields = (
+            "id",
+            "name",
+            "city",
+            "hops",
+        )
+
+
 class CrewSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Crew
@@ -183,7 +208,93 @@ class FlightListSerializer(FlightSerializer):
         )
 
 
+class FlightSearchSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="flight_id", read_only=True)
+    source = serializers.CharField(
+        source="source_airport_name", read_only=True
+    )
+    destination = serializers.CharField(
+        source="destination_airport_name", read_only=True
+    )
+
+    class Meta:
+        model = models.FlightSearch
+        fields = (
+            "id",
+            "source",
+            "destination",
+            "departure_time",
+            "arrival_time",
+            "tickets_available",
+        )
+
+
+class ItinerarySerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField(read_only=True)
+    arrival_time = serializers.DateTimeField(read_only=True)
+    duration = serializers.DurationField(read_only=True)
+    layovers = serializers.ListField(
+        child=serializers.DurationField(), read_only=True
+    )
+    flights = FlightListSerializer(many=True, read_only=True)
+
+
+class TicketFlightField(serializers.PrimaryKeyRelatedField):
+    """Takes flights from the batch loaded by ``TicketBatchSerializer``"""
+
+    def to_internal_value(self, data):
+        batch = getattr(self.parent, "parent", None)
+        flight = getattr(batch, "flights", {}).get(str(data))
+        if flight is not None:
+            return flight
+        return super().to_internal_value(data)
+
+
+class TicketBatchSerializer(serializers.ListSerializer):
+    """Validates a list of tickets with a single flight query.
+
+    Flights of all tickets are loaded together with their airplanes up
+    front, so seat ranges and repeated seats are checked in memory. Bulk
+    paths can pass flights loaded by ``load_flights`` in the ``flights``
+    context entry to share them between many ticket lists.
+    """
+
+    @staticmethod
+    def load_flights(tickets) -> dict[str, models.Flight]:
+        flight_ids = {
+            str(ticket.get("flight"))
+            for ticket in tickets
+            if isinstance(ticket, dict)
+        }
+        return {
+            str(flight_id): flight
+            for flight_id, flight in models.Flight.objects.select_related(
+                "airplane"
+            ).in_bulk(
+                [flight_id for flight_id in flight_ids if flight_id.isdigit()]
+            ).items()
+        }
+
+    def to_internal_value(self, data):
+        self.flights = self.context.get("flights")
+        if self.flights is None:
+            self.flights = (
+                self.load_flights(data) if isinstance(data, list) else {}
+            )
+        tickets_data = super().to_internal_value(data)
+
+        errors = booking.seat_errors(tickets_data, taken_seats=set())
+        if errors:
+            raise ValidationError(errors)
+
+        return tickets_data
+
+
 class TicketSerializer(serializers.ModelSerializer):
+    flight = TicketFlightField(
+        queryset=models.Flight.objects.select_related("airplane")
+    )
+
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs)
         models.Ticket.validate_ticket(
@@ -202,6 +313,9 @@ class TicketSerializer(serializers.ModelSerializer):
             "seat",
             "flight",
         )
+        # Taken seats are checked for the whole order in booking.book_tickets
+        validators = []
+        list_serializer_class = TicketBatchSerializer
 
 
 class TicketListSerializer(TicketSerializer):
@@ -220,9 +334,14 @@ class FlightDetailSerializer(FlightSerializer):
     crew = serializers.SlugRelatedField(
         many=True, read_only=True, slug_field="full_name"
     )
-    taken_seats = TicketSeatSerializer(
-        source="tickets", many=True, read_only=True
-    )
+    taken_seats = serializers.SerializerMethodField()
+
+    @extend_schema_field(TicketSeatSerializer(many=True))
+    def get_taken_seats(self, flight):
+        return [
+            {"row": row, "seat": seat}
+            for row, seat in flight.get_seat_map().taken_seats()
+        ]
 
     class Meta:
         model = models.Flight
@@ -237,6 +356,26 @@ class FlightDetailSerializer(FlightSerializer):
         )
 
 
+class SeatMapSerializer(serializers.Serializer):
+    ENCODINGS = ("base64", "rle")
+
+    rows = serializers.IntegerField(read_only=True)
+    seats_in_row = serializers.IntegerField(read_only=True)
+    capacity = serializers.IntegerField(read_only=True)
+    taken = serializers.IntegerField(read_only=True, source="taken_count")
+    encoding = serializers.SerializerMethodField()
+    seats = serializers.SerializerMethodField()
+
+    def get_encoding(self, seat_map) -> str:
+        return self.context.get("encoding", "base64")
+
+    @extend_schema_field(serializers.JSONField())
+    def get_seats(self, seat_map):
+        if self.get_encoding(seat_map) == "rle":
+            return seat_map.to_runs()
+        return seat_map.to_base64()
+
+
 class OrderSerializer(serializers.ModelSerializer):
     tickets = TicketSerializer(many=True, allow_empty=False, read_only=False)
 
@@ -244,18 +383,7 @@ class OrderSerializer(serializers.ModelSerializer):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
             order = models.Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                if models.Ticket.objects.filter(
-                    flight=ticket_data["flight"],
-                    row=ticket_data["row"],
-                    seat=ticket_data["seat"],
-                ).exists():
-                    raise ValidationError(
-                        {
-                            "tickets": "The same ticket already exist"
-                        }
-                    )
-                models.Ticket.objects.create(order=order, **ticket_data)
+            booking.book_tickets(order, tickets_data)
             return order
 
     class Meta:
@@ -267,5 +395,91 @@ class OrderSerializer(serializers.ModelSerializer):
         )
 
 
+class BulkOrderSerializer(serializers.Serializer):
+    """Creates many orders, each one succeeds or fails on its own"""
+
+    orders = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=settings.BULK_ORDER_MAX_ORDERS,
+    )
+
+    def create(self, validated_data):
+        orders_data = validated_data["orders"]
+        context = {
+            **self.context,
+            "flights": TicketBatchSerializer.load_flights(
+                ticket
+                for order_data in orders_data
+                if isinstance(order_data.get("tickets"), list)
+                for ticket in order_data["tickets"]
+            ),
+        }
+
+        results = []
+        valid = {}
+        for index, order_data in enumerate(orders_data):
+            serializer = OrderSerializer(data=order_data, context=context)
+            if serializer.is_valid():
+                valid[index] = serializer.validated_data["tickets"]
+                results.append(None)
+            else:
+                results.append(
+                    {"status": "failed", "errors": serializer.errors}
+                )
+
+        with transaction.atomic():
+            booked = booking.book_orders(
+                validated_data["user"], list(valid.values())
+            )
+
+        for index, outcome in zip(valid, booked):
+            if isinstance(outcome, models.Order):
+                results[index] = {
+                    "status": "created",
+                    "order": OrderSerializer(outcome).data,
+                }
+            else:
+                results[index] = {"status": "failed", "errors": outcome}
+
+        return results
+
+
 class OrderListSerializer(OrderSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+
+
+class OrderRequestSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.OrderRequest
+        fields = (
+            "id",
+            "status",
+            "tickets",
+            "order",
+            "errors",
+            "created_at",
+            "processed_at",
+        )
+        read_only_fields = fields
+
+
+class HeldSeatSerializer(TicketSerializer):
+    class Meta(TicketSerializer.Meta):
+        model = models.HeldSeat
+        fields = ("row", "seat", "flight")
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    seats = HeldSeatSerializer(many=True, allow_empty=False)
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            return booking.hold_seats(
+                validated_data["user"], validated_data["seats"]
+            )
+
+    class Meta:
+        model = models.SeatHold
+        fields = ("id", "created_at", "expires_at", "seats")
+        read_only_fields = ("expires_at",)
@@ -0,0 +1,169 @@
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from airport import booking, cache, models, search
+from airport.itineraries import flight_graph
+from airport.routing import route_network
+
+
+def bump_flight_versions(flights) -> None:
+    flights.update(version=F("version") + 1)
+
+
+def refresh_flights(flights) -> None:
+    """Refreshes data derived from flights whose related rows changed"""
+    search.sync_flights(flights)
+    bump_flight_versions(flights)
+
+
+def flights_of_airports(airports):
+    return models.Flight.objects.filter(
+        Q(route__source__in=airports) | Q(route__destination__in=airports)
+    )
+
+
+@receiver(post_save, sender=models.Flight)
+def sync_flight_search_row(sender, instance, **kwargs):
+    search.sync_flights(models.Flight.objects.filter(id=instance.id))
+
+
+@receiver(post_save, sender=models.Flight)
+@receiver(post_delete, sender=models.Flight)
+def refresh_flight_graph(sender, instance, **kwargs):
+    flight_ids = [instance.id]
+    transaction.on_commit(lambda: flight_graph.mark_dirty(flight_ids))
+
+
+@receiver(m2m_changed, sender=models.Flight.crew.through)
+def bump_crew_flight_versions(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if not reverse:
+        bump_flight_versions(models.Flight.objects.filter(id=instance.id))
+    elif pk_set:
+        bump_flight_versions(models.Flight.objects.filter(id__in=pk_set))
+    else:
+        bump_flight_versions(models.Flight.objects.filter(crew=instance))
+
+
+@receiver(post_save, sender=models.Crew)
+def bump_crew_member_flight_versions(sender, instance, created, **kwargs):
+    if not created:
+        bump_flight_versions(models.Flight.objects.filter(crew=instance))
+
+
+@receiver(pre_delete, sender=models.Crew)
+def bump_deleted_crew_flight_versions(sender, instance, **kwargs):
+    # Cascade deletes of the through rows don't send m2m_changed
+    bump_flight_versions(models.Flight.objects.filter(crew=instance))
+
+
+@receiver(post_save, sender=models.AirplaneType)
+def bump_airplane_type_flight_versions(sender, instance, created, **kwargs):
+    if not created:
+        bump_flight_versions(
+            models.Flight.objects.filter(airplane__airplane_type=instance)
+        )
+
+
+@receiver(post_save, sender=models.Route)
+def sync_route_flights(sender, instance, created, **kwargs):
+    if not created:
+        refresh_flights(instance.flights.all())
+        flight_ids = list(instance.flights.values_list("id", flat=True))
+        transaction.on_commit(lambda: flight_graph.mark_dirty(flight_ids))
+
+
+@receiver(post_save, sender=models.Route)
+def refresh_route_network(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: route_network.add_route(instance))
+    else:
+        transaction.on_commit(route_network.invalidate)
+
+
+@receiver(post_delete, sender=models.Route)
+def invalidate_route_network(sender, instance, **kwargs):
+    transaction.on_commit(route_network.invalidate)
+
+
+@receiver(post_save, sender=models.Airplane)
+def sync_airplane_flights(sender, instance, created, **kwargs):
+    cabin = (instance.rows, instance.seats_in_row)
+    if not created:
+        if getattr(instance, "_loaded_cabin", None) != cabin:
+            # Stored seat maps are laid out for the previous cabin
+            instance.flights.update(seat_map=None)
+        refresh_flights(instance.flights.all())
+    instance._loaded_cabin = cabin
+
+
+@receiver(post_save, sender=models.Ticket)
+@receiver(post_delete, sender=models.Ticket)
+def recount_ticket_flights(sender, instance, **kwargs):
+    # Bulk inserts of the booking functions update the inventory
+    # themselves and don't send these signals
+    flight_ids = {
+        instance.flight_id,
+        getattr(instance, "_loaded_flight_id", None),
+    }
+    flight_ids.discard(None)
+    booking.recount_inventory_on_commit(flight_ids)
+    instance._loaded_flight_id = instance.flight_id
+
+
+@receiver(post_delete, sender=models.Flight)
+def skip_deleted_flight_recount(sender, instance, **kwargs):
+    # Tickets deleted with their flight leave nothing to recount
+    booking.skip_recount([instance.id])
+
+
+@receiver(post_save, sender=models.Airport)
+def sync_airport_flights(sender, instance, created, **kwargs):
+    if not created:
+        refresh_flights(flights_of_airports([instance]))
+
+
+@receiver(post_save, sender=models.City)
+def sync_city_flights(sender, instance, created, **kwargs):
+    if not created:
+        refresh_flights(flights_of_airports(instance.airports.all()))
+
+
+@receiver(post_save, sender=models.Country)
+def sync_country_flights(sender, instance, created, **kwargs):
+    if not created:
+        refresh_flights(
+            flights_of_airports(
+                models.Airport.objects.filter(city__country=instance)
+            )
+        )
+
+
+def bump_response_cache_version(sender, **kwargs):
+    # Bumped right away and again on commit, so that a list rendered from
+    # the uncommitted state can't stay cached under the latest version
+    cache.bump_version(sender)
+    transaction.on_commit(lambda: cache.bump_version(sender))
+
+
+for cached_model in (
+    models.AirplaneType,
+    models.Airplane,
+    models.Country,
+    models.City,
+    models.Airport,
+    models.Crew,
+):
+    post_save.connect(bump_response_cache_version, sender=cached_model)
+    post_delete.connect(bump_response_cache_version, sender=cached_model)
@@ -0,0 +1,200 @@
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as default_cache
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from airport import cache, models, views
+
+
+def sample_flight():
+    country = models.Country.objects.create(name="Test country")
+    city = models.City.objects.create(name="Test city", country=country)
+    airport_1 = models.Airport.objects.create(name="Airport 1", city=city)
+    airport_2 = models.Airport.objects.create(name="Airport 2", city=city)
+    route = models.Route.objects.create(
+        source=airport_1,
+        destination=airport_2,
+        distance=1234,
+    )
+    airplane_type = models.AirplaneType.objects.create(name="Test type")
+    airplane = models.Airplane.objects.create(
+        name="Test airplane",
+        airplane_type=airplane_type,
+        rows=10,
+        seats_in_row=4,
+    )
+
+    return models.Flight.objects.create(
+        route=route,
+        airplane=airplane,
+        departure_time="2024-09-01 12:00:00",
+        arrival_time="2024-09-02 12:00:00",
+    )
+
+
+@override_settings(ASYNC_READ_VIEWS=True)
+class AsyncReadViewTest(TestCase):
+    def setUp(self) -> None:
+        default_cache.clear()
+        self.factory = APIRequestFactory()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com",
+            "testpass",
+        )
+        self.flight = sample_flight()
+
+    def get_request(self, **headers):
+        request = self.factory.get("/", **headers)
+        force_authenticate(request, user=self.user)
+        return request
+
+    async def call(self, view, request, **kwargs):
+        response = await view(request, **kwargs)
+        return response.render()
+
+    def test_view_is_async(self):
+        view = views.FlightViewSet.as_view({"get": "list"})
+
+        self.assertTrue(iscoroutinefunction(view))
+
+    def test_view_is_sync_when_disabled(self):
+        with override_settings(ASYNC_READ_VIEWS=False):
+            view = views.FlightViewSet.as_view({"get": "list"})
+
+        self.assertFalse(iscoroutinefunction(view))
+
+    async def test_flight_list(self):
+        request = self.get_request()
+        view = views.FlightViewSet.as_view({"get": "list"})
+
+        response = await self.call(view, request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["id"], self.flight.id)
+
+    async def test_flight_list_paginates_without_sync_calls(self):
+        for _ in range(2):
+            await models.Flight.objects.acreate(
+                route_id=self.flight.route_id,
+                airplane_id=self.flight.airplane_id,
+                departure_time="2024-09-03 12:00:00",
+                arrival_time="2024-09-04 12:00:00",
+            )
+        request = self.get_request(QUERY_STRING="page=2")
+        view = views.FlightViewSet.as_view({"get": "list"})
+
+        with mock.patch.object(
+            views.FlightViewSet,
+            "paginate_queryset",
+            side_effect=AssertionError("paginated synchronously"),
+        ), mock.patch.object(views.FlightPagination, "page_size", 2):
+            response = await self.call(view, request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsNone(response.data["next"])
+        self.assertIsNotNone(response.data["previous"])
+
+    async def test_flight_list_invalid_page(self):
+        request = self.get_request(QUERY_STRING="page=5")
+        view = views.FlightViewSet.as_view({"get": "list"})
+
+        response = await self.call(view, request)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_flight_list_cursor_pagination(self):
+        request = self.get_request(QUERY_STRING="pagination=cursor")
+        view = views.FlightViewSet.as_view({"get": "list"})
+
+        response = await self.call(view, request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["id"], self.flight.id)
+        self.assertIsNone(response.data["next"])
+
+    async def test_flight_retrieve(self):
+        request = self.get_request()
+        view = views.FlightViewSet.as_view({"get": "retrieve"})
+
+        response = await self.call(view, request, pk=self.flight.id)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["id"], self.flight.id)
+        self.assertEqual(
+            response["ETag"],
+            f'"flight-{self.flight.id}-v{self.flight.version}"',
+        )
+
+    async def test_flight_retrieve_not_modified(self):
+        etag = f'"flight-{self.flight.id}-v{self.flight.version}"'
+        request = self.get_request(HTTP_IF_NONE_MATCH=etag)
+        view = views.FlightViewSet.as_view({"get": "retrieve"})
+
+        response = await self.call(view, request, pk=self.flight.id)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_flight_retrieve_not_found(self):
+        request = self.get_request()
+        view = views.FlightViewSet.as_view({"get": "retrieve"})
+
+        response = await self.call(view, request, pk=self.flight.id + 1)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_route_list(self):
+        request = self.get_request()
+        view = views.RouteViewSet.as_view({"get": "list"})
+
+        response = await self.call(view, request)
+
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["source"], "Airport 1")
+
+    async def test_airport_list_uses_response_cache(self):
+        request = self.get_request()
+        view = views.AirportViewSet.as_view({"get": "list"})
+
+        await self.call(view, request)
+        response = await self.call(view, request)
+
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(cache.get_stats("airport.airport")["hits"], 1)
+
+    async def test_authentication_required(self):
+        request = self.factory.get("/")
+        view = views.RouteViewSet.as_view({"get": "list"})
+
+        response = await self.call(view, request)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_other_methods_use_sync_view(self):
+        admin = await get_user_model().objects.acreate(
+            email="admin@test.com", is_staff=True
+        )
+        airport = await models.Airport.objects.afirst()
+        request = self.factory.post(
+            "/",
+            {
+                "source": airport.id,
+                "destination": airport.id,
+                "distance": 100,
+            },
+            format="json",
+        )
+        force_authenticate(request, user=admin)
+        view = views.RouteViewSet.as_view({"get": "list", "post": "create"})
+
+        response = await self.call(view, request)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
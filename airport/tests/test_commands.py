@@ -0,0 +1,94 @@
+import json
+from io import StringIO
+
+from django.test import TestCase, TransactionTestCase
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+
+from airport import models
+
+
+def sample_flight(**params):
+    country = models.Country.objects.create(name="Test country")
+    city = models.City.objects.create(name="Test city", country=country)
+    airport_1 = models.Airport.objects.create(name="Airport 1", city=city)
+    airport_2 = models.Airport.objects.create(name="Airport 2", city=city)
+    route = models.Route.objects.create(
+        source=airport_1,
+        destination=airport_2,
+        distance=1234,
+    )
+    airplane_type = models.AirplaneType.objects.create(name="Test type")
+    airplane = models.Airplane.objects.create(
+        name="Test airplane",
+        airplane_type=airplane_type,
+        rows=10,
+        seats_in_row=4,
+    )
+
+    defaults = {
+        "route": route,
+        "airplane": airplane,
+        "departure_time": "2024-09-01 12:00:00",
+        "arrival_time": "2024-09-02 12:00:00",
+    }
+    defaults.update(params)
+
+    return models.Flight.objects.create(**defaults)
+
+
+class ReconcileSeatInventoryCommandTest(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "user@test.com",
+            "testpass",
+        )
+        self.flight = sample_flight()
+        order = models.Order.objects.create(user=self.user)
+        # Bulk inserts skip the signals that keep the inventory in sync
+        models.Ticket.objects.bulk_create(
+            models.Ticket(flight=self.flight, order=order, row=row, seat=seat)
+            for row, seat in [(1, 1), (1, 2), (2, 1)]
+        )
+
+    def test_reconcile_repairs_drifted_counter(self):
+        self.assertEqual(self.flight.seats_sold, 0)
+
+        call_command("reconcile_seat_inventory", stdout=StringIO())
+        self.flight.refresh_from_db()
+
+        self.assertEqual(self.flight.seats_sold, 3)
+
+    def test_reconcile_dry_run_does_not_update(self):
+        out = StringIO()
+
+        call_command("reconcile_seat_inventory", "--dry-run", stdout=out)
+        self.flight.refresh_from_db()
+
+        self.assertEqual(self.flight.seats_sold, 0)
+        self.assertIn("Drifted flights: 1", out.getvalue())
+
+    def test_reconcile_rebuilds_seat_map(self):
+        call_command("reconcile_seat_inventory", stdout=StringIO())
+        self.flight.refresh_from_db()
+
+        self.assertEqual(
+            bytes(self.flight.seat_map), bytes([0b11001000, 0, 0, 0, 0])
+        )
+
+
+# request_finished closes the connection, which would abort the transaction
+# TestCase wraps each test in
+class BenchmarkDbConnectionsCommandTest(TransactionTestCase):
+    def test_worker_prints_latency_per_request(self):
+        out = StringIO()
+
+        call_command(
+            "benchmark_db_connections",
+            "--worker",
+            "--requests",
+            "3",
+            stdout=out,
+        )
+
+        self.assertEqual(len(json.loads(out.getvalue())), 3)
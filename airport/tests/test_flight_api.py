@@ -1,16 +1,25 @@
-from django.test import TestCase
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework.views import APIView
 
 from airport import models
+from airport.views import FlightViewSet
 from airport.serializers import FlightListSerializer, FlightDetailSerializer
 
 
 FLIGHT_URL = reverse("airport:flight-list")
 
+# Throttle counters are shared in the database and add their own queries
+without_throttling = mock.patch.object(APIView, "throttle_classes", ())
+
 
 def get_detail_url(flight_id: int):
     return reverse("airport:flight-detail", args=[flight_id])
@@ -246,6 +255,105 @@ class AuthenticatedFlightApiTest(TestCase):
         self.assertNotIn(serializer_1.data, response.data["results"])
         self.assertIn(serializer_2.data, response.data["results"])
 
+    def test_filter_flights_by_departure_range(self):
+        airport_1 = sample_airport(self.country)
+        airport_2 = sample_airport(self.country)
+        route = sample_route(airport_1, airport_2)
+
+        flight_1 = sample_flight(
+            route, self.airplane, departure_time="2024-08-01 12:00:00"
+        )
+        flight_2 = sample_flight(
+            route, self.airplane, departure_time="2024-08-05 23:30:00"
+        )
+        flight_3 = sample_flight(
+            route, self.airplane, departure_time="2024-08-06 00:00:00"
+        )
+
+        response = self.client.get(
+            FLIGHT_URL,
+            {"departure_from": "2024-08-02", "departure_to": "2024-08-05"},
+        )
+        ids = [flight["id"] for flight in response.data["results"]]
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(ids, [flight_2.id])
+
+        response = self.client.get(
+            FLIGHT_URL,
+            {
+                "departure_from": "2024-08-01T12:00:00",
+                "departure_to": "2024-08-05T23:00:00",
+            },
+        )
+        ids = [flight["id"] for flight in response.data["results"]]
+
+        self.assertEqual(ids, [flight_1.id])
+        self.assertNotIn(flight_3.id, ids)
+
+    def test_filter_flights_by_invalid_departure_range(self):
+        response = self.client.get(
+            FLIGHT_URL, {"departure_from": "2024-13-45"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_flights_with_cursor_pagination(self):
+        airport_1 = sample_airport(self.country)
+        airport_2 = sample_airport(self.country)
+        route = sample_route(airport_1, airport_2)
+
+        for departure_time in [
+            "2024-08-03 12:00:00",
+            "2024-08-01 12:00:00",
+            "2024-08-02 12:00:00",
+            "2024-08-01 12:00:00",
+            "2024-08-02 12:00:00",
+        ]:
+            sample_flight(route, self.airplane, departure_time=departure_time)
+
+        expected_ids = list(
+            models.Flight.objects.order_by(
+                "departure_time", "id"
+            ).values_list("id", flat=True)
+        )
+
+        response = self.client.get(
+            FLIGHT_URL, {"pagination": "cursor", "page_size": 2}
+        )
+        pages = [response.data]
+        while pages[-1]["next"]:
+            pages.append(self.client.get(pages[-1]["next"]).data)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertIsNone(response.data["previous"])
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(
+            [flight["id"] for page in pages for flight in page["results"]],
+            expected_ids,
+        )
+
+        previous_page = self.client.get(pages[-1]["previous"]).data
+        self.assertEqual(
+            [flight["id"] for flight in previous_page["results"]],
+            expected_ids[2:4],
+        )
+
+    def test_list_flights_with_invalid_cursor(self):
+        response = self.client.get(FLIGHT_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_flights_page_number_pagination_has_count(self):
+        airport_1 = sample_airport(self.country)
+        airport_2 = sample_airport(self.country)
+        sample_flight(sample_route(airport_1, airport_2), self.airplane)
+
+        response = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(response.data["count"], 1)
+
     def test_retrieve_flight_detail(self):
         airport_1 = sample_airport(self.country)
         airport_2 = sample_airport(self.country)
@@ -263,6 +371,51 @@ class AuthenticatedFlightApiTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, serializer.data)
 
+    @without_throttling
+    def test_retrieve_flight_detail_etag(self):
+        airport_1 = sample_airport(self.country)
+        airport_2 = sample_airport(self.country)
+        route = sample_route(airport_1, airport_2)
+        flight = sample_flight(route, self.airplane)
+        url = get_detail_url(flight.id)
+
+        response = self.client.get(url)
+        etag = response["ETag"]
+
+        with self.assertNumQueries(1):
+            not_modified_response = self.client.get(
+                url, HTTP_IF_NONE_MATCH=etag
+            )
+
+        self.assertEqual(
+            not_modified_response.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+        self.assertEqual(not_modified_response["ETag"], etag)
+
+    def test_ticket_sale_changes_etag(self):
+        airport_1 = sample_airport(self.country)
+        airport_2 = sample_airport(self.country)
+        route = sample_route(airport_1, airport_2)
+        flight = sample_flight(route, self.airplane)
+        url = get_detail_url(flight.id)
+        etag = self.client.get(url)["ETag"]
+
+        self.client.post(
+            reverse("airport:order-list"),
+            {"tickets": [{"flight": flight.id, "row": 1, "seat": 1}]},
+            format="json",
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.data["taken_seats"], [{"row": 1, "seat": 1}])
+
+    def test_retrieve_missing_flight(self):
+        response = self.client.get(get_detail_url(12345))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_create_flight_forbidden(self):
         airport_1 = sample_airport(self.country)
         airport_2 = sample_airport(self.country)
@@ -407,6 +560,68 @@ class AdminFlightApiTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(new_airplane, flight.airplane)
 
+    def test_update_flight_bumps_version_and_keeps_inventory(self):
+        flight = sample_flight(self.route, self.airplane)
+        stale_flight = models.Flight.objects.get(id=flight.id)
+        models.Flight.objects.filter(id=flight.id).update(seats_sold=5)
+
+        stale_flight.arrival_time = "2024-09-02 13:00:00"
+        stale_flight.save()
+        flight.refresh_from_db()
+
+        self.assertEqual(flight.version, 2)
+        self.assertEqual(stale_flight.version, 2)
+        self.assertEqual(flight.seats_sold, 5)
+
+    def test_crew_change_bumps_version(self):
+        crew = models.Crew.objects.create(
+            first_name="First_name",
+            last_name="Last_name",
+        )
+        flight = sample_flight(self.route, self.airplane)
+
+        response = self.client.patch(
+            get_detail_url(flight.id), {"crew": [crew.id]}
+        )
+        flight.refresh_from_db()
+        version = flight.version
+
+        crew.last_name = "New_last_name"
+        crew.save()
+        flight.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(version, 1)
+        self.assertEqual(flight.version, version + 1)
+
+    def test_crew_deletion_bumps_version(self):
+        crew = models.Crew.objects.create(
+            first_name="First_name",
+            last_name="Last_name",
+        )
+        flight = sample_flight(self.route, self.airplane)
+        flight.crew.add(crew)
+        flight.refresh_from_db()
+        version = flight.version
+
+        crew.delete()
+        flight.refresh_from_db()
+
+        self.assertEqual(flight.version, version + 1)
+
+    def test_airplane_type_change_bumps_version(self):
+        flight = sample_flight(self.route, self.airplane)
+        etag = self.client.get(get_detail_url(flight.id))["ETag"]
+
+        self.airplane_type.name = "Renamed airplane type"
+        self.airplane_type.save()
+        response = self.client.get(
+            get_detail_url(flight.id), HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
     def test_destroy_flight(self):
         flight_1 = sample_flight(self.route, self.airplane)
         flight_2 = sample_flight(self.route, self.airplane)
@@ -419,3 +634,77 @@ class AdminFlightApiTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertNotIn(flight_1, flights)
         self.assertIn(flight_2, flights)
+
+
+@override_settings(FLIGHT_SEARCH_READ_MODEL=False)
+class FlightQueryPlanTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        country = models.Country.objects.create(name="Test country")
+        airplane_type = models.AirplaneType.objects.create(name="Test type")
+        airplane = sample_airplane(airplane_type)
+        airports = [
+            sample_airport(country, name=f"Airport {index}")
+            for index in range(10)
+        ]
+        cls.routes = [
+            sample_route(source, destination)
+            for source in airports
+            for destination in airports
+            if source != destination
+        ]
+
+        start = datetime(2024, 1, 1)
+        models.Flight.objects.bulk_create(
+            models.Flight(
+                route=cls.routes[index % len(cls.routes)],
+                airplane=airplane,
+                departure_time=start + timedelta(hours=index),
+                arrival_time=start + timedelta(hours=index + 3),
+            )
+            for index in range(2000)
+        )
+
+    def view_queryset(self, **query_params):
+        """Returns the queryset the flight list builds for the query"""
+        view = FlightViewSet(action_map={"get": "list"})
+        view.request = view.initialize_request(
+            RequestFactory().get(FLIGHT_URL, query_params)
+        )
+        return view.get_queryset()
+
+    def explain(self, queryset) -> str:
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+            if connection.vendor == "postgresql":
+                # The seeded tables are still small enough for a sequential
+                # scan to look cheaper, make the planner show its index choice
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+        return queryset.explain()
+
+    def test_departure_range_uses_departure_time_index(self):
+        queryset = self.view_queryset(
+            departure_from="2024-02-01", departure_to="2024-02-01"
+        )
+
+        self.assertIn("flight_departure_time_idx", self.explain(queryset))
+
+    def test_route_departure_uses_composite_index(self):
+        route = self.routes[0]
+        queryset = self.view_queryset(
+            source_airport=route.source_id,
+            destination_airport=route.destination_id,
+            departure_from="2024-02-01",
+        )
+
+        self.assertIn("flight_route_departure_idx", self.explain(queryset))
+
+    def test_route_lookup_uses_source_destination_index(self):
+        route = self.routes[0]
+        queryset = self.view_queryset(
+            source_airport=route.source_id,
+            destination_airport=route.destination_id,
+        )
+
+        self.assertIn("route_source_destination_idx", self.explain(queryset))
@@ -0,0 +1,124 @@
+from io import StringIO
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport import models
+
+
+FLIGHT_URL = reverse("airport:flight-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+class FlightSearchReadModelTest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        country = models.Country.objects.create(name="Country")
+        self.city_1 = models.City.objects.create(
+            name="City 1", country=country
+        )
+        self.city_2 = models.City.objects.create(
+            name="City 2", country=country
+        )
+        self.airport_1 = models.Airport.objects.create(
+            name="Airport 1", city=self.city_1
+        )
+        self.airport_2 = models.Airport.objects.create(
+            name="Airport 2", city=self.city_2
+        )
+        self.route = models.Route.objects.create(
+            source=self.airport_1,
+            destination=self.airport_2,
+            distance=1000,
+        )
+        airplane_type = models.AirplaneType.objects.create(name="Type")
+        self.airplane = models.Airplane.objects.create(
+            name="Airplane",
+            airplane_type=airplane_type,
+            rows=10,
+            seats_in_row=4,
+        )
+        self.flight = models.Flight.objects.create(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time="2024-09-01 12:00:00",
+            arrival_time="2024-09-01 15:00:00",
+        )
+
+    def test_flight_creation_creates_search_row(self):
+        row = models.FlightSearch.objects.get(flight=self.flight)
+
+        self.assertEqual(row.source_airport_id, self.airport_1.id)
+        self.assertEqual(row.destination_city_name, "City 2")
+        self.assertEqual(row.source_country_name, "Country")
+        self.assertEqual(row.capacity, 40)
+        self.assertEqual(row.tickets_available, 40)
+
+    def test_order_updates_tickets_available(self):
+        payload = {
+            "tickets": [
+                {"flight": self.flight.id, "row": 1, "seat": 1},
+                {"flight": self.flight.id, "row": 1, "seat": 2},
+            ]
+        }
+
+        self.client.post(ORDER_URL, payload, format="json")
+        row = models.FlightSearch.objects.get(flight=self.flight)
+
+        self.assertEqual(row.tickets_available, 38)
+
+    def test_renames_are_propagated(self):
+        self.airport_1.name = "Renamed airport"
+        self.airport_1.save()
+        self.city_2.name = "Renamed city"
+        self.city_2.save()
+
+        row = models.FlightSearch.objects.get(flight=self.flight)
+
+        self.assertEqual(row.source_airport_name, "Renamed airport")
+        self.assertEqual(row.destination_city_name, "Renamed city")
+
+    def test_rebuild_command(self):
+        models.FlightSearch.objects.all().delete()
+
+        call_command("rebuild_flight_search", stdout=StringIO())
+
+        self.assertTrue(
+            models.FlightSearch.objects.filter(flight=self.flight).exists()
+        )
+
+    def test_list_from_read_model_matches_list(self):
+        models.Flight.objects.create(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time="2024-09-02 12:00:00",
+            arrival_time="2024-09-02 15:00:00",
+        )
+        params = {"source_city": self.city_1.id, "pagination": "cursor"}
+
+        response = self.client.get(FLIGHT_URL, params)
+        with override_settings(FLIGHT_SEARCH_READ_MODEL=True):
+            read_model_response = self.client.get(FLIGHT_URL, params)
+
+        self.assertEqual(read_model_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(response.data, read_model_response.data)
+
+    @override_settings(FLIGHT_SEARCH_READ_MODEL=True)
+    def test_list_from_read_model_filters_by_airport(self):
+        response = self.client.get(
+            FLIGHT_URL, {"destination_airport": self.airport_1.id}
+        )
+
+        self.assertEqual(response.data["results"], [])
@@ -0,0 +1,146 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport import models
+
+
+ORDER_URL = reverse("airport:order-list")
+
+
+def sample_flight():
+    country = models.Country.objects.create(name="Test country")
+    city = models.City.objects.create(name="Test city", country=country)
+    airport_1 = models.Airport.objects.create(name="Airport 1", city=city)
+    airport_2 = models.Airport.objects.create(name="Airport 2", city=city)
+    route = models.Route.objects.create(
+        source=airport_1,
+        destination=airport_2,
+        distance=1234,
+    )
+    airplane_type = models.AirplaneType.objects.create(name="Test type")
+    airplane = models.Airplane.objects.create(
+        name="Test airplane",
+        airplane_type=airplane_type,
+        rows=10,
+        seats_in_row=4,
+    )
+
+    return models.Flight.objects.create(
+        route=route,
+        airplane=airplane,
+        departure_time="2024-09-01 12:00:00",
+        arrival_time="2024-09-02 12:00:00",
+    )
+
+
+class IdempotentOrderCreateTest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def create_order(self, key, seat=1):
+        return self.client.post(
+            ORDER_URL,
+            {"tickets": [{"flight": self.flight.id, "row": 1, "seat": seat}]},
+            format="json",
+            headers={"Idempotency-Key": key} if key else {},
+        )
+
+    def test_replay_returns_stored_response(self):
+        first = self.create_order("key-1")
+
+        with CaptureQueriesContext(connection) as queries:
+            replay = self.create_order("key-1")
+
+        self.assertEqual(replay.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replay.data, first.data)
+        self.assertEqual(replay.headers["Idempotent-Replayed"], "true")
+        self.assertEqual(models.Order.objects.count(), 1)
+        self.assertFalse(
+            any("airport_ticket" in query["sql"] for query in queries)
+        )
+
+    def test_key_reused_for_different_request(self):
+        self.create_order("key-1")
+
+        response = self.create_order("key-1", seat=2)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+        self.assertEqual(models.Order.objects.count(), 1)
+
+    def test_keys_are_per_user(self):
+        self.create_order("key-1")
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("other@test.com", "pass")
+        )
+
+        response = self.create_order("key-1", seat=2)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(models.Order.objects.count(), 2)
+
+    def test_failed_request_is_not_stored(self):
+        models.Ticket.objects.create(
+            flight=self.flight,
+            row=1,
+            seat=1,
+            order=models.Order.objects.create(user=self.user),
+        )
+
+        response = self.create_order("key-1")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(models.IdempotencyKey.objects.exists())
+
+    def test_expired_key_is_executed_again(self):
+        self.create_order("key-1")
+        models.IdempotencyKey.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        response = self.create_order("key-1", seat=2)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", response.headers)
+        self.assertEqual(models.Order.objects.count(), 2)
+
+    def test_requests_without_key_are_not_stored(self):
+        self.create_order(None)
+
+        self.assertFalse(models.IdempotencyKey.objects.exists())
+
+    def test_purge_idempotency_keys_command(self):
+        for seat in range(1, 4):
+            self.create_order(f"key-{seat}", seat=seat)
+        models.IdempotencyKey.objects.exclude(key="key-3").update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        out = StringIO()
+
+        call_command(
+            "purge_idempotency_keys", "--batch-size", "1", stdout=out
+        )
+
+        self.assertIn("Purged idempotency keys: 2", out.getvalue())
+        self.assertEqual(
+            list(models.IdempotencyKey.objects.values_list("key", flat=True)),
+            ["key-3"],
+        )
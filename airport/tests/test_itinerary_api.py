@@ -0,0 +1,140 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport import models
+from airport.itineraries import flight_graph
+
+
+ITINERARY_URL = reverse("airport:itinerary-list")
+
+
+class ItineraryApiTest(TestCase):
+    def setUp(self) -> None:
+        flight_graph.reset()
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        country = models.Country.objects.create(name="Country")
+        city = models.City.objects.create(name="City", country=country)
+        self.airports = [
+            models.Airport.objects.create(name=name, city=city)
+            for name in ("A", "B", "C", "D")
+        ]
+        airplane_type = models.AirplaneType.objects.create(name="Type")
+        self.airplane = models.Airplane.objects.create(
+            name="Airplane",
+            airplane_type=airplane_type,
+            rows=2,
+            seats_in_row=2,
+        )
+        self.start = (timezone.now() + timedelta(days=1)).replace(
+            hour=6, minute=0, second=0, microsecond=0
+        )
+
+    def sample_flight(self, source, destination, departure_hours, hours=2):
+        route, _ = models.Route.objects.get_or_create(
+            source=source,
+            destination=destination,
+            defaults={"distance": 1000},
+        )
+        departure_time = self.start + timedelta(hours=departure_hours)
+        return models.Flight.objects.create(
+            route=route,
+            airplane=self.airplane,
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=hours),
+        )
+
+    def search(self, **params):
+        a, _, _, d = self.airports
+        defaults = {
+            "source_airport": a.id,
+            "destination_airport": d.id,
+            "departure_from": self.start.date().isoformat(),
+        }
+        defaults.update(params)
+        return self.client.get(ITINERARY_URL, defaults)
+
+    def flight_ids(self, response):
+        return [
+            [flight["id"] for flight in itinerary["flights"]]
+            for itinerary in response.data
+        ]
+
+    def test_connecting_itineraries_ranked_by_arrival(self):
+        a, b, c, d = self.airports
+        direct = self.sample_flight(a, d, 0, hours=12)
+        a_b = self.sample_flight(a, b, 0)
+        b_d = self.sample_flight(b, d, 3)
+        a_c = self.sample_flight(a, c, 1)
+        c_d = self.sample_flight(c, d, 5)
+
+        response = self.search()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.flight_ids(response),
+            [[a_b.id, b_d.id], [a_c.id, c_d.id], [direct.id]],
+        )
+        self.assertEqual(response.data[0]["layovers"], ["01:00:00"])
+
+    def test_layover_limits(self):
+        a, b, _, d = self.airports
+        a_b = self.sample_flight(a, b, 0)
+        self.sample_flight(b, d, 2, hours=1)
+        b_d = self.sample_flight(b, d, 6)
+
+        response = self.search(min_layover=60, max_layover=300)
+
+        self.assertEqual(self.flight_ids(response), [[a_b.id, b_d.id]])
+
+    def test_max_legs(self):
+        a, b, c, d = self.airports
+        self.sample_flight(a, b, 0)
+        self.sample_flight(b, c, 3)
+        self.sample_flight(c, d, 6)
+
+        self.assertEqual(self.search(max_legs=2).data, [])
+        self.assertEqual(len(self.search(max_legs=3).data), 1)
+
+    def test_full_flights_are_skipped(self):
+        a, _, _, d = self.airports
+        flight = self.sample_flight(a, d, 0)
+        models.Flight.objects.filter(id=flight.id).update(seats_sold=3)
+
+        self.assertEqual(len(self.search(passengers=1).data), 1)
+        self.assertEqual(self.search(passengers=2).data, [])
+
+    def test_graph_refreshed_after_flight_change(self):
+        a, b, _, d = self.airports
+        self.assertEqual(self.search().data, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            flight = self.sample_flight(a, d, 0)
+        self.assertEqual(self.flight_ids(self.search()), [[flight.id]])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            flight.route = models.Route.objects.create(
+                source=a, destination=b, distance=10
+            )
+            flight.save()
+        self.assertEqual(self.search().data, [])
+
+    def test_source_airport_required(self):
+        response = self.client.get(
+            ITINERARY_URL, {"destination_airport": self.airports[0].id}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.middleware_probe import PROBE, get_timings, instrument
+
+
+ROUTE_URL = reverse("airport:route-list")
+
+
+class InstrumentTest(SimpleTestCase):
+    def test_probe_before_every_middleware_and_view(self):
+        self.assertEqual(
+            instrument(["first", "second"]),
+            [PROBE, "first", PROBE, "second", PROBE],
+        )
+
+    def test_timings_subtract_inner_spans(self):
+        timings = get_timings([("first", 10.0), ("second", 7.5), ("view", 5)])
+
+        self.assertEqual(
+            timings, [("first", 2.5), ("second", 2.5), ("view", 5)]
+        )
+
+
+@override_settings(
+    MIDDLEWARE=instrument(
+        [
+            "django.middleware.security.SecurityMiddleware",
+            "django.middleware.common.CommonMiddleware",
+            "airport.middleware.ReplicaPinningMiddleware",
+        ]
+    )
+)
+class MiddlewareProbeTest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("user@test.com", "testpass")
+        )
+
+    def test_server_timing_per_middleware(self):
+        response = self.client.get(ROUTE_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [
+            entry.split(";")[0]
+            for entry in response["Server-Timing"].split(", ")
+        ]
+        self.assertEqual(
+            names,
+            [
+                "SecurityMiddleware",
+                "CommonMiddleware",
+                "ReplicaPinningMiddleware",
+                "view",
+            ],
+        )
+
+    def test_error_responses_are_timed(self):
+        self.client.force_authenticate(None)
+
+        response = self.client.get(ROUTE_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("view;dur=", response["Server-Timing"])
@@ -1,15 +1,27 @@
-from django.test import TestCase
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
 
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.views import APIView
 
-from airport import models
+from airport import booking, models
 from airport.serializers import OrderListSerializer
 
 
 ORDER_URL = reverse("airport:order-list")
+BULK_ORDER_URL = reverse("airport:order-bulk")
+
+# Throttle counters are shared in the database and add their own queries
+without_throttling = mock.patch.object(APIView, "throttle_classes", ())
 
 
 def sample_flight(airplane_type, country, *params):
@@ -116,12 +128,51 @@ class AuthenticatedOrderApiTest(TestCase):
 
         response = self.client.get(ORDER_URL)
 
-        orders = models.Order.objects.all()
+        orders = models.Order.objects.with_ticket_flights()
         serializer = OrderListSerializer(orders, many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def test_list_order_includes_tickets_available(self):
+        self.client.post(
+            ORDER_URL,
+            {"tickets": [{"flight": self.flight.id, "row": 1, "seat": 1}]},
+            format="json",
+        )
+
+        response = self.client.get(ORDER_URL)
+
+        flight = response.data["results"][0]["tickets"][0]["flight"]
+        self.assertEqual(
+            flight["tickets_available"], self.flight.airplane.capacity - 1
+        )
+
+    @without_throttling
+    def test_list_order_query_count_does_not_grow_with_orders(self):
+        flights = [self.flight] + [
+            sample_flight(self.airplane_type, self.country)
+            for _ in range(2)
+        ]
+        sample_order([[self.flight, 1, 1]], self.user)
+
+        # Page count, orders, tickets and their flights
+        with self.assertNumQueries(4):
+            self.client.get(ORDER_URL)
+
+        for row in range(2, 8):
+            sample_order(
+                [
+                    [flight, row, seat]
+                    for seat, flight in enumerate(flights, start=1)
+                ],
+                self.user,
+            )
+
+        with self.assertNumQueries(4):
+            response = self.client.get(ORDER_URL)
+        self.assertEqual(len(response.data["results"]), 7)
+
     def test_create_order(self):
         payload = {
             "tickets": [
@@ -196,3 +247,347 @@ class AuthenticatedOrderApiTest(TestCase):
         response = self.client.post(ORDER_URL, payload, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_order_updates_seats_sold(self):
+        payload = {
+            "tickets": [
+                {
+                    "flight": self.flight.id,
+                    "row": 1,
+                    "seat": 1,
+                },
+                {
+                    "flight": self.flight.id,
+                    "row": 1,
+                    "seat": 2,
+                },
+            ]
+        }
+
+        response = self.client.post(ORDER_URL, payload, format="json")
+        self.flight.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.flight.seats_sold, 2)
+
+    def test_failed_order_does_not_update_seats_sold(self):
+        sample_order([[self.flight, 1, 1]], self.user)
+        payload = {
+            "tickets": [
+                {
+                    "flight": self.flight.id,
+                    "row": 2,
+                    "seat": 2,
+                },
+                {
+                    "flight": self.flight.id,
+                    "row": 1,
+                    "seat": 1,
+                },
+            ]
+        }
+
+        response = self.client.post(ORDER_URL, payload, format="json")
+        self.flight.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.flight.seats_sold, 0)
+
+    def test_book_tickets_query_count_does_not_grow_with_tickets(self):
+        def book(seats):
+            order = models.Order.objects.create(user=self.user)
+            tickets_data = [
+                {"flight": self.flight, "row": row, "seat": seat}
+                for row, seat in seats
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                with transaction.atomic():
+                    booking.book_tickets(order, tickets_data)
+            return len(queries)
+
+        # The first booking builds the stored seat map
+        book([(1, 1)])
+        single = book([(1, 2)])
+        group = book([(2, seat) for seat in range(1, 7)])
+
+        self.assertEqual(single, group)
+        self.assertEqual(self.flight.tickets.count(), 8)
+
+    def test_create_order_query_count_does_not_grow_with_tickets(self):
+        other_flight = sample_flight(self.airplane_type, self.country)
+
+        def create_order(tickets):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    ORDER_URL, {"tickets": tickets}, format="json"
+                )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return len(queries)
+
+        # The first bookings build the stored seat maps
+        create_order(
+            [
+                {"flight": self.flight.id, "row": 1, "seat": 1},
+                {"flight": other_flight.id, "row": 1, "seat": 1},
+            ]
+        )
+        single = create_order(
+            [
+                {"flight": self.flight.id, "row": 1, "seat": 2},
+                {"flight": other_flight.id, "row": 1, "seat": 2},
+            ]
+        )
+        group = create_order(
+            [
+                {"flight": flight.id, "row": 2, "seat": seat}
+                for flight in (self.flight, other_flight)
+                for seat in range(1, 7)
+            ]
+        )
+
+        self.assertEqual(single, group)
+
+    def test_create_order_reports_repeated_seat_per_ticket(self):
+        payload = {
+            "tickets": [
+                {"flight": self.flight.id, "row": 1, "seat": 1},
+                {"flight": self.flight.id, "row": 1, "seat": 2},
+                {"flight": self.flight.id, "row": 1, "seat": 1},
+            ]
+        }
+
+        response = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["tickets"][:2], [{}, {}])
+        self.assertIn("seat", response.data["tickets"][2])
+
+    def test_create_order_with_unknown_flight(self):
+        payload = {
+            "tickets": [
+                {"flight": self.flight.id + 100, "row": 1, "seat": 1},
+            ]
+        }
+
+        response = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("flight", response.data["tickets"][0])
+
+    def test_create_order_reports_taken_seat_per_ticket(self):
+        sample_order([[self.flight, 1, 1]], self.user)
+        payload = {
+            "tickets": [
+                {
+                    "flight": self.flight.id,
+                    "row": 2,
+                    "seat": 2,
+                },
+                {
+                    "flight": self.flight.id,
+                    "row": 1,
+                    "seat": 1,
+                },
+            ]
+        }
+
+        response = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["tickets"][0], {})
+        self.assertIn("seat", response.data["tickets"][1])
+        self.assertFalse(models.Order.objects.filter(tickets=None).exists())
+
+
+class BookingStrategyTest(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "user@test.com",
+            "testpass",
+        )
+        self.flight = sample_flight(
+            models.AirplaneType.objects.create(name="Test airplane type"),
+            models.Country.objects.create(name="Test country"),
+        )
+
+    def book(self, seats, strategy):
+        order = models.Order.objects.create(user=self.user)
+        with transaction.atomic():
+            return booking.book_tickets(
+                order,
+                [
+                    {"flight": self.flight, "row": row, "seat": seat}
+                    for row, seat in seats
+                ],
+                strategy=strategy,
+            )
+
+    def test_strategies_book_and_reject_taken_seats(self):
+        for row, strategy in enumerate(booking.BOOKING_STRATEGIES, start=1):
+            with self.subTest(strategy=strategy):
+                self.book([(row, 1), (row, 2)], strategy)
+
+                with self.assertRaises(ValidationError):
+                    self.book([(row, 3), (row, 2)], strategy)
+
+                self.flight.refresh_from_db()
+                self.assertEqual(self.flight.seats_sold, row * 2)
+                self.assertTrue(
+                    self.flight.get_seat_map().is_taken(row, 2)
+                )
+                self.assertFalse(
+                    self.flight.get_seat_map().is_taken(row, 3)
+                )
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.book([(1, 1)], "unknown")
+
+    def bump_version_on_read(self, times):
+        read_flights = booking._read_flights
+
+        def stale_read(flight_ids):
+            flights = read_flights(flight_ids)
+            if stale_read.remaining:
+                stale_read.remaining -= 1
+                models.Flight.objects.filter(id__in=flight_ids).update(
+                    version=F("version") + 1
+                )
+            return flights
+
+        stale_read.remaining = times
+        return mock.patch.object(booking, "_read_flights", stale_read)
+
+    @override_settings(BOOKING_OPTIMISTIC_RETRIES=1)
+    def test_optimistic_strategy_retries_on_version_conflict(self):
+        with self.bump_version_on_read(times=1):
+            self.book([(1, 1)], "optimistic")
+
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_sold, 1)
+        self.assertEqual(self.flight.tickets.count(), 1)
+
+    @override_settings(BOOKING_OPTIMISTIC_RETRIES=1)
+    def test_optimistic_strategy_gives_up_after_retries(self):
+        with self.bump_version_on_read(times=2):
+            with self.assertRaises(booking.BookingConflict):
+                self.book([(1, 1)], "optimistic")
+
+        self.assertFalse(self.flight.tickets.exists())
+
+
+class BulkOrderApiTest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.country = models.Country.objects.create(name="Test country")
+        self.airplane_type = models.AirplaneType.objects.create(
+            name="Test airplane type",
+        )
+        self.flight = sample_flight(self.airplane_type, self.country)
+        self.other_flight = sample_flight(self.airplane_type, self.country)
+
+    def post_orders(self, orders):
+        return self.client.post(
+            BULK_ORDER_URL, {"orders": orders}, format="json"
+        )
+
+    def test_bulk_orders_succeed_or_fail_on_their_own(self):
+        sample_order([[self.flight, 5, 5]], self.user)
+
+        response = self.post_orders(
+            [
+                {"tickets": [
+                    {"flight": self.flight.id, "row": 1, "seat": 1},
+                    {"flight": self.other_flight.id, "row": 1, "seat": 1},
+                ]},
+                {"tickets": [{"flight": self.flight.id, "row": 500,
+                              "seat": 1}]},
+                {"tickets": [{"flight": self.flight.id, "row": 1,
+                              "seat": 1}]},
+                {"tickets": [{"flight": self.flight.id, "row": 5,
+                              "seat": 5}]},
+                {"tickets": [{"flight": self.flight.id, "row": 2,
+                              "seat": 2}]},
+            ]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["failed"], 3)
+        results = response.data["results"]
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["created", "failed", "failed", "failed", "created"],
+        )
+        self.assertEqual(len(results[0]["order"]["tickets"]), 2)
+        self.assertIn("row", results[1]["errors"]["tickets"][0])
+        self.assertIn("seat", results[2]["errors"]["tickets"][0])
+        self.assertIn("seat", results[3]["errors"]["tickets"][0])
+        self.assertEqual(
+            models.Order.objects.filter(user=self.user).count(), 3
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_sold, 2)
+
+    def test_bulk_orders_query_count_does_not_grow_with_orders(self):
+        def post_orders(first_row, count):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post_orders(
+                    [
+                        {"tickets": [
+                            {"flight": flight.id, "row": row, "seat": 1}
+                            for flight in (self.flight, self.other_flight)
+                        ]}
+                        for row in range(first_row, first_row + count)
+                    ]
+                )
+            self.assertEqual(response.data["created"], count)
+            return len(queries)
+
+        # The first bookings build the stored seat maps
+        post_orders(1, 1)
+        single = post_orders(2, 1)
+        many = post_orders(3, 20)
+
+        self.assertEqual(single, many)
+
+    def test_bulk_orders_fail_on_repeated_conflicts(self):
+        bulk_create = models.Ticket.objects.bulk_create
+
+        def conflicting_bulk_create(tickets):
+            tickets = list(tickets)
+            if any(ticket.row == 2 for ticket in tickets):
+                # A concurrent booking takes the seat every time
+                raise IntegrityError()
+            return bulk_create(tickets)
+
+        with mock.patch.object(
+            models.Ticket.objects, "bulk_create", conflicting_bulk_create
+        ):
+            response = self.post_orders(
+                [
+                    {"tickets": [{"flight": self.flight.id, "row": 1,
+                                  "seat": 1}]},
+                    {"tickets": [{"flight": self.flight.id, "row": 2,
+                                  "seat": 1}]},
+                ]
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 0)
+        self.assertEqual(response.data["failed"], 2)
+        self.assertEqual(
+            response.data["results"][0]["errors"],
+            {"detail": booking.BookingConflict.default_detail},
+        )
+        self.assertFalse(models.Order.objects.filter(user=self.user))
+
+    def test_bulk_orders_require_orders(self):
+        response = self.post_orders([])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,168 @@
+import csv
+import json
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport import models
+
+
+EXPORT_URL = reverse("airport:order-export")
+
+
+def sample_flight():
+    country = models.Country.objects.create(name="Test country")
+    city = models.City.objects.create(name="Test city", country=country)
+    airport_1 = models.Airport.objects.create(name="Airport 1", city=city)
+    airport_2 = models.Airport.objects.create(name="Airport 2", city=city)
+    route = models.Route.objects.create(
+        source=airport_1,
+        destination=airport_2,
+        distance=1234,
+    )
+    airplane_type = models.AirplaneType.objects.create(name="Test type")
+    airplane = models.Airplane.objects.create(
+        name="Test airplane",
+        airplane_type=airplane_type,
+        rows=10,
+        seats_in_row=4,
+    )
+
+    return models.Flight.objects.create(
+        route=route,
+        airplane=airplane,
+        departure_time="2024-09-01 12:00:00",
+        arrival_time="2024-09-02 12:00:00",
+    )
+
+
+def sample_order(user, flight, seats, created_at):
+    order = models.Order.objects.create(user=user)
+    models.Order.objects.filter(id=order.id).update(created_at=created_at)
+    for row, seat in seats:
+        models.Ticket.objects.create(
+            order=order, flight=flight, row=row, seat=seat
+        )
+    return order
+
+
+def read_ndjson(response) -> list[dict]:
+    content = b"".join(response.streaming_content).decode()
+    return [json.loads(line) for line in content.splitlines()]
+
+
+class OrderExportApiTest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com",
+            "testpass",
+        )
+        self.other_user = get_user_model().objects.create_user(
+            "other@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        flight = sample_flight()
+        self.first = sample_order(
+            self.user, flight, [(1, 1), (1, 2)], datetime(2024, 8, 1, 10)
+        )
+        self.second = sample_order(
+            self.user, flight, [(2, 1)], datetime(2024, 8, 2, 18)
+        )
+        self.foreign = sample_order(
+            self.other_user, flight, [(3, 1)], datetime(2024, 8, 1, 12)
+        )
+
+    def test_export_own_orders_as_ndjson(self):
+        response = self.client.get(EXPORT_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = read_ndjson(response)
+        self.assertEqual(
+            [(row["order_id"], row["row"], row["seat"]) for row in rows],
+            [
+                (self.first.id, 1, 1),
+                (self.first.id, 1, 2),
+                (self.second.id, 2, 1),
+            ],
+        )
+        self.assertEqual(rows[0]["source"], "Airport 1")
+        self.assertEqual(rows[0]["order_created_at"], "2024-08-01T10:00:00")
+
+    def test_export_as_csv(self):
+        response = self.client.get(EXPORT_URL, {"output": "csv"})
+
+        rows = list(
+            csv.DictReader(
+                StringIO(b"".join(response.streaming_content).decode())
+            )
+        )
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2]["order_id"], str(self.second.id))
+        self.assertEqual(rows[2]["user_email"], "user@test.com")
+
+    def test_export_filtered_by_created_date(self):
+        response = self.client.get(
+            EXPORT_URL,
+            {"created_from": "2024-08-01T12:00", "created_to": "2024-08-02"},
+        )
+
+        self.assertEqual(
+            {row["order_id"] for row in read_ndjson(response)},
+            {self.second.id},
+        )
+
+    def test_export_of_another_user_requires_admin(self):
+        response = self.client.get(EXPORT_URL, {"user": self.other_user.id})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_admin_exports_orders_of_any_user(self):
+        admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "testpass"
+        )
+        self.client.force_authenticate(admin)
+
+        all_rows = read_ndjson(self.client.get(EXPORT_URL))
+        user_rows = read_ndjson(
+            self.client.get(EXPORT_URL, {"user": self.other_user.id})
+        )
+
+        self.assertEqual(len(all_rows), 4)
+        self.assertEqual(
+            [row["order_id"] for row in user_rows], [self.foreign.id]
+        )
+
+    def test_export_with_unknown_output(self):
+        response = self.client.get(EXPORT_URL, {"output": "xml"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_orders_command(self):
+        out = StringIO()
+
+        call_command(
+            "export_orders",
+            "--user", str(self.user.id),
+            "--created-to", "2024-08-01",
+            "--chunk-size", "1",
+            stdout=out,
+        )
+
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(
+            [row["ticket_id"] for row in rows],
+            list(self.first.tickets.order_by("id").values_list(
+                "id", flat=True
+            )),
+        )
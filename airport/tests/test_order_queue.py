@@ -0,0 +1,151 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport import models, order_queue
+
+
+ORDER_URL = reverse("airport:order-list")
+ORDER_REQUEST_URL = reverse("airport:orderrequest-list")
+
+
+def detail_url(order_request_id: int) -> str:
+    return reverse("airport:orderrequest-detail", args=[order_request_id])
+
+
+def sample_flight(name="Test"):
+    country = models.Country.objects.create(name=f"{name} country")
+    city = models.City.objects.create(name="Test city", country=country)
+    airport_1 = models.Airport.objects.create(name="Airport 1", city=city)
+    airport_2 = models.Airport.objects.create(name="Airport 2", city=city)
+    route = models.Route.objects.create(
+        source=airport_1,
+        destination=airport_2,
+        distance=1234,
+    )
+    airplane_type = models.AirplaneType.objects.create(name=f"{name} type")
+    airplane = models.Airplane.objects.create(
+        name="Test airplane",
+        airplane_type=airplane_type,
+        rows=10,
+        seats_in_row=4,
+    )
+
+    return models.Flight.objects.create(
+        route=route,
+        airplane=airplane,
+        departure_time="2024-09-01 12:00:00",
+        arrival_time="2024-09-02 12:00:00",
+    )
+
+
+class AsyncOrderApiTest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def queue_order(self, seats, flight=None):
+        flight = flight or self.flight
+        return self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"flight": flight.id, "row": row, "seat": seat}
+                    for row, seat in seats
+                ]
+            },
+            format="json",
+            headers={"Prefer": "respond-async"},
+        )
+
+    def test_prefers_async(self):
+        for header, expected in [
+            ("respond-async", True),
+            ("return=minimal, Respond-Async; wait=10", True),
+            ("return=representation", False),
+            ("", False),
+        ]:
+            with self.subTest(header=header):
+                request = APIClient().get(
+                    "/", headers={"Prefer": header}
+                ).wsgi_request
+                self.assertEqual(
+                    order_queue.prefers_async(request), expected
+                )
+
+    def test_async_order_is_queued(self):
+        response = self.queue_order([(1, 1), (1, 2)])
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], "pending")
+        self.assertTrue(
+            response.headers["Location"].endswith(
+                detail_url(response.data["id"])
+            )
+        )
+        self.assertFalse(models.Order.objects.exists())
+        self.assertFalse(models.Ticket.objects.exists())
+
+    def test_invalid_async_order_is_rejected_immediately(self):
+        response = self.queue_order([(1, 100)])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(models.OrderRequest.objects.exists())
+
+    def test_worker_settles_requests_per_flight(self):
+        other_flight = sample_flight("Other")
+        first = self.queue_order([(1, 1), (1, 2)]).data["id"]
+        second = self.queue_order([(1, 2), (1, 3)]).data["id"]
+        third = self.queue_order([(1, 1)], flight=other_flight).data["id"]
+        out = StringIO()
+
+        call_command("process_order_requests", "--once", stdout=out)
+
+        self.assertIn("completed: 2, rejected: 1", out.getvalue())
+        first, second, third = (
+            self.client.get(detail_url(order_request_id)).data
+            for order_request_id in (first, second, third)
+        )
+        self.assertEqual(first["status"], "completed")
+        self.assertEqual(second["status"], "rejected")
+        self.assertIn("seat", second["errors"]["tickets"][0])
+        self.assertEqual(third["status"], "completed")
+        self.assertEqual(
+            models.Order.objects.get(id=first["order"]).tickets.count(), 2
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_sold, 2)
+
+    def test_worker_skips_settled_requests(self):
+        self.queue_order([(1, 1)])
+        call_command("process_order_requests", "--once", stdout=StringIO())
+        out = StringIO()
+
+        call_command("process_order_requests", "--once", stdout=out)
+
+        self.assertEqual(out.getvalue(), "")
+        self.assertEqual(models.Order.objects.count(), 1)
+
+    def test_request_of_another_user_is_not_visible(self):
+        order_request_id = self.queue_order([(1, 1)]).data["id"]
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("other@test.com", "pass")
+        )
+
+        response = self.client.get(detail_url(order_request_id))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(
+            self.client.get(ORDER_REQUEST_URL).data["results"], []
+        )
@@ -0,0 +1,171 @@
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import (
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport import db_routers, models
+from airport.middleware import ReplicaPinningMiddleware
+
+
+ROUTE_URL = reverse("airport:route-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+def auth_header(user) -> dict:
+    return {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+
+
+class ReplicaRouterTest(TransactionTestCase):
+    def setUp(self) -> None:
+        self.router = db_routers.ReplicaRouter()
+
+    def test_reads_use_primary_by_default(self):
+        self.assertEqual(self.router.db_for_read(models.Route), "default")
+
+    def test_reads_use_chosen_replica(self):
+        with db_routers.reading_from("replica_1"):
+            self.assertEqual(
+                self.router.db_for_read(models.Route), "replica_1"
+            )
+            self.assertEqual(self.router.db_for_write(models.Route), "default")
+
+    def test_reads_in_transaction_use_primary(self):
+        with db_routers.reading_from("replica_1"), transaction.atomic():
+            self.assertEqual(self.router.db_for_read(models.Route), "default")
+
+    @override_settings(DATABASE_REPLICAS=["replica_1"])
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate("replica_1", "airport"))
+        self.assertTrue(self.router.allow_migrate("default", "airport"))
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class ReplicaPinningMiddlewareTest(TestCase):
+    def setUp(self) -> None:
+        self.factory = RequestFactory()
+        self.middleware = ReplicaPinningMiddleware(
+            lambda request: db_routers.read_alias.get()
+        )
+        self.user = get_user_model().objects.create_user(
+            "user@test.com",
+            "testpass",
+        )
+
+    def test_safe_request_reads_from_replica(self):
+        request = self.factory.get(ROUTE_URL, **auth_header(self.user))
+
+        self.assertEqual(self.middleware(request), "replica_1")
+        self.assertIsNone(db_routers.read_alias.get())
+
+    def test_unsafe_request_uses_primary(self):
+        request = self.factory.post(ORDER_URL, **auth_header(self.user))
+
+        self.assertIsNone(self.middleware(request))
+
+    def test_user_is_pinned_after_write(self):
+        self.middleware(self.factory.post(ORDER_URL, **auth_header(self.user)))
+        other_user = get_user_model().objects.create_user(
+            "other@test.com",
+            "testpass",
+        )
+
+        self.assertIsNone(
+            self.middleware(
+                self.factory.get(ORDER_URL, **auth_header(self.user))
+            )
+        )
+        self.assertEqual(
+            self.middleware(
+                self.factory.get(ORDER_URL, **auth_header(other_user))
+            ),
+            "replica_1",
+        )
+
+    def test_pin_is_shared_between_workers(self):
+        self.middleware(self.factory.post(ORDER_URL, **auth_header(self.user)))
+
+        # Nothing is kept in the memory of the worker that pinned the user
+        cache.clear()
+
+        self.assertIsNone(
+            self.middleware(
+                self.factory.get(ORDER_URL, **auth_header(self.user))
+            )
+        )
+
+    def test_pin_expires(self):
+        self.middleware(self.factory.post(ORDER_URL, **auth_header(self.user)))
+
+        models.SharedCounter.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        self.assertEqual(
+            self.middleware(
+                self.factory.get(ORDER_URL, **auth_header(self.user))
+            ),
+            "replica_1",
+        )
+
+    def test_invalid_token_is_not_pinned(self):
+        header = {"HTTP_AUTHORIZATION": "Bearer invalid"}
+        self.middleware(self.factory.post(ORDER_URL, **header))
+
+        self.assertEqual(
+            self.middleware(self.factory.get(ORDER_URL, **header)),
+            "replica_1",
+        )
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_reads_use_primary(self):
+        self.assertIsNone(self.middleware(self.factory.get(ROUTE_URL)))
+
+
+@skipUnless(
+    "replica_1" in settings.DATABASES,
+    "Needs a replica_1 database alias (POSTGRES_REPLICA_HOSTS or "
+    "airport_service.settings_test)",
+)
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class ReplicaRoutingApiTest(TransactionTestCase):
+
+    databases = "__all__"
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com",
+            "testpass",
+        )
+
+    def test_list_reads_from_replica(self):
+        with CaptureQueriesContext(connections["replica_1"]) as queries:
+            response = self.client.get(ROUTE_URL, **auth_header(self.user))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(queries.captured_queries)
+
+    def test_user_reads_own_order_from_primary(self):
+        self.client.post(ORDER_URL, {"tickets": []}, **auth_header(self.user))
+
+        with CaptureQueriesContext(connections["replica_1"]) as queries:
+            response = self.client.get(ORDER_URL, **auth_header(self.user))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries.captured_queries, [])
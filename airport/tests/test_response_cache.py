@@ -0,0 +1,215 @@
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache as default_cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework.views import APIView
+
+from airport import cache, models, views
+
+
+COUNTRY_URL = reverse("airport:country-list")
+CITY_URL = reverse("airport:city-list")
+AIRPORT_URL = reverse("airport:airport-list")
+
+# Throttle counters are shared in the database and add their own queries
+without_throttling = mock.patch.object(APIView, "throttle_classes", ())
+
+
+def airport_detail_url(airport_id: int) -> str:
+    return reverse("airport:airport-detail", args=[airport_id])
+
+
+def later(seconds: int):
+    now = time.time()
+    return mock.patch("airport.cache.time.time", return_value=now + seconds)
+
+
+class ResponseCacheTest(TestCase):
+    def setUp(self) -> None:
+        default_cache.clear()
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        self.country = models.Country.objects.create(name="Country")
+        models.City.objects.create(name="City", country=self.country)
+
+    @without_throttling
+    def test_list_served_from_cache(self):
+        response = self.client.get(COUNTRY_URL)
+
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(COUNTRY_URL)
+
+        self.assertEqual(cached_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached_response.data, response.data)
+        self.assertEqual(
+            cache.get_stats("airport.country"),
+            {"hits": 1, "stale": 0, "misses": 1},
+        )
+
+    def test_query_params_are_normalized(self):
+        self.client.get(COUNTRY_URL, {"a": "1", "b": "2"})
+        self.client.get(COUNTRY_URL, {"b": "2", "a": "1"})
+        self.client.get(COUNTRY_URL, {"a": "2", "b": "2"})
+
+        self.assertEqual(
+            cache.get_stats("airport.country"),
+            {"hits": 1, "stale": 0, "misses": 2},
+        )
+
+    def test_create_bumps_version(self):
+        self.client.get(COUNTRY_URL)
+
+        models.Country.objects.create(name="New country")
+        response = self.client.get(COUNTRY_URL)
+
+        self.assertEqual(len(response.data), 2)
+
+    def test_evicted_version_does_not_restart(self):
+        self.client.get(COUNTRY_URL)
+        models.Country.objects.create(name="New country")
+
+        cache.get_response_cache().delete(
+            cache.VERSION_KEY.format(label="airport.country")
+        )
+        response = self.client.get(COUNTRY_URL)
+
+        self.assertEqual(len(response.data), 2)
+
+    def test_dependency_change_invalidates_list(self):
+        self.client.get(CITY_URL)
+
+        self.country.name = "Renamed country"
+        self.country.save()
+        response = self.client.get(CITY_URL)
+
+        self.assertEqual(response.data[0]["country"], "Renamed country")
+
+    def test_country_change_invalidates_airport_detail(self):
+        city = models.City.objects.get()
+        airport = models.Airport.objects.create(name="Airport", city=city)
+        self.client.get(airport_detail_url(airport.id))
+
+        self.country.name = "Renamed country"
+        self.country.save()
+        response = self.client.get(airport_detail_url(airport.id))
+
+        self.assertEqual(response.data["country"], "Renamed country")
+
+    def test_new_airport_is_listed_after_version_bump(self):
+        city = models.City.objects.get()
+        models.Airport.objects.create(name="Airport 1", city=city)
+        self.client.get(AIRPORT_URL)
+
+        models.Airport.objects.create(name="Airport 2", city=city)
+        response = self.client.get(AIRPORT_URL)
+
+        self.assertEqual(len(response.data), 2)
+
+    def test_stats_command(self):
+        self.client.get(COUNTRY_URL)
+        self.client.get(COUNTRY_URL)
+        out = StringIO()
+
+        call_command("response_cache_stats", "--reset", stdout=out)
+
+        self.assertIn(
+            "airport.country: hits=1 stale=0 misses=1 "
+            "hit_ratio=50.00%",
+            out.getvalue(),
+        )
+        self.assertEqual(
+            cache.get_stats("airport.country"),
+            {"hits": 0, "stale": 0, "misses": 0},
+        )
+
+    @without_throttling
+    def test_retrieve_served_from_cache(self):
+        city = models.City.objects.get()
+        airport = models.Airport.objects.create(name="Airport", city=city)
+        url = airport_detail_url(airport.id)
+        response = self.client.get(url)
+
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(url)
+
+        self.assertEqual(cached_response.data, response.data)
+        self.assertEqual(cache.get_stats("airport.airport")["hits"], 1)
+
+    def test_timeout_per_action(self):
+        with mock.patch.object(
+            views.CountryViewSet, "cache_timeouts", {"list": 10}
+        ):
+            self.client.get(COUNTRY_URL)
+            with later(5):
+                self.client.get(COUNTRY_URL)
+            with later(11):
+                self.client.get(COUNTRY_URL)
+
+        self.assertEqual(
+            cache.get_stats("airport.country"),
+            {"hits": 1, "stale": 0, "misses": 2},
+        )
+
+    def test_scope_is_part_of_key(self):
+        self.client.get(COUNTRY_URL)
+        admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "testpass"
+        )
+        self.client.force_authenticate(admin)
+
+        self.client.get(COUNTRY_URL)
+
+        self.assertEqual(cache.get_stats("airport.country")["misses"], 2)
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=10)
+    def test_stale_response_served_while_refreshing(self):
+        self.client.get(COUNTRY_URL)
+        models.Country.objects.update(name="Renamed country")
+        response_cache = cache.get_response_cache()
+        add = response_cache.add
+
+        def add_while_locked(key, *args, **kwargs):
+            # Another request holds the refresh lock
+            return not key.endswith(":lock") and add(key, *args, **kwargs)
+
+        with later(20), mock.patch.object(
+            response_cache, "add", add_while_locked
+        ):
+            stale_response = self.client.get(COUNTRY_URL)
+        with later(20):
+            refreshed_response = self.client.get(COUNTRY_URL)
+
+        self.assertEqual(stale_response.data[0]["name"], "Country")
+        self.assertEqual(
+            refreshed_response.data[0]["name"], "Renamed country"
+        )
+        self.assertEqual(
+            cache.get_stats("airport.country"),
+            {"hits": 0, "stale": 1, "misses": 2},
+        )
+
+    @override_settings(
+        RESPONSE_CACHE_TIMEOUT=10, RESPONSE_CACHE_STALE_TIMEOUT=0
+    )
+    def test_stale_timeout_zero_disables_stale_responses(self):
+        self.client.get(COUNTRY_URL)
+        models.Country.objects.update(name="Renamed country")
+
+        with later(20):
+            response = self.client.get(COUNTRY_URL)
+
+        self.assertEqual(response.data[0]["name"], "Renamed country")
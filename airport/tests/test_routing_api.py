@@ -0,0 +1,121 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport import models
+from airport.routing import route_network
+
+
+SHORTEST_PATH_URL = reverse("airport:routing-shortest-path")
+REACHABLE_URL = reverse("airport:routing-reachable")
+ROUTE_URL = reverse("airport:route-list")
+
+
+class RoutingApiTest(TestCase):
+    def setUp(self) -> None:
+        route_network.invalidate()
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com",
+            "testpass",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.user)
+
+        country = models.Country.objects.create(name="Country")
+        city = models.City.objects.create(name="City", country=country)
+        self.a, self.b, self.c, self.d, self.e = [
+            models.Airport.objects.create(name=name, city=city)
+            for name in ("A", "B", "C", "D", "E")
+        ]
+        self.a_b = self.sample_route(self.a, self.b, 100)
+        self.b_c = self.sample_route(self.b, self.c, 100)
+        self.a_c = self.sample_route(self.a, self.c, 500)
+        self.d_e = self.sample_route(self.d, self.e, 50)
+
+    @staticmethod
+    def sample_route(source, destination, distance):
+        return models.Route.objects.create(
+            source=source, destination=destination, distance=distance
+        )
+
+    def test_shortest_path(self):
+        response = self.client.get(
+            SHORTEST_PATH_URL, {"source": self.a.id, "destination": self.c.id}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["distance"], 200)
+        self.assertEqual(response.data["hops"], 2)
+        self.assertEqual(
+            [airport["id"] for airport in response.data["airports"]],
+            [self.a.id, self.b.id, self.c.id],
+        )
+        self.assertEqual(response.data["routes"], [self.a_b.id, self.b_c.id])
+
+    def test_shortest_path_not_found(self):
+        response = self.client.get(
+            SHORTEST_PATH_URL, {"source": self.a.id, "destination": self.d.id}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reachable(self):
+        response = self.client.get(
+            REACHABLE_URL, {"source": self.a.id, "max_hops": 1}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(airport["id"], airport["hops"]) for airport in response.data],
+            [(self.b.id, 1), (self.c.id, 1)],
+        )
+
+    def test_created_route_invalidates_only_affected_component(self):
+        self.client.get(
+            SHORTEST_PATH_URL, {"source": self.a.id, "destination": self.c.id}
+        )
+        self.client.get(
+            SHORTEST_PATH_URL, {"source": self.d.id, "destination": self.e.id}
+        )
+        self.assertIn(self.a.id, route_network._distances)
+        self.assertIn(self.d.id, route_network._distances)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                ROUTE_URL,
+                {
+                    "source": self.c.id,
+                    "destination": self.d.id,
+                    "distance": 10,
+                },
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn(self.a.id, route_network._distances)
+        self.assertNotIn(self.d.id, route_network._distances)
+
+        response = self.client.get(
+            SHORTEST_PATH_URL, {"source": self.a.id, "destination": self.e.id}
+        )
+
+        self.assertEqual(response.data["distance"], 260)
+
+    def test_unrelated_component_stays_cached(self):
+        self.client.get(
+            SHORTEST_PATH_URL, {"source": self.d.id, "destination": self.e.id}
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sample_route(self.b, self.a, 100)
+
+        self.assertIn(self.d.id, route_network._distances)
+
+    def test_source_required(self):
+        response = self.client.get(REACHABLE_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
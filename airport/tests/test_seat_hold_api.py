@@ -0,0 +1,198 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport import models
+
+
+SEAT_HOLD_URL = reverse("airport:seathold-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+def sample_flight():
+    country = models.Country.objects.create(name="Test country")
+    city = models.City.objects.create(name="Test city", country=country)
+    airport_1 = models.Airport.objects.create(name="Airport 1", city=city)
+    airport_2 = models.Airport.objects.create(name="Airport 2", city=city)
+    route = models.Route.objects.create(
+        source=airport_1,
+        destination=airport_2,
+        distance=1234,
+    )
+    airplane_type = models.AirplaneType.objects.create(name="Test type")
+    airplane = models.Airplane.objects.create(
+        name="Test airplane",
+        airplane_type=airplane_type,
+        rows=10,
+        seats_in_row=4,
+    )
+
+    return models.Flight.objects.create(
+        route=route,
+        airplane=airplane,
+        departure_time="2024-09-01 12:00:00",
+        arrival_time="2024-09-02 12:00:00",
+    )
+
+
+def confirm_url(hold_id: int) -> str:
+    return reverse("airport:seathold-confirm", args=[hold_id])
+
+
+def expire(hold_id: int) -> None:
+    models.SeatHold.objects.filter(id=hold_id).update(
+        expires_at=timezone.now() - timedelta(seconds=1)
+    )
+
+
+class UnauthenticatedSeatHoldApiTest(TestCase):
+    def test_authentication_required(self):
+        response = APIClient().get(SEAT_HOLD_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedSeatHoldApiTest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com",
+            "testpass",
+        )
+        self.other_user = get_user_model().objects.create_user(
+            "other@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def hold(self, seats, user=None):
+        if user is not None:
+            self.client.force_authenticate(user)
+        response = self.client.post(
+            SEAT_HOLD_URL,
+            {
+                "seats": [
+                    {"flight": self.flight.id, "row": row, "seat": seat}
+                    for row, seat in seats
+                ]
+            },
+            format="json",
+        )
+        self.client.force_authenticate(self.user)
+        return response
+
+    @override_settings(SEAT_HOLD_TTL=60)
+    def test_hold_seats(self):
+        response = self.hold([(1, 1), (1, 2)])
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        hold = models.SeatHold.objects.get(id=response.data["id"])
+        self.assertEqual(hold.seats.count(), 2)
+        self.assertAlmostEqual(
+            hold.expires_at,
+            timezone.now() + timedelta(seconds=60),
+            delta=timedelta(seconds=5),
+        )
+
+    def test_seats_held_by_another_user_cannot_be_held(self):
+        self.hold([(1, 1)], user=self.other_user)
+
+        response = self.hold([(1, 2), (1, 1)])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["seats"][0], {})
+        self.assertIn("seat", response.data["seats"][1])
+
+    def test_expired_hold_does_not_block_seats(self):
+        expire(self.hold([(1, 1)], user=self.other_user).data["id"])
+
+        response = self.hold([(1, 1)])
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_seats_held_by_another_user_cannot_be_ordered(self):
+        self.hold([(1, 1)], user=self.other_user)
+
+        response = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"flight": self.flight.id, "row": 1, "seat": 1}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("seat", response.data["tickets"][0])
+
+    def test_confirm_hold_creates_order(self):
+        hold_id = self.hold([(1, 1), (2, 3)]).data["id"]
+
+        response = self.client.post(confirm_url(hold_id))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        order = models.Order.objects.get(id=response.data["id"])
+        self.assertEqual(
+            set(order.tickets.values_list("row", "seat")), {(1, 1), (2, 3)}
+        )
+        self.assertFalse(models.SeatHold.objects.exists())
+        self.assertFalse(models.HeldSeat.objects.exists())
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_sold, 2)
+
+    def test_confirm_expired_hold(self):
+        hold_id = self.hold([(1, 1)]).data["id"]
+        expire(hold_id)
+
+        response = self.client.post(confirm_url(hold_id))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(models.Order.objects.exists())
+
+    def test_confirm_hold_of_another_user(self):
+        hold_id = self.hold([(1, 1)], user=self.other_user).data["id"]
+
+        response = self.client.post(confirm_url(hold_id))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_release_hold(self):
+        hold_id = self.hold([(1, 1)]).data["id"]
+
+        response = self.client.delete(
+            reverse("airport:seathold-detail", args=[hold_id])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(models.HeldSeat.objects.exists())
+
+    def test_list_returns_only_active_holds(self):
+        active_id = self.hold([(1, 1)]).data["id"]
+        expire(self.hold([(1, 2)]).data["id"])
+
+        response = self.client.get(SEAT_HOLD_URL)
+
+        self.assertEqual(
+            [hold["id"] for hold in response.data["results"]], [active_id]
+        )
+
+    def test_expire_seat_holds_command(self):
+        active_id = self.hold([(1, 1)]).data["id"]
+        for seat in (2, 3, 4):
+            expire(self.hold([(1, seat)]).data["id"])
+        out = StringIO()
+
+        call_command("expire_seat_holds", "--batch-size", "2", stdout=out)
+
+        self.assertIn("Expired seat holds: 3", out.getvalue())
+        self.assertEqual(
+            list(models.SeatHold.objects.values_list("id", flat=True)),
+            [active_id],
+        )
+        self.assertEqual(models.HeldSeat.objects.count(), 1)
@@ -0,0 +1,243 @@
+import base64
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport import booking, models
+from airport.seatmap import SeatMap
+
+
+ORDER_URL = reverse("airport:order-list")
+
+
+def get_flight_url(flight_id: int):
+    return reverse("airport:flight-detail", args=[flight_id])
+
+
+def get_seatmap_url(flight_id: int):
+    return reverse("airport:flight-seatmap", args=[flight_id])
+
+
+def sample_flight(airplane_type, country, **params):
+    city = models.City.objects.create(name="Test city", country=country)
+    airport_1 = models.Airport.objects.create(name="Airport 1", city=city)
+    airport_2 = models.Airport.objects.create(name="Airport 2", city=city)
+    route = models.Route.objects.create(
+        source=airport_1,
+        destination=airport_2,
+        distance=1234,
+    )
+    airplane = models.Airplane.objects.create(
+        name="Test airplane",
+        airplane_type=airplane_type,
+        rows=3,
+        seats_in_row=4,
+    )
+
+    defaults = {
+        "route": route,
+        "airplane": airplane,
+        "departure_time": "2024-09-01 12:00:00",
+        "arrival_time": "2024-09-02 12:00:00",
+    }
+    defaults.update(params)
+
+    return models.Flight.objects.create(**defaults)
+
+
+class SeatMapTest(TestCase):
+    def test_take_seat_sets_bit(self):
+        seat_map = SeatMap(3, 4)
+
+        seat_map.take(1, 1)
+        seat_map.take(2, 2)
+
+        self.assertEqual(seat_map.to_bytes(), bytes([0b10000100, 0]))
+        self.assertTrue(seat_map.is_taken(2, 2))
+        self.assertFalse(seat_map.is_taken(2, 3))
+        self.assertEqual(seat_map.taken_count, 2)
+        self.assertEqual(list(seat_map.taken_seats()), [(1, 1), (2, 2)])
+
+    def test_runs(self):
+        seat_map = SeatMap.from_seats(3, 4, [(1, 2), (1, 3), (3, 4)])
+
+        self.assertEqual(seat_map.to_runs(), [[0, 1], [1, 2], [0, 8], [1, 1]])
+
+    def test_seat_out_of_cabin(self):
+        seat_map = SeatMap(3, 4)
+
+        with self.assertRaises(ValueError):
+            seat_map.take(4, 1)
+
+
+class FlightSeatMapApiTest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        country = models.Country.objects.create(name="Test country")
+        airplane_type = models.AirplaneType.objects.create(name="Test type")
+        self.flight = sample_flight(airplane_type, country)
+
+    def book(self, *seats):
+        payload = {
+            "tickets": [
+                {"flight": self.flight.id, "row": row, "seat": seat}
+                for row, seat in seats
+            ]
+        }
+        return self.client.post(ORDER_URL, payload, format="json")
+
+    def test_order_updates_seat_map(self):
+        self.book((1, 1), (3, 4))
+        self.flight.refresh_from_db()
+
+        self.assertEqual(
+            bytes(self.flight.seat_map), bytes([0b10000000, 0b00010000])
+        )
+
+    def test_seatmap_base64(self):
+        self.book((1, 1), (3, 4))
+
+        response = self.client.get(get_seatmap_url(self.flight.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["capacity"], 12)
+        self.assertEqual(response.data["taken"], 2)
+        self.assertEqual(
+            base64.b64decode(response.data["seats"]),
+            bytes([0b10000000, 0b00010000]),
+        )
+
+    def test_seatmap_rle(self):
+        self.book((1, 2))
+
+        response = self.client.get(
+            get_seatmap_url(self.flight.id), {"encoding": "rle"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["seats"], [[0, 1], [1, 1], [0, 10]])
+
+    def test_seatmap_binary(self):
+        self.book((1, 1))
+
+        response = self.client.get(
+            get_seatmap_url(self.flight.id), {"encoding": "binary"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/octet-stream")
+        self.assertEqual(response.content, bytes([0b10000000, 0]))
+
+    def test_seatmap_rebuilt_from_tickets(self):
+        order = models.Order.objects.create(user=self.user)
+        models.Ticket.objects.create(
+            flight=self.flight, order=order, row=2, seat=1
+        )
+
+        response = self.client.get(
+            get_seatmap_url(self.flight.id), {"encoding": "rle"}
+        )
+
+        self.assertEqual(response.data["seats"], [[0, 4], [1, 1], [0, 7]])
+
+    def test_seatmap_unknown_encoding(self):
+        response = self.client.get(
+            get_seatmap_url(self.flight.id), {"encoding": "hex"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_changing_airplane_resets_seat_map(self):
+        self.book((1, 1))
+        flight = models.Flight.objects.get(id=self.flight.id)
+        flight.airplane = models.Airplane.objects.create(
+            name="Other airplane",
+            airplane_type=flight.airplane.airplane_type,
+            rows=4,
+            seats_in_row=3,
+        )
+        flight.save()
+
+        self.assertIsNone(flight.seat_map)
+        self.assertTrue(flight.get_seat_map().is_taken(1, 1))
+
+    def test_ticket_created_directly_is_taken(self):
+        order = models.Order.objects.create(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            models.Ticket.objects.create(
+                flight=self.flight, order=order, row=2, seat=2
+            )
+        self.flight.refresh_from_db()
+
+        response = self.client.get(get_flight_url(self.flight.id))
+
+        self.assertEqual(response.data["taken_seats"], [{"row": 2, "seat": 2}])
+        self.assertEqual(self.flight.seats_sold, 1)
+        self.assertEqual(self.flight.search_row.tickets_available, 11)
+
+    def test_deleting_order_releases_seats(self):
+        order_id = self.book((1, 1), (3, 4)).data["id"]
+        version = models.Flight.objects.get(id=self.flight.id).version
+
+        with self.captureOnCommitCallbacks(execute=True):
+            models.Order.objects.get(id=order_id).delete()
+        self.flight.refresh_from_db()
+
+        self.assertEqual(self.flight.seats_sold, 0)
+        self.assertEqual(bytes(self.flight.seat_map), bytes(2))
+        self.assertEqual(self.flight.search_row.tickets_available, 12)
+        self.assertGreater(self.flight.version, version)
+
+    def test_deleting_order_query_count_does_not_grow_with_tickets(self):
+        def delete_order(*seats):
+            order_id = self.book(*seats).data["id"]
+            order = models.Order.objects.get(id=order_id)
+            with CaptureQueriesContext(connection) as queries:
+                with self.captureOnCommitCallbacks(execute=True):
+                    order.delete()
+            return len(queries)
+
+        few = delete_order((1, 1), (1, 2))
+        many = delete_order(
+            *((row, seat) for row in (2, 3) for seat in (1, 2, 3))
+        )
+
+        self.assertEqual(few, many)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_sold, 0)
+
+    def test_deleting_flight_skips_its_recount(self):
+        self.book((1, 1), (3, 4))
+
+        with mock.patch.object(booking, "recount_inventory") as recount:
+            with self.captureOnCommitCallbacks(execute=True):
+                models.Flight.objects.get(id=self.flight.id).delete()
+
+        recount.assert_not_called()
+
+    def test_resizing_airplane_resets_seat_map(self):
+        self.book((1, 1), (3, 4))
+        airplane = models.Airplane.objects.get(id=self.flight.airplane_id)
+        airplane.rows = 4
+        airplane.seats_in_row = 3
+        airplane.save()
+
+        flight = models.Flight.objects.get(id=self.flight.id)
+
+        self.assertIsNone(flight.seat_map)
+        self.assertEqual(
+            list(flight.get_seat_map().taken_seats()), [(1, 1)]
+        )
@@ -0,0 +1,113 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from airport import counters, models, throttling
+
+
+class SampleThrottle(throttling.SlidingWindowUserRateThrottle):
+    rate = "4/min"
+
+    def __init__(self, now: float = 0.0) -> None:
+        super().__init__()
+        self.timer = lambda: now
+
+
+class SlidingWindowThrottleTest(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "user@test.com",
+            "testpass",
+        )
+        self.request = APIView().initialize_request(
+            APIRequestFactory().get("/")
+        )
+        self.request.user = self.user
+
+    def allowed(self, now: float, requests: int = 1) -> list[bool]:
+        return [
+            SampleThrottle(now).allow_request(self.request, None)
+            for _ in range(requests)
+        ]
+
+    def test_limit_is_shared_between_instances(self):
+        self.assertEqual(self.allowed(0, 5), [True] * 4 + [False])
+
+    def test_previous_window_is_weighted(self):
+        self.allowed(30, 4)
+
+        # A quarter of the previous window is still covered
+        self.assertEqual(self.allowed(105, 4), [True] * 3 + [False])
+
+    def test_limit_is_restored_after_two_windows(self):
+        self.allowed(0, 4)
+
+        self.assertEqual(self.allowed(120, 4), [True] * 4)
+
+    def test_constant_number_of_counters(self):
+        self.allowed(0, 4)
+
+        self.assertEqual(models.SharedCounter.objects.count(), 1)
+
+    def test_wait(self):
+        throttle = SampleThrottle(30)
+        for _ in range(4):
+            throttle.allow_request(self.request, None)
+
+        self.assertFalse(throttle.allow_request(self.request, None))
+        self.assertEqual(throttle.wait(), 30)
+
+        throttle = SampleThrottle(65)
+        self.assertTrue(throttle.allow_request(self.request, None))
+        self.assertFalse(throttle.allow_request(self.request, None))
+        self.assertEqual(throttle.wait(), 10)
+
+    def test_purge_expired_counters(self):
+        self.allowed(0, 2)
+        models.SharedCounter.objects.create(
+            key="throttle:user:0:-1",
+            count=3,
+            expires_at=timezone.now() - timedelta(seconds=1),
+        )
+        out = StringIO()
+
+        call_command("purge_shared_counters", stdout=out)
+
+        self.assertIn("Purged shared counters: 1", out.getvalue())
+        self.assertEqual(models.SharedCounter.objects.get().count, 2)
+
+
+class SharedCounterConcurrencyTest(TransactionTestCase):
+    def test_concurrent_increments_are_not_lost(self):
+        workers, increments = 4, 25
+        start = threading.Barrier(workers)
+
+        def increment():
+            try:
+                start.wait()
+                for _ in range(increments):
+                    counters.incr("concurrent", timeout=60)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=increment) for _ in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(
+            counters.get_many(["concurrent"]),
+            {"concurrent": workers * increments},
+        )
@@ -0,0 +1,86 @@
+"""Sliding-window rate throttles with counters shared by all workers.
+
+Instead of DRF's list of request timestamps per client, two counters are
+stored per client: one for the current fixed window and one for the
+previous window. The request rate is estimated by weighting the previous
+counter with the part of it still covered by the sliding window, so every
+check costs the same number of queries however high the rate is.
+
+Counters are kept in the SharedCounter table (see airport.counters),
+which increments them atomically, so the limits hold across worker
+processes whatever cache backend is configured.
+"""
+import math
+
+from rest_framework.throttling import (
+    AnonRateThrottle,
+    SimpleRateThrottle,
+    UserRateThrottle,
+)
+
+from airport import counters
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    def get_window_counts(self) -> tuple[int, int, float]:
+        """Returns previous and current window counters and window elapsed"""
+        window, elapsed = divmod(self.now, self.duration)
+        self.counter_key = f"{self.key}:{int(window)}"
+        previous_key = f"{self.key}:{int(window) - 1}"
+
+        counts = counters.get_many([previous_key, self.counter_key])
+        return (
+            counts.get(previous_key, 0),
+            counts.get(self.counter_key, 0),
+            elapsed,
+        )
+
+    def allow_request(self, request, view) -> bool:
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        self.previous, self.current, self.elapsed = self.get_window_counts()
+        rate = (
+            self.previous * (1 - self.elapsed / self.duration) + self.current
+        )
+
+        if rate >= self.num_requests:
+            return self.throttle_failure()
+        return self.throttle_success()
+
+    def throttle_success(self) -> bool:
+        # Counters are read during the current and the following window
+        counters.incr(self.counter_key, timeout=2 * self.duration)
+        return True
+
+    def wait(self) -> float | None:
+        """Returns seconds until the estimated rate drops below the limit"""
+        if self.current < self.num_requests:
+            # The weight of the previous window has to decrease enough
+            elapsed = self.duration * (
+                1 - (self.num_requests - self.current) / self.previous
+            )
+            return max(math.ceil(elapsed - self.elapsed), 1)
+
+        # The current window becomes the previous one first
+        elapsed = self.duration * max(1 - self.num_requests / self.current, 0)
+        return math.ceil(self.duration - self.elapsed + elapsed)
+
+
+class SlidingWindowAnonRateThrottle(
+    SlidingWindowRateThrottle, AnonRateThrottle
+):
+    pass
+
+
+class SlidingWindowUserRateThrottle(
+    SlidingWindowRateThrottle, UserRateThrottle
+):
+    pass
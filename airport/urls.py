@@ -11,9 +11,15 @@ router.register("countries", views.CountryViewSet)
 router.register("cities", views.CityViewSet)
 router.register("airports", views.AirportViewSet)
 router.register("routes", views.RouteViewSet)
+router.register("routing", views.RoutingViewSet, basename="routing")
 router.register("crews", views.CrewViewSet)
 router.register("flights", views.FlightViewSet)
+router.register(
+    "itineraries", views.ItineraryViewSet, basename="itinerary"
+)
 router.register("orders", views.OrderViewSet)
+router.register("order-requests", views.OrderRequestViewSet)
+router.register("seat-holds", views.SeatHoldViewSet)
 
 
 urlpatterns = [
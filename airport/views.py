@@ -4,13 +4,35 @@ from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import (
+    NotFound,
+    PermissionDenied,
+    ValidationError,
+)
 
-from django.db.models import F, Count
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import parse_etags
 
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
-from airport import models, serializers
+from airport import booking, models, order_export, serializers
+from airport.async_views import AsyncReadMixin
+from airport.cache import CacheAsideMixin
+from airport.idempotency import IdempotentCreateMixin
+from airport.itineraries import flight_graph
+from airport.order_queue import QueuedOrderCreateMixin
+from airport.pagination import (
+    AsyncPageNumberPagination,
+    DepartureKeysetPagination,
+)
+from airport.routing import route_network
 
 
 class OrderPagination(PageNumberPagination):
@@ -18,17 +40,78 @@ class OrderPagination(PageNumberPagination):
     max_page_size = 100
 
 
-class FlightPagination(PageNumberPagination):
+class FlightPagination(AsyncPageNumberPagination):
     page_size = 20
     max_page_size = 100
 
 
+def parse_departure_bound(
+    query_params, param_name
+) -> tuple[datetime | None, bool]:
+    """Parses a date or datetime query param into a naive datetime
+
+    Also returns whether only a date was provided, so that the caller
+    can treat it as a whole day.
+    """
+    value = query_params.get(param_name)
+
+    if not value:
+        return None, False
+
+    try:
+        bound = parse_date(value)
+        if bound:
+            return datetime.combine(bound, time.min), True
+
+        bound = parse_datetime(value)
+        if bound:
+            if timezone.is_aware(bound):
+                bound = timezone.make_naive(bound)
+            return bound, False
+    except ValueError:
+        pass
+
+    raise ValidationError(
+        {param_name: "Expected a date (YYYY-MM-DD) or a datetime"}
+    )
+
+
+def parse_int_param(
+    query_params,
+    param_name,
+    default: int | None,
+    min_value: int,
+    max_value: int,
+) -> int | None:
+    value = query_params.get(param_name)
+
+    if value is None or value == "":
+        return default
+
+    try:
+        number = int(value)
+    except ValueError:
+        number = None
+
+    if number is None or not (min_value <= number <= max_value):
+        raise ValidationError(
+            {
+                param_name: f"Expected an integer in range: "
+                f"({min_value}, {max_value})"
+            }
+        )
+
+    return number
+
+
 class AirplaneTypeViewSet(
+    CacheAsideMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
     queryset = models.AirplaneType.objects.all()
+    cache_models = (models.AirplaneType,)
     serializer_class = serializers.AirplaneTypeSerializer
 
     def list(self, request, *args, **kwargs):
@@ -41,11 +124,13 @@ class AirplaneTypeViewSet(
 
 
 class AirplaneViewSet(
+    CacheAsideMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
     queryset = models.Airplane.objects.select_related("airplane_type")
+    cache_models = (models.Airplane, models.AirplaneType)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -63,11 +148,13 @@ class AirplaneViewSet(
 
 
 class CountryViewSet(
+    CacheAsideMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
     queryset = models.Country.objects.all()
+    cache_models = (models.Country,)
     serializer_class = serializers.CountrySerializer
 
     def list(self, request, *args, **kwargs):
@@ -80,11 +167,13 @@ class CountryViewSet(
 
 
 class CityViewSet(
+    CacheAsideMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
     queryset = models.City.objects.select_related("country")
+    cache_models = (models.City, models.Country)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -102,12 +191,16 @@ class CityViewSet(
 
 
 class AirportViewSet(
+    AsyncReadMixin,
+    CacheAsideMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     GenericViewSet,
 ):
     queryset = models.Airport.objects.select_related("city__country")
+    cache_models = (models.Airport, models.City, models.Country)
+    cache_timeouts = {"list": None, "retrieve": None}
 
     @staticmethod
     def _params_to_ints(params) -> list[int]:
@@ -141,7 +234,7 @@ class AirportViewSet(
         return queryset
 
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = self.queryset.all()
 
         queryset = self.filter_by_query_params(queryset)
 
@@ -222,6 +315,7 @@ class AirportViewSet(
 
 
 class RouteViewSet(
+    AsyncReadMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -230,7 +324,7 @@ class RouteViewSet(
     queryset = models.Route.objects.prefetch_related("source", "destination")
 
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = super().get_queryset()
         if self.action == "retrieve":
             queryset = models.Route.objects.select_related(
                 "source__city__country", "destination__city__country"
@@ -259,16 +353,134 @@ class RouteViewSet(
         return super().retrieve(request, *args, **kwargs)
 
 
-class FlightViewSet(ModelViewSet):
-    queryset = models.Flight.objects.all().annotate(
-        tickets_available=(
-            F("airplane__rows") * F("airplane__seats_in_row")
-            - Count("tickets")
+class RoutingViewSet(GenericViewSet):
+    queryset = models.Airport.objects.all()
+
+    def get_serializer_class(self):
+        if self.action == "reachable":
+            return serializers.ReachableAirportSerializer
+
+        return serializers.ShortestPathSerializer
+
+    def _get_airport_id(self, param_name) -> int:
+        airport_id = parse_int_param(
+            self.request.query_params, param_name, None, 1, 2**63 - 1
         )
+        if airport_id is None:
+            raise ValidationError({param_name: "This param is required"})
+
+        return airport_id
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="source",
+                description="Source airport id (ex. ?source=2)",
+                required=True,
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="destination",
+                description="Destination airport id (ex. ?destination=5)",
+                required=True,
+                type=OpenApiTypes.INT,
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False, url_path="shortest-path")
+    def shortest_path(self, request):
+        """Returns the route chain with the shortest total distance"""
+        source_id = self._get_airport_id("source")
+        destination_id = self._get_airport_id("destination")
+
+        path = route_network.shortest_path(source_id, destination_id)
+        if path is None:
+            raise NotFound("There is no path between these airports")
+
+        distance, airport_ids, route_ids = path
+        airports = self.get_queryset().in_bulk(airport_ids)
+        serializer = self.get_serializer(
+            {
+                "distance": distance,
+                "hops": len(route_ids),
+                "airports": [
+                    airports[airport_id] for airport_id in airport_ids
+                ],
+                "routes": route_ids,
+            }
+        )
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="source",
+                description="Source airport id (ex. ?source=2)",
+                required=True,
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="max_hops",
+                description="Maximum number of routes, 1-10 (default 2)",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+        ]
     )
+    @action(methods=["GET"], detail=False, url_path="reachable")
+    def reachable(self, request):
+        """Returns airports reachable from the source within max_hops"""
+        source_id = self._get_airport_id("source")
+        max_hops = parse_int_param(request.query_params, "max_hops", 2, 1, 10)
+
+        hops = route_network.reachable(source_id, max_hops)
+        airports = sorted(
+            self.get_queryset().filter(id__in=hops),
+            key=lambda airport: (hops[airport.id], airport.id),
+        )
+        for airport in airports:
+            airport.hops = hops[airport.id]
+
+        serializer = self.get_serializer(airports, many=True)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class FlightViewSet(AsyncReadMixin, ModelViewSet):
+    queryset = models.Flight.objects.with_tickets_available()
+    async_actions = ("list", "retrieve")
     pagination_class = FlightPagination
+    cursor_pagination_class = DepartureKeysetPagination
+    filter_lookups = {
+        "source_airport": "route__source__id",
+        "destination_airport": "route__destination__id",
+        "source_city": "route__source__city__id",
+        "destination_city": "route__destination__city__id",
+    }
+    read_model_filter_lookups = {
+        "source_airport": "source_airport_id",
+        "destination_airport": "destination_airport_id",
+        "source_city": "source_city_id",
+        "destination_city": "destination_city_id",
+    }
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            query_params = self.request.query_params
+            if (
+                query_params.get("pagination") == "cursor"
+                or self.cursor_pagination_class.cursor_query_param
+                in query_params
+            ):
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
     def _filter_by_airport(self, queryset):
+        lookups = self.get_filter_lookups()
         source_airport_id_str = self.request.query_params.get("source_airport")
         destination_airport_id_str = self.request.query_params.get(
             "destination_airport"
@@ -276,17 +488,22 @@ class FlightViewSet(ModelViewSet):
 
         if source_airport_id_str:
             queryset = queryset.filter(
-                route__source__id=int(source_airport_id_str)
+                **{lookups["source_airport"]: int(source_airport_id_str)}
             )
 
         if destination_airport_id_str:
             queryset = queryset.filter(
-                route__destination__id=int(destination_airport_id_str)
+                **{
+                    lookups["destination_airport"]: int(
+                        destination_airport_id_str
+                    )
+                }
             )
 
         return queryset
 
     def _filter_by_city(self, queryset):
+        lookups = self.get_filter_lookups()
         source_city_id_str = self.request.query_params.get("source_city")
         destination_city_id_str = self.request.query_params.get(
             "destination_city"
@@ -294,23 +511,39 @@ class FlightViewSet(ModelViewSet):
 
         if source_city_id_str:
             queryset = queryset.filter(
-                route__source__city__id=int(source_city_id_str)
+                **{lookups["source_city"]: int(source_city_id_str)}
             )
 
         if destination_city_id_str:
             queryset = queryset.filter(
-                route__destination__city__id=int(destination_city_id_str)
+                **{lookups["destination_city"]: int(destination_city_id_str)}
             )
 
         return queryset
 
     def _filter_by_date(self, queryset):
-        departure_date = self.request.query_params.get("departure_date")
+        # Bounds are compared with the raw departure_time column (no
+        # __date cast), so the departure_time indexes can be used
+        departure_date, _ = parse_departure_bound(
+            self.request.query_params, "departure_date"
+        )
+        departure_from, _ = parse_departure_bound(
+            self.request.query_params, "departure_from"
+        )
+        departure_to, is_date = parse_departure_bound(
+            self.request.query_params, "departure_to"
+        )
 
-        if departure_date:
+        for lower_bound in (departure_date, departure_from):
+            if lower_bound:
+                queryset = queryset.filter(departure_time__gte=lower_bound)
+
+        if departure_to and is_date:
             queryset = queryset.filter(
-                departure_time__date__gte=departure_date
+                departure_time__lt=departure_to + timedelta(days=1)
             )
+        elif departure_to:
+            queryset = queryset.filter(departure_time__lte=departure_to)
 
         return queryset
 
@@ -321,7 +554,22 @@ class FlightViewSet(ModelViewSet):
 
         return queryset
 
+    def uses_read_model(self) -> bool:
+        """Whether the list is served from the FlightSearch read model"""
+        return self.action == "list" and settings.FLIGHT_SEARCH_READ_MODEL
+
+    def get_filter_lookups(self) -> dict[str, str]:
+        if self.uses_read_model():
+            return self.read_model_filter_lookups
+
+        return self.filter_lookups
+
     def get_queryset(self):
+        if self.uses_read_model():
+            return self.filter_by_query_params(
+                models.FlightSearch.objects.all()
+            )
+
         queryset = self.queryset
 
         queryset = self.filter_by_query_params(queryset)
@@ -336,19 +584,66 @@ class FlightViewSet(ModelViewSet):
                 "route__source__city__country",
                 "route__destination__city__country",
                 "airplane__airplane_type",
-            ).prefetch_related("crew", "tickets",)
+            ).prefetch_related("crew")
+
+        if self.action == "seatmap":
+            queryset = queryset.select_related("airplane")
 
         return queryset
 
     def get_serializer_class(self):
+        if self.uses_read_model():
+            return serializers.FlightSearchSerializer
+
         if self.action == "list":
             return serializers.FlightListSerializer
 
         if self.action == "retrieve":
             return serializers.FlightDetailSerializer
 
+        if self.action == "seatmap":
+            return serializers.SeatMapSerializer
+
         return serializers.FlightSerializer
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="encoding",
+                description=(
+                    "Seat map encoding: base64 (default), rle or binary"
+                    " (ex. ?encoding=rle)."
+                    " Note: binary returns raw application/octet-stream"
+                ),
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=True, url_path="seatmap")
+    def seatmap(self, request, pk=None):
+        """Returns occupancy of the flight cabin as a packed seat bitmap"""
+        encoding = request.query_params.get("encoding", "base64")
+        encodings = (*serializers.SeatMapSerializer.ENCODINGS, "binary")
+        if encoding not in encodings:
+            raise ValidationError({"encoding": f"Unknown encoding {encoding}"})
+
+        seat_map = self.get_object().get_seat_map()
+
+        if encoding == "binary":
+            response = HttpResponse(
+                seat_map.to_bytes(), content_type="application/octet-stream"
+            )
+            response["X-Seat-Rows"] = seat_map.rows
+            response["X-Seats-In-Row"] = seat_map.seats_in_row
+            return response
+
+        context = self.get_serializer_context()
+        context["encoding"] = encoding
+        serializer = self.get_serializer(seat_map, context=context)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -392,14 +687,55 @@ class FlightViewSet(ModelViewSet):
                 type=OpenApiTypes.STR,
             ),
             OpenApiParameter(
-                name="departure_time",
+                name="departure_date",
                 description=(
-                    "Filter by departure time"
-                    " (ex. ?departure_time=2020-01-30)"
+                    "Filter by departure date, flights departing"
+                    " on or after it are returned"
+                    " (ex. ?departure_date=2020-01-30)"
                 ),
                 required=False,
                 type=OpenApiTypes.DATE,
             ),
+            OpenApiParameter(
+                name="departure_from",
+                description=(
+                    "Filter by earliest departure date or time, inclusive"
+                    " (ex. ?departure_from=2020-01-30"
+                    " or ?departure_from=2020-01-30T08:00)"
+                ),
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="departure_to",
+                description=(
+                    "Filter by latest departure date or time, inclusive."
+                    " A date covers the whole day"
+                    " (ex. ?departure_to=2020-02-05"
+                    " or ?departure_to=2020-02-05T20:00)"
+                ),
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="pagination",
+                description=(
+                    "Use cursor pagination ordered by departure time"
+                    " (ex. ?pagination=cursor)."
+                    " Note: cursor pages have no total count"
+                ),
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="cursor",
+                description=(
+                    "Opaque cursor taken from the next/previous link"
+                    " of a cursor page"
+                ),
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
@@ -410,9 +746,84 @@ class FlightViewSet(ModelViewSet):
         """Creates an instance of the Flight model"""
         return super().create(request, *args, **kwargs)
 
+    def get_version_queryset(self):
+        """Reads only the version column of the requested flight"""
+        return self.filter_by_query_params(
+            models.Flight.objects.filter(pk=self.kwargs["pk"])
+        ).values_list("version", flat=True)
+
+    def format_etag(self, version: int | None) -> str:
+        """Returns a strong ETag built from the flight version
+
+        Only the version column is read, so conditional requests are
+        answered before any serialization or related-object queries.
+        """
+        if version is None:
+            raise NotFound()
+
+        return f'"flight-{self.kwargs["pk"]}-v{version}"'
+
+    def get_etag(self) -> str:
+        try:
+            version = self.get_version_queryset().first()
+        except ValueError:
+            version = None
+
+        return self.format_etag(version)
+
+    async def aget_etag(self) -> str:
+        try:
+            version = await self.get_version_queryset().afirst()
+        except ValueError:
+            version = None
+
+        return self.format_etag(version)
+
+    @staticmethod
+    def not_modified(request, etag: str) -> Response | None:
+        if_none_match = request.headers.get("If-None-Match")
+        if not if_none_match:
+            return None
+
+        etags = [
+            value.removeprefix("W/") for value in parse_etags(if_none_match)
+        ]
+        if "*" in etags or etag in etags:
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag},
+            )
+        return None
+
+    @staticmethod
+    def add_etag(response: Response, etag: str) -> Response:
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
     def retrieve(self, request, *args, **kwargs):
-        """Returns detailed information about an instance"""
-        return super().retrieve(request, *args, **kwargs)
+        """Returns detailed information about an instance
+
+        Supports conditional requests with If-None-Match.
+        """
+        etag = self.get_etag()
+        response = self.not_modified(request, etag)
+        if response is not None:
+            return response
+
+        return self.add_etag(
+            super().retrieve(request, *args, **kwargs), etag
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        etag = await self.aget_etag()
+        response = self.not_modified(request, etag)
+        if response is not None:
+            return response
+
+        return self.add_etag(
+            await super().aretrieve(request, *args, **kwargs), etag
+        )
 
     def partial_update(self, request, *args, **kwargs):
         """Updates an instance (doesn't require all fields to be provided)"""
@@ -427,12 +838,185 @@ class FlightViewSet(ModelViewSet):
         return super().destroy(request, *args, **kwargs)
 
 
+class ItineraryViewSet(GenericViewSet):
+    serializer_class = serializers.ItinerarySerializer
+
+    def get_search_params(self) -> dict:
+        query_params = self.request.query_params
+        search_params = {}
+
+        for param_name, search_param in (
+            ("source_airport", "source_id"),
+            ("destination_airport", "destination_id"),
+        ):
+            search_params[search_param] = parse_int_param(
+                query_params, param_name, None, 1, 2**63 - 1
+            )
+            if search_params[search_param] is None:
+                raise ValidationError({param_name: "This param is required"})
+
+        departure_from, _ = parse_departure_bound(
+            query_params, "departure_from"
+        )
+        departure_to, is_date = parse_departure_bound(
+            query_params, "departure_to"
+        )
+        now = timezone.now()
+        departure_from = max(departure_from or now, now)
+        if departure_to and is_date:
+            departure_to += timedelta(days=1, microseconds=-1)
+
+        search_params["departure_from"] = departure_from
+        search_params["departure_to"] = (
+            departure_to or departure_from + timedelta(days=1)
+        )
+        search_params["max_legs"] = parse_int_param(
+            query_params, "max_legs", 2, 1, 4
+        )
+        search_params["min_layover"] = timedelta(
+            minutes=parse_int_param(
+                query_params, "min_layover", 60, 0, 7 * 24 * 60
+            )
+        )
+        search_params["max_layover"] = timedelta(
+            minutes=parse_int_param(
+                query_params, "max_layover", 24 * 60, 0, 7 * 24 * 60
+            )
+        )
+        if search_params["min_layover"] > search_params["max_layover"]:
+            raise ValidationError(
+                {"min_layover": "min_layover can't exceed max_layover"}
+            )
+
+        return search_params
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="source_airport",
+                description="Source airport id (ex. ?source_airport=2)",
+                required=True,
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="destination_airport",
+                description=(
+                    "Destination airport id (ex. ?destination_airport=5)"
+                ),
+                required=True,
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="departure_from",
+                description=(
+                    "Earliest departure date or time of the first leg,"
+                    " defaults to now (ex. ?departure_from=2020-01-30)"
+                ),
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="departure_to",
+                description=(
+                    "Latest departure date or time of the first leg,"
+                    " defaults to a day after departure_from"
+                    " (ex. ?departure_to=2020-01-31)"
+                ),
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="max_legs",
+                description="Maximum number of flights, 1-4 (default 2)",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="min_layover",
+                description="Minimum layover in minutes (default 60)",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="max_layover",
+                description="Maximum layover in minutes (default 1440)",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="passengers",
+                description=(
+                    "Only return itineraries with enough free seats"
+                    " on every flight (default 1)"
+                ),
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="limit",
+                description="Maximum number of itineraries (default 10)",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        """Returns ranked direct and connecting itineraries"""
+        search_params = self.get_search_params()
+        passengers = parse_int_param(
+            request.query_params, "passengers", 1, 1, 1000
+        )
+        limit = parse_int_param(request.query_params, "limit", 10, 1, 50)
+
+        itineraries = flight_graph.search(**search_params)
+
+        flights = {}
+        results = []
+        # Seats are sold without touching the graph, so availability is
+        # checked against the database in batches of candidates
+        for start in range(0, len(itineraries), limit):
+            batch = itineraries[start:start + limit]
+            flight_ids = {
+                leg.flight_id for itinerary in batch for leg in itinerary.legs
+            }
+            flights.update(
+                models.Flight.objects.with_tickets_available()
+                .select_related("route__source", "route__destination")
+                .in_bulk(flight_ids - flights.keys())
+            )
+            for itinerary in batch:
+                itinerary_flights = [
+                    flights.get(leg.flight_id) for leg in itinerary.legs
+                ]
+                if all(
+                    flight and flight.tickets_available >= passengers
+                    for flight in itinerary_flights
+                ):
+                    results.append(
+                        {
+                            "departure_time": itinerary.departure_time,
+                            "arrival_time": itinerary.arrival_time,
+                            "duration": itinerary.duration,
+                            "layovers": itinerary.layovers,
+                            "flights": itinerary_flights,
+                        }
+                    )
+            if len(results) >= limit:
+                break
+
+        serializer = self.get_serializer(results[:limit], many=True)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
 class CrewViewSet(
+    CacheAsideMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
     queryset = models.Crew.objects.all()
+    cache_models = (models.Crew,)
     serializer_class = serializers.CrewSerializer
 
     def list(self, request, *args, **kwargs):
@@ -445,6 +1029,8 @@ class CrewViewSet(
 
 
 class OrderViewSet(
+    IdempotentCreateMixin,
+    QueuedOrderCreateMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
@@ -454,16 +1040,20 @@ class OrderViewSet(
     pagination_class = OrderPagination
 
     def get_queryset(self):
-        return models.Order.objects.filter(
+        queryset = models.Order.objects.filter(
             user=self.request.user
-        ).prefetch_related(
-            "tickets__flight__route__destination",
-            "tickets__flight__route__source"
-        )
+        ).order_by("id")
+
+        if self.action == "list":
+            return queryset.with_ticket_flights()
+
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
             return serializers.OrderListSerializer
+        if self.action == "bulk":
+            return serializers.BulkOrderSerializer
 
         return serializers.OrderSerializer
 
@@ -474,6 +1064,219 @@ class OrderViewSet(
         """Returns list of user orders"""
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="Idempotency-Key",
+                location=OpenApiParameter.HEADER,
+                description=(
+                    "Unique key of the request, repeated requests with the "
+                    "same key return the stored response"
+                ),
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="Prefer",
+                location=OpenApiParameter.HEADER,
+                description=(
+                    "respond-async queues the order and answers 202 with "
+                    "an order request to poll at /order-requests/{id}/"
+                ),
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+        ]
+    )
     def create(self, request, *args, **kwargs):
         """Creates an instance of the Order model"""
         return super().create(request, *args, **kwargs)
+
+    @extend_schema(responses={200: OpenApiTypes.OBJECT})
+    @action(methods=["POST"], detail=False)
+    def bulk(self, request):
+        """Creates many orders at once.
+
+        Every order succeeds or fails on its own, the response lists the
+        created order or the errors for each of them in request order.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save(user=request.user)
+
+        return Response(
+            {
+                "created": sum(
+                    result["status"] == "created" for result in results
+                ),
+                "failed": sum(
+                    result["status"] == "failed" for result in results
+                ),
+                "results": results,
+            }
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="output",
+                description="Export format: ndjson (default) or csv",
+                required=False,
+                type=OpenApiTypes.STR,
+                enum=tuple(order_export.CONTENT_TYPES),
+            ),
+            OpenApiParameter(
+                name="user",
+                description="Export orders of one user, admins only",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="created_from",
+                description=(
+                    "Orders created since the date or time "
+                    "(ex. ?created_from=2024-08-01)"
+                ),
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="created_to",
+                description=(
+                    "Orders created until the date (inclusive) or time "
+                    "(ex. ?created_to=2024-08-31)"
+                ),
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+        ],
+        responses={200: OpenApiTypes.BINARY},
+    )
+    @action(methods=["GET"], detail=False)
+    def export(self, request):
+        """Streams orders as NDJSON or CSV with one line per ticket.
+
+        Users export their own orders, admins export orders of all users
+        unless filtered by user.
+        """
+        query_params = request.query_params
+        output = query_params.get("output", "ndjson")
+        if output not in order_export.CONTENT_TYPES:
+            raise ValidationError(
+                {
+                    "output": "Expected one of: "
+                    + ", ".join(order_export.CONTENT_TYPES)
+                }
+            )
+
+        user_id = parse_int_param(query_params, "user", None, 1, 2**63 - 1)
+        if not request.user.is_staff:
+            if user_id not in (None, request.user.id):
+                raise PermissionDenied(
+                    "Only admins can export orders of other users."
+                )
+            user_id = request.user.id
+
+        created_from, _ = parse_departure_bound(query_params, "created_from")
+        created_to, whole_day = parse_departure_bound(
+            query_params, "created_to"
+        )
+        tickets = order_export.filter_tickets(
+            user_id=user_id,
+            created_from=created_from,
+            created_to=created_to,
+            whole_day=whole_day,
+        )
+
+        response = StreamingHttpResponse(
+            order_export.render(
+                tickets, output, chunk_size=settings.EXPORT_CHUNK_SIZE
+            ),
+            content_type=order_export.CONTENT_TYPES[output],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="orders.{output}"'
+        )
+        return response
+
+
+class SeatHoldViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.ListModelMixin,
+    mixins.DestroyModelMixin,
+    GenericViewSet,
+):
+    queryset = models.SeatHold.objects.all()
+    serializer_class = serializers.SeatHoldSerializer
+    permission_classes = (IsAuthenticated, )
+    pagination_class = OrderPagination
+
+    def get_queryset(self):
+        queryset = (
+            models.SeatHold.objects.filter(user=self.request.user)
+            .prefetch_related("seats")
+            .order_by("id")
+        )
+
+        if self.action == "list":
+            return queryset.filter(expires_at__gt=timezone.now())
+
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == "confirm":
+            return serializers.OrderSerializer
+
+        return serializers.SeatHoldSerializer
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        """Returns active seat holds of the user"""
+        return super().list(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        """Holds seats for SEAT_HOLD_TTL seconds until they are confirmed"""
+        return super().create(request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        """Releases held seats"""
+        return super().destroy(request, *args, **kwargs)
+
+    @extend_schema(request=None)
+    @action(methods=["POST"], detail=True)
+    def confirm(self, request, pk=None):
+        """Creates an order with the held seats and releases the hold"""
+        hold = self.get_object()
+
+        with transaction.atomic():
+            order = booking.confirm_hold(hold)
+
+        serializer = self.get_serializer(order)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class OrderRequestViewSet(
+    mixins.RetrieveModelMixin,
+    mixins.ListModelMixin,
+    GenericViewSet,
+):
+    queryset = models.OrderRequest.objects.all()
+    serializer_class = serializers.OrderRequestSerializer
+    permission_classes = (IsAuthenticated, )
+    pagination_class = OrderPagination
+
+    def get_queryset(self):
+        return models.OrderRequest.objects.filter(
+            user=self.request.user
+        ).order_by("-id")
+
+    def list(self, request, *args, **kwargs):
+        """Returns queued order requests of the user"""
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Returns the status of a queued order request"""
+        return super().retrieve(request, *args, **kwargs)
@@ -57,6 +57,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "airport.middleware.ReplicaPinningMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -96,6 +97,88 @@ DATABASES = {
     }
 }
 
+# How connections to PostgreSQL are reused between requests:
+# "none" opens a new connection for every request, "persistent" keeps one
+# connection per worker for DB_CONN_MAX_AGE seconds and checks it before
+# reuse, "pool" shares psycopg's connection pool between the threads of a
+# worker (requires psycopg-pool).
+DB_CONNECTION_MODE = os.environ.get("DB_CONNECTION_MODE", "none")
+
+if DB_CONNECTION_MODE == "persistent":
+    DATABASES["default"]["CONN_MAX_AGE"] = int(
+        os.environ.get("DB_CONN_MAX_AGE", 600)
+    )
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+elif DB_CONNECTION_MODE == "pool":
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+            # Seconds an idle connection above min_size is kept open
+            "max_idle": int(os.environ.get("DB_POOL_MAX_IDLE", 600)),
+            # Seconds after which a connection is replaced by a new one
+            "max_lifetime": int(os.environ.get("DB_POOL_MAX_LIFETIME", 3600)),
+            # Seconds a request waits for a free connection
+            "timeout": int(os.environ.get("DB_POOL_TIMEOUT", 30)),
+        },
+    }
+
+# Comma separated hosts of read replicas of the default database, added as
+# the "replica_1", "replica_2", ... aliases. In tests they mirror default.
+DATABASE_REPLICAS = []
+
+for number, host in enumerate(
+    filter(None, os.environ.get("POSTGRES_REPLICA_HOSTS", "").split(",")),
+    start=1,
+):
+    alias = f"replica_{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["airport.db_routers.ReplicaRouter"]
+
+# Seconds a user reads from the primary after a write, should exceed the
+# replication lag
+REPLICA_PIN_TIMEOUT = int(os.environ.get("REPLICA_PIN_TIMEOUT", 15))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# Run "python manage.py createcachetable" when using the database backend
+CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get(
+            "CACHE_LOCATION", "/tmp/airport_service_cache"
+        ),
+    },
+    "database": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "airport_service_cache",
+    },
+}
+
+CACHES = {
+    "default": CACHE_BACKENDS[os.environ.get("CACHE_BACKEND", "locmem")],
+}
+
+RESPONSE_CACHE_ALIAS = "default"
+
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_TIMEOUT", 3600))
+
+# Seconds an expired response is still served while one request refreshes it
+RESPONSE_CACHE_STALE_TIMEOUT = int(
+    os.environ.get("RESPONSE_CACHE_STALE_TIMEOUT", 60)
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -162,8 +245,8 @@ REST_FRAMEWORK = {
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle"
+        "airport.throttling.SlidingWindowAnonRateThrottle",
+        "airport.throttling.SlidingWindowUserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "15/day",
@@ -184,6 +267,44 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# Serve flight search from the denormalized FlightSearch table.
+# Run "python manage.py rebuild_flight_search" before enabling it.
+FLIGHT_SEARCH_READ_MODEL = (
+    os.environ.get("FLIGHT_SEARCH_READ_MODEL", "False") == "True"
+)
+
+# Serve the flight, airport and route reads with async views. Enable it
+# when running under ASGI, e.g. "uvicorn airport_service.asgi:application"
+ASYNC_READ_VIEWS = os.environ.get("ASYNC_READ_VIEWS", "False") == "True"
+
+# Seconds after which the in-memory itinerary graph is fully rebuilt, so
+# that flights changed by other worker processes are picked up
+ITINERARY_GRAPH_TTL = int(os.environ.get("ITINERARY_GRAPH_TTL", 300))
+
+# Seconds after which the cached shortest-path index of routes is rebuilt
+ROUTE_NETWORK_TTL = int(os.environ.get("ROUTE_NETWORK_TTL", 600))
+
+# Seconds the response of a request with an Idempotency-Key is replayed
+IDEMPOTENCY_KEY_TTL = int(os.environ.get("IDEMPOTENCY_KEY_TTL", 86400))
+
+# How concurrent bookings of the same flight are serialized, one of
+# "pessimistic", "optimistic" or "insert" (see airport.booking.book_tickets)
+BOOKING_STRATEGY = os.environ.get("BOOKING_STRATEGY", "insert")
+
+# Attempts of the optimistic strategy after a version conflict
+BOOKING_OPTIMISTIC_RETRIES = int(
+    os.environ.get("BOOKING_OPTIMISTIC_RETRIES", 3)
+)
+
+# Maximum number of orders accepted by one bulk order request
+BULK_ORDER_MAX_ORDERS = int(os.environ.get("BULK_ORDER_MAX_ORDERS", 500))
+
+# Rows fetched per round trip by the streaming order export
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 2000))
+
+# Seconds a seat hold reserves its seats before it has to be confirmed
+SEAT_HOLD_TTL = int(os.environ.get("SEAT_HOLD_TTL", 600))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
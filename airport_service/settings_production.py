@@ -0,0 +1,62 @@
+"""
+Production settings of the JWT API.
+
+Only the apps and middleware the API needs are installed: no admin,
+sessions, messages or debug toolbar, and responses are rendered as JSON
+only. Use it with DJANGO_SETTINGS_MODULE=airport_service.settings_production
+and set MIDDLEWARE_PROBE=True to get the time spent in every middleware in
+a Server-Timing header.
+"""
+
+import os
+
+from airport.middleware_probe import instrument
+from airport_service.settings import *  # noqa: F401,F403
+from airport_service.settings import REST_FRAMEWORK
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.environ.get("ALLOWED_HOSTS", "localhost").split(",")
+
+INSTALLED_APPS = [
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.staticfiles",
+    "rest_framework",
+    "airport",
+    "user",
+    "rest_framework_simplejwt",
+    "drf_spectacular",
+]
+
+# CSRF, sessions and messages only serve the admin and the browsable API
+MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "airport.middleware.ReplicaPinningMiddleware",
+]
+
+if os.environ.get("MIDDLEWARE_PROBE", "False") == "True":
+    MIDDLEWARE = instrument(MIDDLEWARE)
+
+ROOT_URLCONF = "airport_service.urls_production"
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [],
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.request",
+            ],
+        },
+    },
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_RENDERER_CLASSES": [
+        "rest_framework.renderers.JSONRenderer",
+    ],
+}
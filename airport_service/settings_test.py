@@ -0,0 +1,18 @@
+"""
+Test settings.
+
+Adds a replica_1 alias mirroring the test database when no replica hosts
+are configured, so that the replica routing tests run against a single
+PostgreSQL server. Reads only go to it when a test lists it in
+DATABASE_REPLICAS. Use it with
+"python manage.py test airport/tests --settings=airport_service.settings_test".
+"""
+
+from airport_service.settings import *  # noqa: F401,F403
+from airport_service.settings import DATABASES
+
+if "replica_1" not in DATABASES:
+    DATABASES["replica_1"] = {
+        **DATABASES["default"],
+        "TEST": {"MIRROR": "default"},
+    }